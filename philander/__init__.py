@@ -12,7 +12,7 @@ __all__ = ["accelerometer", "actuator", "adc",
            "l6924", "led",
            "max77960", "mcp40", "module", "mux",
            "penum", "potentiometer", "primitives", "pwm",
-           "sensor", "serialbus", "shiftreg", "shiftreg_spi", "simBA456",
+           "sensor", "sequencer", "serialbus", "shiftreg", "shiftreg_spi", "simBA456",
            "simdev", "stadc1283", "stc311x", "sysfactory", "systypes",
            "thermometer",
            "vibrasense", "vibrasense2", "voltmeter",
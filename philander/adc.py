@@ -8,12 +8,21 @@ __author__ = "Oliver Maye"
 __version__ = "0.1"
 __all__ = ["ADC"]
 
+from array import array
 import logging
 
 from philander.module import Module
+from philander.ptime import sleepUs as _sleepUs, ticksDiff as _ticksDiff, ticksUs as _ticksUs
 from philander.sysfactory import SysProvider, SysFactory
 from philander.systypes import ErrorCode
 
+_hasNumpy = False
+try:
+    import numpy
+    _hasNumpy = True
+except ImportError:
+    _hasNumpy = False
+
 
 class ADC( Module ):
     """Analogue-to-digital converter abstraction class.
@@ -240,3 +249,191 @@ class ADC( Module ):
             val = (val + (self.DIGITAL_MAX // 2)) // self.DIGITAL_MAX
             val = val + self.vref_lower
         return val, err
+
+    def toVoltages(self, digitals, calibration=None):
+        """Convert a buffer of digital values to voltages in mV.
+        
+        This is the array counterpart of :meth:`toVoltage` with the
+        same scaling and rounding. Arguments are checked once for the
+        whole buffer, rather than per sample.
+        If NumPy is available, the conversion is vectorized and the
+        result is a `numpy.ndarray`. Otherwise, an `array("l")` is
+        returned.
+        
+        Optionally, a calibration table can be given as a list of
+        `(gain, offset)` pairs, one per channel. Samples are assumed to
+        be interleaved by channel, as delivered by multi-channel scans.
+        So, sample `i` is corrected by entry `i % len(calibration)` as
+        `round(voltage * gain + offset)`.
+        
+        :param digitals: The digital values to convert, each in [0, DIGITAL_MAX].
+        :param calibration: List of (gain, offset) pairs or `None`.
+        :return: The mV-values and an error code indicating either\
+        success or the reason of failure.
+        :rtype: array, ErrorCode
+        """
+        err = ErrorCode.errOk
+        vals = None
+        if not self.isOpen:
+            err = ErrorCode.errResourceConflict
+        elif (digitals is None) or (calibration is not None and len(calibration) < 1):
+            err = ErrorCode.errInvalidParameter
+        elif len(digitals) > 0 and \
+             ((min(digitals) < 0) or (max(digitals) > self.DIGITAL_MAX)):
+            err = ErrorCode.errSpecRange
+        elif _hasNumpy:
+            span = self.vref_upper - self.vref_lower
+            vals = numpy.asarray( digitals, dtype=numpy.int64 ) * span
+            vals = (vals + (self.DIGITAL_MAX // 2)) // self.DIGITAL_MAX + self.vref_lower
+            if calibration:
+                width = len(calibration)
+                for idx, (gain, offset) in enumerate( calibration ):
+                    vals[idx::width] = numpy.rint( vals[idx::width] * gain + offset )
+        else:
+            span = self.vref_upper - self.vref_lower
+            half = self.DIGITAL_MAX // 2
+            dmax = self.DIGITAL_MAX
+            lower = self.vref_lower
+            vals = array( "l", [(d * span + half) // dmax + lower for d in digitals] )
+            if calibration:
+                width = len(calibration)
+                for idx, (gain, offset) in enumerate( calibration ):
+                    for pos in range( idx, len(vals), width ):
+                        vals[pos] = round( vals[pos] * gain + offset )
+        return vals, err
+
+    def _readSample(self):
+        """Take a single sample, as fast as possible.
+        
+        This is the low-level primitive used by :meth:`getSamples` and
+        :meth:`iterSamples`. Different from :meth:`getDigital`, it is
+        called only after the arguments have been checked, once.
+        Implementations may overwrite it to save the per-call overhead.
+        
+        :return: A value in the range [0, DIGITAL_MAX] and an error code\
+        indicating either success or the reason of failure.
+        :rtype: int, ErrorCode
+        """
+        return self.getDigital()
+
+    def _readBlock(self, samples, stamps, rate, oversampling):
+        """Fill the given buffers with consecutive samples.
+        
+        Samples are taken at the given rate, or as fast as possible if
+        the rate is zero. Each sample is the rounded average of
+        `oversampling` subsequent readings.
+        Implementations may overwrite this method to take advantage of
+        hardware-specific block transfers.
+        
+        :param array samples: The pre-allocated buffer to receive the samples.
+        :param array stamps: The pre-allocated buffer to receive the time stamps or `None`.
+        :param int rate: The sampling rate in Hz or zero.
+        :param int oversampling: The number of readings to average per sample; positive.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        err = ErrorCode.errOk
+        read = self._readSample
+        period = (1000000 // rate) if (rate > 0) else 0
+        half = oversampling // 2
+        tStart = _ticksUs()
+        for idx in range( len(samples) ):
+            if period > 0:
+                delay = idx * period - _ticksDiff( _ticksUs(), tStart )
+                if delay > 0:
+                    _sleepUs( delay )
+            if stamps is not None:
+                stamps[idx] = _ticksDiff( _ticksUs(), tStart )
+            if oversampling > 1:
+                acc = 0
+                for _ in range( oversampling ):
+                    val, err = read()
+                    acc += val
+                    if not err.isOk():
+                        break
+                val = (acc + half) // oversampling
+            else:
+                val, err = read()
+            if not err.isOk():
+                break
+            samples[idx] = val
+        return err
+
+    def getSamples(self, num, rate=0, oversampling=1, timestamps=False):
+        """Retrieve a burst of samples into a compact buffer.
+
+        Takes `num` samples at the given rate and returns them as an
+        `array("H")` of digital values in the range [0, DIGITAL_MAX].
+        Different from calling :meth:`getDigital` repeatedly, parameters
+        are checked only once and the timing follows fixed deadlines,
+        so that delays in one sample do not shift all the subsequent
+        ones.
+        
+        With `oversampling` greater than one, each sample is the rounded
+        average of that number of readings taken in a row.
+        
+        If `timestamps` is `True`, a second `array("L")` is returned to
+        hold the time of each sample in microseconds, relative to the
+        start of the burst. Otherwise, `None` is returned, instead.
+        
+        :param int num: The number of samples to take; positive.
+        :param int rate: The sampling rate in Hz or zero to sample as fast as possible.
+        :param int oversampling: The number of readings to average per sample; positive.
+        :param bool timestamps: Whether or not to record time stamps.
+        :return: The samples, the time stamps and an error code\
+        indicating either success or the reason of failure.
+        :rtype: array, array, ErrorCode
+        """
+        samples = None
+        stamps = None
+        if not self.isOpen:
+            err = ErrorCode.errResourceConflict
+        elif not isinstance(num, int) or (num < 1) or \
+             not isinstance(rate, int) or (rate < 0) or \
+             not isinstance(oversampling, int) or (oversampling < 1):
+            err = ErrorCode.errInvalidParameter
+        else:
+            samples = array( "H", [0] * num )
+            if timestamps:
+                stamps = array( "L", [0] * num )
+            err = self._readBlock( samples, stamps, rate, oversampling )
+        logging.debug("ADC base> getSamples <%s> returns %s.", num, err)
+        return samples, stamps, err
+
+    def iterSamples(self, num=None, rate=0, oversampling=1):
+        """Iterate over samples taken at the given rate.
+        
+        This is the streaming counterpart of :meth:`getSamples`. It
+        yields `(value, err)` pairs, just like :meth:`getDigital`, but
+        keeps to the deadlines given by the rate. Iteration stops after
+        `num` samples, or after the first error, which is yielded, too.
+        With `num` being `None`, iteration does not end by itself.
+        
+        :param int num: The number of samples to take or `None`.
+        :param int rate: The sampling rate in Hz or zero to sample as fast as possible.
+        :param int oversampling: The number of readings to average per sample; positive.
+        :return: An iterator over values in the range [0, DIGITAL_MAX] and\
+        error codes indicating either success or the reason of failure.
+        :rtype: iterator
+        """
+        if not self.isOpen:
+            yield 0, ErrorCode.errResourceConflict
+        elif ((num is not None) and (not isinstance(num, int) or (num < 0))) or \
+             not isinstance(rate, int) or (rate < 0) or \
+             not isinstance(oversampling, int) or (oversampling < 1):
+            yield 0, ErrorCode.errInvalidParameter
+        else:
+            buf = array( "H", [0] )
+            period = (1000000 // rate) if (rate > 0) else 0
+            idx = 0
+            tStart = _ticksUs()
+            while (num is None) or (idx < num):
+                if period > 0:
+                    delay = idx * period - _ticksDiff( _ticksUs(), tStart )
+                    if delay > 0:
+                        _sleepUs( delay )
+                err = self._readBlock( buf, None, 0, oversampling )
+                yield buf[0], err
+                if not err.isOk():
+                    break
+                idx += 1
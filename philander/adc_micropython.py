@@ -123,3 +123,13 @@ class _ADC_Micropython( ADC ):
             err = ErrorCode.errOk
         return val, err
 
+    def _readSample(self):
+        """Take a single sample without further checks.
+        
+        Also see: :meth:`.ADC._readSample`.
+        
+        :return: A value in the range [0, DIGITAL_MAX] and an error code\
+        indicating either success or the reason of failure.
+        :rtype: int, ErrorCode
+        """
+        return self._adc.read_u16(), ErrorCode.errOk
@@ -47,3 +47,15 @@ class _ADC_Sim( ADC ):
             err = ErrorCode.errResourceConflict
         return val, err
 
+    def _readSample(self):
+        """Take a single sample without further checks.
+        
+        Also see: :meth:`.ADC._readSample`.
+        
+        :return: A value in the range [0, DIGITAL_MAX] and an error code\
+        indicating either success or the reason of failure.
+        :rtype: int, ErrorCode
+        """
+        val = self.simValue & self.DIGITAL_MAX
+        self.simValue = self.simValue + 0x21D
+        return val, ErrorCode.errOk
@@ -14,13 +14,13 @@ import sys
 import time
 
 from philander.accelerometer import Accelerometer, Activity, AxesSign,\
-                            Configuration, Data, EventSource, Orientation,\
-                            SamplingMode, StatusID, Tap
+                            Configuration, Data, EventContext, EventSource,\
+                            Orientation, SamplingMode, StatusID, Tap
 from philander.bma456_reg import BMA456_Reg
 from philander.dictionary import Dictionary
 from philander.gpio import GPIO
-from philander.imath import ispowtwo, iprevpowtwo, vlbs
-from philander.interruptable import Event, EventContextControl, Interruptable
+from philander.imath import ispowtwo
+from philander.interruptable import Event, Interruptable
 from philander.sensor import CalibrationType, ConfigItem, Info, SelfTest
 from philander.serialbus import SerialBusDevice
 from philander.simBMA456 import SimDevBMA456
@@ -401,6 +401,16 @@ class BMA456( BMA456_Reg, SerialBusDevice, Accelerometer, Interruptable ):
     
         return ret
 
+    def _createEventContext(self):
+        return EventContext()
+
+    def _captureEventStatus(self, event):
+        # Retrieving the interrupt status resets all bits in these registers!
+        # Both status registers are read in one go.
+        del event
+        data, ret = self.readWordRegister( BMA456.BMA456_REG_INT_STATUS )
+        return data, data, ret
+
     def _accelEvtSrc2bmaMap( self, evtSrc ):
         """For a given event source, get the corresponding interrupt map.
         
@@ -893,7 +903,8 @@ class BMA456( BMA456_Reg, SerialBusDevice, Accelerometer, Interruptable ):
         That's why, it may be meaningful/necessary to call this method
         repeatedly, until all reasons were reported. Upon its first
         call after an event, the context's :attr:`.interruptable.EventContext.control`
-        attribute must be set to :attr:`.interruptable.EventContextControl.evtCtxtCtrl_getFirst`.
+        attribute must be set to :attr:`.interruptable.EventContextControl.getFirst`.
+        The interrupt status is read just once, upon that first call.
         Upon subsequent calls, this attribute should not be changed by
         the caller, anymore. In generally, event context information is
         retrieved in the order according to the priority of the
@@ -929,36 +940,8 @@ class BMA456( BMA456_Reg, SerialBusDevice, Accelerometer, Interruptable ):
         elif( event == Event.evtNone ):
             ret = ErrorCode.errFewData
         elif( (event == Event.evtInt1) or (event == Event.evtInt2) ):
-            ret = ErrorCode.errOk
-            # Retrieving the interrupt status resets all bits in these registers!
-            if( context.control == EventContextControl.evtCtxtCtrl_clearAll ):
-                _, ret = self.readWordRegister( BMA456.BMA456_REG_INT_STATUS )
-                context.remainInt = 0;
-                context.source = EventSource.none
-            else:
-                if (context.control == EventContextControl.evtCtxtCtrl_getFirst):
-                    data, ret = self.readWordRegister( BMA456.BMA456_REG_INT_STATUS )
-                    context.remainInt = data
-                    context.control = EventContextControl.evtCtxtCtrl_getNext
-                elif (context.control == EventContextControl.evtCtxtCtrl_getLast):
-                    data, ret = self.readWordRegister( BMA456.BMA456_REG_INT_STATUS )
-                    context.remainInt = data
-                    context.control = EventContextControl.evtCtxtCtrl_getPrevious
-                if (ret == ErrorCode.errOk):
-                    if (context.remainInt == 0):
-                        ret = ErrorCode.errFewData
-                    else:
-                        data16 = context.remainInt
-                        if (context.control == EventContextControl.evtCtxtCtrl_getNext):
-                            # Find value of highest bit:
-                            data16 = iprevpowtwo( data16 )
-                        else:
-                            # Find (value of) least bit set:
-                            data16 = vlbs(data16)
-                        ret = self._fillEventContext( data16, context )
-                        context.remainInt &= ~data16
-                        if ((ret == ErrorCode.errOk) and (context.remainInt != 0) ):
-                            ret = ErrorCode.errMoreData
+            context.source = EventSource.none
+            ret = self._getEventContextFromStatus( event, context )
         else:
             ret = ErrorCode.errInvalidParameter
         return ret;
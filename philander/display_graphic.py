@@ -345,6 +345,8 @@ class GraphicDisplay(TextDisplay):
             ret = self.goToPixel( 0, 0 )
         if ret.isOk():
             ret = self._drvClearScreen()
+        if ret.isOk():
+            self._resetShadow( 0x20 )
         return ret
 
     def setFont( self, font ):
@@ -405,6 +407,8 @@ class GraphicDisplay(TextDisplay):
             elif code == 12:    # Form feed
                 ret = self.goToChar( 0, 0 )
             else:
+                # Ink may blend the character with the background
+                self._invalidateShadow()
                 ret = self._drvPrintChar(code)
                 # Update virtual cursor position to place next character at
                 if ret.isOk():
@@ -585,6 +589,7 @@ class GraphicDisplay(TextDisplay):
         :return: An error code indicating either success or the reason of failure.
         :rtype: ErrorCode
         """
+        self._invalidateShadow()
         return self._drvDrawBox(width, height, color)
         
     def drawPixel( self, x, y, color ):
@@ -822,6 +827,7 @@ class GraphicDisplay(TextDisplay):
         :return: An error code indicating either success or the reason of failure.
         :rtype: ErrorCode
         """
+        self._invalidateShadow()
         return self._drvDrawImage( image )
 
     def scrollHstart( self, direction, start_row, end_row,
@@ -837,6 +843,7 @@ class GraphicDisplay(TextDisplay):
         :return: An error code indicating either success or the reason of failure.
         :rtype: ErrorCode
         """
+        self._invalidateShadow()
         return self._drvScrollHstart( direction, start_row, end_row,
                                       start_col, end_col, scroll_step )
  
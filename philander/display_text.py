@@ -101,6 +101,11 @@ class TextDisplay(Display):
 
     DEFAULT_TAB_SIZE    = 4  # tab size in characters
     
+    # Number of unchanged characters, that may be bridged when merging
+    # two adjacent runs of changed characters in a shadow update.
+    # Re-writing a few characters is cheaper than re-addressing.
+    SHADOW_RUN_GAP      = 2
+    
     def __init__(self):
         super().__init__()
         # Derived attributes
@@ -118,7 +123,12 @@ class TextDisplay(Display):
         self._font = None
         self._widthChar  = 0    # Horizontal screen width in characters
         self._heightChar = 0    # Vertical screen height in characters
-
+        self._shadow = []       # Character codes per line as shown on the screen
+        self._numUserChars = 0  # Number of user-definable characters, codes 0...n-1
+        self._glyphs = {}       # Custom glyph data by name
+        self._glyphSlots = []   # Glyph name per user character slot
+        self._glyphLoaded = []  # Glyph data as loaded into each slot
+        self._glyphLRU = []     # Slots in order of use, least recently used first
         
     #############################
     # Module API
@@ -312,10 +322,120 @@ class TextDisplay(Display):
         del code
         return ErrorCode.errNotImplemented
 
+    def _drvPrintString( self, data ):
+        """Print a run of characters starting at the internal ``current position``.
+        
+        The characters are placed consecutively in the current line.
+        Control codes are not interpreted and the screen-full policy
+        does not apply. The caller makes sure, that the run fits into
+        the current line.
+        
+        Implementations are encouraged to write the whole run with one
+        bulk transfer. This default implementation falls back to
+        printing the characters one by one.
+        
+        :param bytes data: The character codes to print.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        for idx in range( len(data) ):
+            if idx > 0:
+                ret = self.goByChar( 1, 0 )
+            if ret.isOk():
+                ret = self._drvPrintChar( data[idx] )
+            if not ret.isOk():
+                break
+        return ret
+
+    def _drvSetUserChar( self, code, data ):
+        """Define the appearance of a user-definable character.
+        
+        The glyph data is given row by row, one integer per row.
+        The pixels of a row are represented by the least significant
+        bits, the MSB of these bits being the leftmost pixel.
+        
+        Implementations must leave the internal ``current position``
+        unchanged, so subsequent printing is not affected.
+        
+        :param int code: The character code to re-define, 0...n-1.
+        :param bytes data: The glyph data, one byte per row.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        del code, data
+        return ErrorCode.errNotSupported
+
     #
     # Non-public helper methods
     #
 
+    def _resetShadow(self, code):
+        """Fill the shadow buffer with the given character code.
+        
+        The shadow buffer keeps the character codes as currently shown
+        on the screen, line by line. It is (re-)allocated to match the
+        current screen size.
+        
+        :param int code: Character code to fill all cells with.
+        :return: none
+        :rtype: None
+        """
+        width = int( self._widthChar )
+        self._shadow = [bytearray( [code] * width ) for _ in range( int(self._heightChar) )]
+        return None
+
+    def _invalidateShadow(self):
+        """Mark the whole shadow buffer as unknown.
+        
+        An unknown line is re-written completely on the next update.
+        """
+        self._shadow = []
+        return None
+
+    def _shadowPut(self, x, y, code):
+        """Record a single character printed at the given position.
+        """
+        if (0 <= y < len(self._shadow)) and (self._shadow[y] is not None):
+            line = self._shadow[y]
+            if isinstance( code, int ) and (0 <= code <= 0xFF) and \
+                (0 <= x < len(line)):
+                line[x] = code
+            else:
+                self._shadow[y] = None
+        return None
+
+    @classmethod
+    def _diffRuns(cls, old, new, gap):
+        """Find the runs of changed characters.
+        
+        Compares the new content with the old one and returns a list of
+        ``(start, end)`` index tuples, each marking a run of characters
+        to be re-written. Runs separated by no more than ``gap`` unchanged
+        characters are merged into one.
+        
+        :param old: The current content, or ``None`` if unknown.
+        :param new: The new content. Must not be longer than ``old``.
+        :param int gap: Number of unchanged characters to bridge.
+        :return: The list of runs.
+        :rtype: list(tuple(int, int))
+        """
+        runs = []
+        start = -1
+        last = -1
+        for idx in range( len(new) ):
+            if (old is None) or (old[idx] != new[idx]):
+                if (start >= 0) and (idx - last - 1 <= gap):
+                    last = idx
+                else:
+                    if start >= 0:
+                        runs.append( (start, last+1) )
+                    start = idx
+                    last = idx
+        if start >= 0:
+            runs.append( (start, last+1) )
+        return runs
+
     def _updateLineFeed(self):
         ret = ErrorCode.errOk
     
@@ -332,6 +452,7 @@ class TextDisplay(Display):
                 self.goToChar(0, 0)
                 # Do something special
             if (self._screenPolicy == self.SCREEN_POLICY_SCROLL):
+                self._invalidateShadow()
                 ret = self._drvScrolLV(1)
                 # Go to the beginning of the row that should be replaced
                 self.goToChar(0, self._currentY)
@@ -585,6 +706,10 @@ class TextDisplay(Display):
             ret = self.goToChar( 0, 0 )
         if ret.isLight():
             ret = self._drvClearScreen()
+        if ret.isOk():
+            self._resetShadow( 0x20 )
+        else:
+            self._invalidateShadow()
         return ret
     
     def getFont(self, name=""):
@@ -614,7 +739,10 @@ class TextDisplay(Display):
         if not isinstance( font, Font ):
             ret = ErrorCode.errInvalidParameter
         else:
+            width, height = self._widthChar, self._heightChar
             ret = self._drvSetFont(font)
+            if (width != self._widthChar) or (height != self._heightChar):
+                self._invalidateShadow()
         if ret.isOk():
             self._font = font
         return ret
@@ -758,7 +886,10 @@ class TextDisplay(Display):
                 ret = self._drvPrintChar(code)
                 # Update virtual cursor position to place next character at
                 if ret.isOk():
+                    self._shadowPut( self._currentX, self._currentY, code )
                     ret = self._updateNextChar()
+                else:
+                    self._shadowPut( self._currentX, self._currentY, None )
         return ret
 
     def printString( self, string ):
@@ -784,3 +915,157 @@ class TextDisplay(Display):
                 break
         return ret
 
+    def updateText( self, x, y, string ):
+        """Bring the given text onto the screen, re-writing changed characters, only.
+        
+        The text is placed at the given position in one line. It is
+        cut off at the end of that line. Control codes are not
+        interpreted and the screen-full policy does not apply.
+        
+        Other than :meth:`printString`, this method compares the text
+        with the current screen content as remembered by an internal
+        shadow buffer. Only the runs of characters that actually changed
+        are sent to the display, each with one re-positioning and one
+        bulk write. So, redrawing mostly unchanged content is cheap.
+        
+        Note that the internal ``current position`` is not maintained.
+        Call :meth:`goToChar` before continuing with :meth:`printChar`
+        or :meth:`printString`.
+        
+        Also see: :meth:`updateScreen`
+        
+        :param int x: The horizontal start position, given in characters.
+        :param int y: The line to place the text in.
+        :param string: The text to show. Either a string or the character codes as bytes.
+        :type string: str or bytes
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        width = int( self._widthChar )
+        if( self._font is None ):
+            ret = ErrorCode.errInadequate
+        elif (x < 0) or (x >= width) or (y < 0) or (y >= int(self._heightChar)):
+            ret = ErrorCode.errSpecRange
+        else:
+            if isinstance( string, str ):
+                data = string.encode()
+            else:
+                data = bytes( string )
+            data = data[:width-x]
+            if len(self._shadow) != int(self._heightChar):
+                self._shadow = [None] * int(self._heightChar)
+            line = self._shadow[y]
+            old = None if line is None else line[x:x+len(data)]
+            for start, end in self._diffRuns( old, data, self.SHADOW_RUN_GAP ):
+                ret = self.goToChar( x+start, y )
+                if ret.isOk():
+                    ret = self._drvPrintString( data[start:end] )
+                if not ret.isOk():
+                    self._shadow[y] = None
+                    break
+                if line is not None:
+                    line[x+start:x+end] = data[start:end]
+            if ret.isOk() and (line is None) and (x == 0) and (len(data) == width):
+                self._shadow[y] = bytearray( data )
+        return ret
+
+    def defineGlyph( self, name, data ):
+        """Register a custom glyph, such as a battery icon or a bar graph segment.
+        
+        Any number of glyphs can be registered. The hardware, however,
+        may provide just a handful of user-definable characters.
+        So, glyphs are not transferred to the display, yet. Instead,
+        this happens on demand, when calling :meth:`getGlyphCode`.
+        
+        Re-defining a glyph with the same name replaces its data. A
+        glyph currently loaded will be updated with its next use.
+        
+        :param str name: The name to identify the glyph.
+        :param bytes data: The glyph data, one byte per row. Also see :meth:`_drvSetUserChar`.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        if (self._numUserChars < 1):
+            ret = ErrorCode.errNotSupported
+        elif not name or not isinstance( data, (bytes, bytearray, list, tuple) ) or \
+            (len(data) < 1):
+            ret = ErrorCode.errInvalidParameter
+        else:
+            self._glyphs[name] = bytes( data )
+        return ret
+
+    def getGlyphCode( self, name ):
+        """Retrieve the character code to print the given glyph.
+        
+        The glyph must have been registered by :meth:`defineGlyph`,
+        before. If it is not loaded into one of the user-definable
+        characters, yet, the least recently used one is replaced.
+        The display is written only if the data of that character
+        actually changes.
+        
+        The code returned is valid until the glyph is evicted by
+        subsequent calls to this method. Note that evicting a glyph
+        changes the appearance of all characters on the screen showing
+        that code. So, all glyphs needed for one screen should be
+        retrieved at once, right before updating the screen.
+        
+        :param str name: The name of the glyph.
+        :return: The character code and an error code indicating either success or the reason of failure.
+        :rtype: Tuple( int, ErrorCode)
+        """
+        code, ret = 0, ErrorCode.errOk
+        if not name in self._glyphs:
+            ret = ErrorCode.errInvalidParameter
+        else:
+            if len(self._glyphSlots) != self._numUserChars:
+                self._glyphSlots = [None] * self._numUserChars
+                self._glyphLoaded = [None] * self._numUserChars
+                self._glyphLRU = list( range(self._numUserChars) )
+            data = self._glyphs[name]
+            if name in self._glyphSlots:
+                code = self._glyphSlots.index( name )
+            else:
+                code = self._glyphLRU[0]
+            if self._glyphLoaded[code] != data:
+                ret = self._drvSetUserChar( code, data )
+                if ret.isOk():
+                    self._glyphLoaded[code] = data
+                else:
+                    self._glyphLoaded[code] = None
+            if ret.isOk():
+                self._glyphSlots[code] = name
+                self._glyphLRU.remove( code )
+                self._glyphLRU.append( code )
+        return code, ret
+
+    def updateScreen( self, lines ):
+        """Bring the given lines of text onto the screen, re-writing changed characters, only.
+        
+        Each string is shown in its own line, starting with the top
+        line. Lines are padded with spaces or cut off to fit the screen
+        width. Lines not given are cleared.
+        
+        This is the method of choice for status screens that are
+        redrawn periodically, while only small parts actually change.
+        
+        Also see: :meth:`updateText`
+        
+        :param lines: The lines of text to show.
+        :type lines: list(str) or list(bytes)
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        width = int( self._widthChar )
+        for y in range( int(self._heightChar) ):
+            text = lines[y] if y < len(lines) else b""
+            if isinstance( text, str ):
+                text = text.encode()
+            text = bytes( text[:width] ) + b" " * (width - len(text))
+            ret = self.updateText( 0, y, text )
+            if not ret.isOk():
+                break
+        return ret
+
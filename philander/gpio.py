@@ -6,7 +6,7 @@ system.
 """
 __author__ = "Oliver Maye"
 __version__ = "0.2"
-__all__ = ["GPIO"]
+__all__ = ["GPIO", "GPIOGroup"]
 
 import logging
 import time
@@ -90,12 +90,14 @@ class GPIO( Module, Interruptable ):
         self._dictLevel = {}
         self._dictPull = {}
         self._dictTrigger = {}
+        self._counting = False
         self._lastEventTime = 0
         self._pin = None
         self._softDebounce = True
         self.bounce = GPIO.BOUNCE_NONE
         self.designator = None
         self.direction = GPIO.DIRECTION_OUT
+        self.edgeCount = 0
         self.inverted = False
         self.isIntEnabled = False
         self.isOpen = False
@@ -108,6 +110,10 @@ class GPIO( Module, Interruptable ):
     # Interrupt handling routine called by the underlying implementation 
     # upon a gpio interrupt occurrence.
     # Inform registrants by firing an event.
+    # The software de-bouncing done here is just a fallback for
+    # implementations that cannot de-bounce closer to the hardware. These
+    # should clear the _softDebounce flag.
+    # In counter mode, edges are just counted, see enableCounter().
     #
     # :param handin: Parameter as provided by the underlying implementation
     # :type handin: implementation-specific 
@@ -117,7 +123,12 @@ class GPIO( Module, Interruptable ):
             now = time.time() * 1000
             if (now - self._lastEventTime) > self.bounce: 
                 self._lastEventTime = now
-                self._fire(GPIO.EVENT_DEFAULT, handin)
+                if self._counting:
+                    self.edgeCount += 1
+                else:
+                    self._fire(GPIO.EVENT_DEFAULT, handin)
+        elif self._counting:
+            self.edgeCount += 1
         else:
             self._fire(GPIO.EVENT_DEFAULT, handin)
         return None
@@ -197,8 +208,10 @@ class GPIO( Module, Interruptable ):
         :rtype: ErrorCode
         """
         ret = ErrorCode.errOk
-        # Retrieve defaults
+        # Retrieve defaults, depending on the direction requested
         defaults = {}
+        if "gpio.direction" in paramDict:
+            defaults["gpio.direction"] = paramDict["gpio.direction"]
         self.Params_init(defaults)
         # Scan parameters
         self.designator = paramDict.get("gpio.pinDesignator", None)
@@ -300,6 +313,39 @@ class GPIO( Module, Interruptable ):
         logging.debug("GPIO.disableInterrupt() #%s returns %s.", self.designator, ret)
         return ret
 
+    def enableCounter(self, activate=True):
+        """Switches counting of interrupt edges on or off.
+        
+        In counter mode, interrupt edges do not fire events. Instead,
+        they just increment the :attr:`edgeCount` attribute, which is
+        reset upon activation. Implementations that receive several
+        edges per wake-up add them in one go. So, no Python handler is
+        called per edge. The interrupt must be enabled, separately.
+        
+        :param bool activate: True to start counting, False to return\
+        to firing events.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        if not self.isOpen:
+            ret = ErrorCode.errResourceConflict
+        else:
+            if activate and not self._counting:
+                self.edgeCount = 0
+            self._counting = activate
+        return ret
+
+    def disableCounter(self):
+        """Stops counting interrupt edges and returns to firing events.
+        
+        Also see: :meth:`enableCounter`.
+        
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        return self.enableCounter( False )
+
     def get(self):
         """Retrieve the pin level.
 
@@ -329,3 +375,115 @@ class GPIO( Module, Interruptable ):
             del newLevel
             ret = ErrorCode.errNotImplemented
         return ret
+
+    @staticmethod
+    def _setMultiple(pins, levels):
+        """Sets several pins of the same implementation at once.
+        
+        This is a helper for :class:`GPIOGroup`. The default
+        implementation sets one pin after the other. Implementations
+        supporting bulk access to several lines should override it.
+        
+        :param list pins: The GPIO instances to set.
+        :param list levels: The new levels, one for each pin.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        for pin, level in zip( pins, levels ):
+            err = pin.set( level )
+            if ret.isOk():
+                ret = err
+        return ret
+
+    @staticmethod
+    def _getMultiple(pins):
+        """Retrieves the levels of several pins of the same implementation.
+        
+        This is a helper for :class:`GPIOGroup`. The default
+        implementation reads one pin after the other. Implementations
+        supporting bulk access to several lines should override it.
+        
+        :param list pins: The GPIO instances to read.
+        :return: The levels of the pins and an error code indicating\
+        either success or the reason of failure.
+        :rtype: list, ErrorCode
+        """
+        levels = [pin.get() for pin in pins]
+        return levels, ErrorCode.errOk
+
+
+class GPIOGroup():
+    """A set of GPIO pins to be read or written as a bit mask.
+    
+    Bit #0 of a mask corresponds to the first pin, bit #1 to the
+    second and so on. If all pins share the same implementation, the
+    group delegates to that implementation's bulk access, e.g. to write
+    all lines in a single call. Otherwise, the pins are accessed one
+    after the other.
+    
+    Currently, bulk writing is supported with RPi.GPIO, only. The
+    periphery and gpiozero libraries request each line on its own and
+    offer no call to set several lines at once. So, their pins are
+    set one after the other, too.
+    
+    The pins must be opened and closed by the caller.
+    """
+    
+    def __init__(self, pins=None):
+        """Initialize the instance.
+        
+        :param list pins: The GPIO instances to group, or None.
+        """
+        self.pins = list( pins ) if pins else []
+    
+    def _getImpl(self, pins):
+        # The implementation class to do bulk access for these pins.
+        impl = type( pins[0] ) if pins else GPIO
+        for pin in pins:
+            if type( pin ) is not impl:
+                impl = GPIO
+                break
+        return impl
+    
+    def write(self, value, mask=None):
+        """Sets the pins according to the given bit mask.
+        
+        Only the pins selected by the ``mask`` parameter are touched.
+        Bits set in ``value`` are output as :attr:`GPIO.LEVEL_HIGH`,
+        cleared bits as :attr:`GPIO.LEVEL_LOW`.
+        
+        :param int value: The bit pattern to output.
+        :param int mask: The pins to set, or None to set all of them.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        if not self.pins:
+            ret = ErrorCode.errNotInited
+        else:
+            if mask is None:
+                mask = (1 << len(self.pins)) - 1
+            pins = [pin for idx, pin in enumerate( self.pins ) if (mask >> idx) & 1]
+            levels = [GPIO.LEVEL_HIGH if (value >> idx) & 1 else GPIO.LEVEL_LOW \
+                      for idx in range( len(self.pins) ) if (mask >> idx) & 1]
+            if pins:
+                ret = self._getImpl( pins )._setMultiple( pins, levels )
+        return ret
+    
+    def read(self):
+        """Retrieves the levels of all pins as a bit mask.
+        
+        :return: The bit pattern of the pin levels and an error code\
+        indicating either success or the reason of failure.
+        :rtype: int, ErrorCode
+        """
+        value = 0
+        if not self.pins:
+            err = ErrorCode.errNotInited
+        else:
+            levels, err = self._getImpl( self.pins )._getMultiple( self.pins )
+            for idx, level in enumerate( levels ):
+                if level == GPIO.LEVEL_HIGH:
+                    value |= (1 << idx)
+        return value, err
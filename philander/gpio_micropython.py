@@ -47,7 +47,12 @@ class _GPIO_Micropython( GPIO ):
             now = time.ticks_ms()
             if time.ticks_diff(now, self._lastEventTime) > self.bounce:
                 self._lastEventTime = now
-                self._fire(GPIO.EVENT_DEFAULT, handin)
+                if self._counting:
+                    self.edgeCount += 1
+                else:
+                    self._fire(GPIO.EVENT_DEFAULT, handin)
+        elif self._counting:
+            self.edgeCount += 1
         else:
             self._fire(GPIO.EVENT_DEFAULT, handin)
         return None
@@ -71,7 +76,7 @@ class _GPIO_Micropython( GPIO ):
         ret = super().open( paramDict )
         if ret.isOk():
             # Retrieve defaults
-            defaults = {}
+            defaults = {"gpio.direction": self.direction}
             self.Params_init(defaults)
 
             if self.direction == GPIO.DIRECTION_IN:
@@ -15,8 +15,16 @@ from philander.systypes import ErrorCode
 
 class _GPIO_Periphery( GPIO ):
     """Implementation of the GPIO abstract interface for the periphery lib.
+    
+    Edge events are queued by the kernel together with their time stamps.
+    Upon each wake-up, all pending events are read in one go and
+    de-bouncing is done based on the kernel time stamps, rather than on
+    the time of delivery to Python.
     """
     
+    # Maximum number of edge events to read per wake-up
+    EVENT_BATCH_MAX = 16
+    
     def __init__(self):
         """Initialize the instance with defaults.
         """
@@ -42,18 +50,38 @@ class _GPIO_Periphery( GPIO ):
         self._workerDone = False
         self.chippath = None
         self.pin = None
+        self._softDebounce = False
         self.provider = SysProvider.PERIPHERY
 
 
+    # Read all edge events queued so far, up to EVENT_BATCH_MAX.
+    def _readEvents(self):
+        events = []
+        while len(events) < _GPIO_Periphery.EVENT_BATCH_MAX:
+            events.append( self.pin.read_event() )
+            if not self.pin.poll(0):
+                break
+        return events
+
+    # Consume the queued edge events and fire one event per edge, that
+    # is not a bounce. Time stamps are given by the kernel in ns.
+    # In counter mode, the whole batch is added to the count, instead.
     def _callback(self, handin):
-        if self._softDebounce and (self._bounce > 0):
-            evt = self.pin.read_event()
-            now = evt.timestamp / 1000000
-            if (now - self._lastEventTime) > self._bounce: 
-                self._lastEventTime = now
-                self._fire(GPIO.EVENT_DEFAULT, handin)
+        events = self._readEvents()
+        if self.bounce > 0:
+            num = 0
+            for evt in events:
+                now = evt.timestamp / 1000000
+                if (now - self._lastEventTime) > self.bounce: 
+                    self._lastEventTime = now
+                    num += 1
+        else:
+            num = len( events )
+        if self._counting:
+            self.edgeCount += num
         else:
-            self._fire(GPIO.EVENT_DEFAULT, handin)
+            for _ in range( num ):
+                self._fire(GPIO.EVENT_DEFAULT, handin)
         return None
 
     # Thread working loop to poll for the pin state triggering an
@@ -123,7 +151,7 @@ class _GPIO_Periphery( GPIO ):
             ret = super().open( paramDict )
         if ret.isOk():
             # Retrieve defaults
-            defaults = {}
+            defaults = {"gpio.direction": self.direction}
             self.Params_init(defaults)
             self.chippath = paramDict.get("gpio.chippath", defaults["gpio.chippath"])
             if self.numScheme == GPIO.PINNUMBERING_BCM:
@@ -73,7 +73,7 @@ class _GPIO_RPi( GPIO ):
             ret = super().open( paramDict )
         if ret.isOk():
             # Retrieve defaults
-            defaults = {}
+            defaults = {"gpio.direction": self.direction}
             self.Params_init(defaults)
 
             # With RPi.GPIO, it may happen that abandoned references to instances
@@ -208,3 +208,23 @@ class _GPIO_RPi( GPIO ):
             RPiGPIO.output( self.designator, self._dictLevel[newLevel] )
             ret = ErrorCode.errOk
         return ret
+
+    @staticmethod
+    def _setMultiple(pins, levels):
+        """Sets several pins at once.
+        
+        Uses the list form of ``RPi.GPIO.output()`` to write all lines
+        in a single call.
+        
+        :param list pins: The GPIO instances to set.
+        :param list levels: The new levels, one for each pin.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        if [pin for pin in pins if not pin.isOpen]:
+            ret = ErrorCode.errResourceConflict
+        else:
+            RPiGPIO.output( [pin.designator for pin in pins],
+                            [pin._dictLevel[level] for pin, level in zip( pins, levels )] )
+        return ret
@@ -88,7 +88,7 @@ class _GPIO_Sim( GPIO ):
             ret = super().open( paramDict )
         if ret.isOk():
             # Retrieve defaults
-            defaults = {}
+            defaults = {"gpio.direction": self.direction}
             self.Params_init(defaults)
 
             if self.direction == GPIO.DIRECTION_OUT:
@@ -56,7 +56,7 @@ class _GPIO_Zero( GPIO ):
             ret = super().open( paramDict )
         if ret.isOk():
             # Retrieve defaults
-            defaults = {}
+            defaults = {"gpio.direction": self.direction}
             self.Params_init(defaults)
 
             if self.numScheme == GPIO.PINNUMBERING_BOARD:
@@ -96,10 +96,16 @@ class HTU21D( Sensor, SerialBusDevice ):
     MEAS_TIME_MAX_MS_T14    = 50
     RESET_TIME_MAX_MS       = 15
     SELFTEST_TIME_WAIT_S    = 5
+    FETCH_RETRY_MS          = 2
+    FETCH_RETRY_NUM         = 5
     
     def __init__(self):
         self.timeStampLatest = 0
         self.latestData = None
+        self._pendingCmd = None     # Command of the conversion in progress
+        self._pendingDue = 0        # Time when that conversion is finished
+        self._pendingTemp = 0       # Temperature of an on-going measurement
+        self._pendingTries = 0      # Failed attempts to read that conversion
         self.measInterval    = 0  # in seconds
         self.resolution = HTU21D.CNT_USR_RESOLUTION_DEFAULT
         # In MicroPython, super() works only for one/the first superclass,
@@ -239,26 +245,34 @@ class HTU21D( Sensor, SerialBusDevice ):
             time.sleep( 2*HTU21D.RESET_TIME_MAX_MS / 1000 )
             self.timeStampLatest = 0
             self.latestData = None
+            self._pendingCmd = None
             self.resolution = HTU21D.CNT_USR_RESOLUTION_DEFAULT
             ret = Sensor.reset(self)
             self.measInterval = 1 / self.dataRate
         return ret
 
     @classmethod
-    def _getMaxMeasurementTime(cls, resolution):
+    def _getMaxMeasurementTime(cls, resolution, isTemperature=None):
+        # Maximum conversion time in seconds of the humidity and the
+        # temperature, or the larger of both if no quantity is selected.
         if (resolution == HTU21D.CNT_USR_RESOLUTION_RH8_T12):
-            maxTime = max( HTU21D.MEAS_TIME_MAX_MS_RH8, HTU21D.MEAS_TIME_MAX_MS_T12 )
+            hum, temp = HTU21D.MEAS_TIME_MAX_MS_RH8, HTU21D.MEAS_TIME_MAX_MS_T12
         elif (resolution == HTU21D.CNT_USR_RESOLUTION_RH10_T13):
-            maxTime = max( HTU21D.MEAS_TIME_MAX_MS_RH10, HTU21D.MEAS_TIME_MAX_MS_T13 )
+            hum, temp = HTU21D.MEAS_TIME_MAX_MS_RH10, HTU21D.MEAS_TIME_MAX_MS_T13
         elif (resolution == HTU21D.CNT_USR_RESOLUTION_RH11_T11):
-            maxTime = max( HTU21D.MEAS_TIME_MAX_MS_RH11, HTU21D.MEAS_TIME_MAX_MS_T11 )
+            hum, temp = HTU21D.MEAS_TIME_MAX_MS_RH11, HTU21D.MEAS_TIME_MAX_MS_T11
         elif (resolution == HTU21D.CNT_USR_RESOLUTION_RH12_T14):
-            maxTime = max( HTU21D.MEAS_TIME_MAX_MS_RH12, HTU21D.MEAS_TIME_MAX_MS_T14 )
+            hum, temp = HTU21D.MEAS_TIME_MAX_MS_RH12, HTU21D.MEAS_TIME_MAX_MS_T14
         else:
-            maxTime = -1000
+            hum, temp = -1000, -1000
+        if (isTemperature is None):
+            maxTime = max( hum, temp )
+        else:
+            maxTime = temp if isTemperature else hum
         maxTime = maxTime / 1000
         return maxTime
         
+
     def configure(self, configData):
         data, ret = self.readByteRegister( HTU21D.CMD_READ_USR_REG )
         if (ret.isOk()):
@@ -353,22 +367,64 @@ class HTU21D( Sensor, SerialBusDevice ):
         return reading, err
 
 
-    def _getTemperature( self ):
-        temp = 0
-        data, err = self.readBufferRegister( HTU21D.CMD_GET_TEMP_HOLD, 3 )
+    def _trigger( self, isTemperature ):
+        # Start a conversion in no-hold master mode. The bus is released
+        # immediately and can be used by other devices, meanwhile.
+        cmd = HTU21D.CMD_GET_TEMP if isTemperature else HTU21D.CMD_GET_HUM
+        err = self.writeBuffer( [cmd] )
         if (err.isOk()):
-            reading, err = HTU21D._extractReading( data, True )
+            self._pendingCmd = cmd
+            self._pendingDue = time.time() + HTU21D._getMaxMeasurementTime( self.resolution, isTemperature )
+            self._pendingTries = 0
+        else:
+            self._pendingCmd = None
+        return err
+    
+    def _fetch( self, wait=True ):
+        # Read the result of the pending conversion. The chip does not
+        # acknowledge reading before the conversion is finished. So, when
+        # waiting, sleep until it is due and retry a few times. Otherwise,
+        # read just once and report errBusy on failure, keeping the
+        # conversion pending until the retries are used up.
+        data = None
+        err = ErrorCode.errOk
+        if (self._pendingCmd is None):
+            err = ErrorCode.errInadequate
+        elif wait:
+            tDiff = self._pendingDue - time.time()
+            if (tDiff > 0):
+                time.sleep( tDiff )
+            for _ in range( HTU21D.FETCH_RETRY_NUM ):
+                data, err = self.readBuffer( 3 )
+                if (err.isOk()):
+                    break
+                time.sleep( HTU21D.FETCH_RETRY_MS / 1000 )
+            self._pendingCmd = None
+        else:
+            data, err = self.readBuffer( 3 )
+            if (err.isOk()):
+                self._pendingCmd = None
+            else:
+                self._pendingTries += 1
+                if (self._pendingTries < HTU21D.FETCH_RETRY_NUM):
+                    err = ErrorCode.errBusy
+                else:
+                    self._pendingCmd = None
+        return data, err
+    
+    @classmethod
+    def _toTemperature( cls, data ):
+        temp = 0
+        reading, err = HTU21D._extractReading( data, True )
         if (err.isOk()):
             # Transfer function: temp = -46,85 + 175,72*reading/2^16
             temp = reading * 175.72 / 0x10000 - 46.85
         return temp, err
-
     
-    def _getHumidity( self, temp ):
+    @classmethod
+    def _toHumidity( cls, data, temp ):
         hum = 0
-        data, err = self.readBufferRegister( HTU21D.CMD_GET_HUM_HOLD, 3 )
-        if (err.isOk()):
-            reading, err = HTU21D._extractReading( data, False )
+        reading, err = HTU21D._extractReading( data, False )
         if (err.isOk()):
             # RH transfer function: rh = -6 + 125 * reading / 2^16
             hum = reading * 125 / 65536 - 6
@@ -376,6 +432,25 @@ class HTU21D( Sensor, SerialBusDevice ):
             hum = hum + (temp - 25) * 0.15
         return hum, err
 
+    def _getTemperature( self ):
+        temp = 0
+        err = self._trigger( True )
+        if (err.isOk()):
+            data, err = self._fetch()
+        if (err.isOk()):
+            temp, err = HTU21D._toTemperature( data )
+        return temp, err
+
+    
+    def _getHumidity( self, temp ):
+        hum = 0
+        err = self._trigger( False )
+        if (err.isOk()):
+            data, err = self._fetch()
+        if (err.isOk()):
+            hum, err = HTU21D._toHumidity( data, temp )
+        return hum, err
+
     def _getMeasurement( self ):
         measurement = None
         temp, err = self._getTemperature()
@@ -390,6 +465,59 @@ class HTU21D( Sensor, SerialBusDevice ):
                 self.latestData = measurement
         return measurement, err
     
+    def startMeasurement( self ):
+        """Start a measurement without blocking.
+        
+        Triggers the temperature conversion and returns immediately.
+        The I2C bus is not blocked while converting. So, other devices
+        can be serviced in the meantime. Use :meth:`fetchMeasurement`
+        to advance and finally retrieve the measurement.
+        
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        return self._trigger( True )
+    
+    def fetchMeasurement( self ):
+        """Advance a measurement started by :meth:`startMeasurement`.
+        
+        Never waits for a conversion to finish. Instead, returns
+        :attr:`.ErrorCode.errBusy` as long as the measurement is not
+        complete. If the chip does not answer when a conversion is due,
+        this also gives :attr:`.ErrorCode.errBusy`, up to
+        :attr:`FETCH_RETRY_NUM` times, before the read error is returned. Once the temperature is converted, the humidity
+        conversion is triggered. When that is finished, too, the
+        measurement is returned and kept as the latest data.
+        
+        :return: The measurement data object and an error code indicating\
+        either success or the reason of failure.
+        :rtype: Object, ErrorCode
+        """
+        measurement = None
+        if (self._pendingCmd is None):
+            err = ErrorCode.errInadequate
+        elif (time.time() < self._pendingDue):
+            err = ErrorCode.errBusy
+        elif (self._pendingCmd == HTU21D.CMD_GET_TEMP):
+            data, err = self._fetch( False )
+            if (err.isOk()):
+                self._pendingTemp, err = HTU21D._toTemperature( data )
+            if (err.isOk()):
+                err = self._trigger( False )
+            if (err.isOk()):
+                err = ErrorCode.errBusy
+        else:
+            data, err = self._fetch( False )
+            if (err.isOk()):
+                hum, err = HTU21D._toHumidity( data, self._pendingTemp )
+            if (err.isOk()):
+                measurement = Data()
+                measurement.temperature = self._pendingTemp
+                measurement.humidity = hum
+                self.timeStampLatest = time.time()
+                self.latestData = measurement
+        return measurement, err
+    
     def getLatestData( self ):
         """Retrieves the most recent data.
         
@@ -22,14 +22,26 @@ Whenever possible, that context polling should be done outside of the
 handling routine as part of the response action.
 
 :class:`EventContextControl` objects are used to control the order/priority
-of context items while retrieving them from the device. 
+of context items while retrieving them from the device. To simply loop
+over all context items of an event, use :meth:`Interruptable.iterEventContexts`.
+
+By default, handlers are executed synchronously, i.e. in the context of
+the code raising the event. To keep the interrupt latency bounded even
+under handler load, :meth:`Interruptable.startDispatchWorkers` decouples
+handler execution by means of a bounded queue and a pool of worker threads.
 """
 __author__ = "Oliver Maye"
 __version__ = "0.1"
-__all__ = ["Event", "EventContextControl", "EventContext", "Interruptable"]
+__all__ = ["Event", "EventContextControl", "EventContext",\
+           "DispatchStatistics", "Interruptable"]
 
-import pymitter
+import logging
+try:
+    import pymitter
+except ImportError:
+    pymitter = None
 
+from philander.imath import iprevpowtwo, vlbs
 from philander.systypes import ErrorCode
 
 
@@ -66,6 +78,28 @@ class EventContext:
                  remainInt:  int = 0):
         self.control = control
         self.remainInt = remainInt
+        # Raw interrupt status, as captured by _captureEventStatus()
+        self.eventStatus = None
+
+class DispatchStatistics:
+    """Counters describing the work of the queued event dispatcher.
+    
+    See :meth:`Interruptable.getDispatchStatistics`.
+    """
+    
+    def __init__(self,
+                 pending:   int = 0,
+                 processed: int = 0,
+                 coalesced: int = 0,
+                 overflows: int = 0):
+        # Number of events currently waiting in the queue
+        self.pending = pending
+        # Number of events handed over to the handlers
+        self.processed = processed
+        # Number of events merged into a pending event of the same kind
+        self.coalesced = coalesced
+        # Number of events discarded due to a full queue
+        self.overflows = overflows
 
 class Interruptable:
     """Generic interface to describe the capabilities of an event or interrupt source.
@@ -73,11 +107,37 @@ class Interruptable:
     This is an abstract base class to define common methods for enabling and
     disabling events as well as for managing event information of a specific
     device (implementation).
+    
+    Events are dispatched to the registered handlers by a light-weight,
+    built-in dispatcher. It is based on a table, that is re-computed
+    upon each registration, so firing an event just needs a single
+    lookup. To dispatch via ``pymitter``, instead, set the
+    :attr:`DISPATCH_BUILTIN` attribute to ``False``.
+    
+    Optionally, handler execution can be decoupled from firing an event.
+    See :meth:`startDispatchWorkers` for details.
     """
 
+    DISPATCH_BUILTIN = True
+    """Whether to use the built-in dispatcher or ``pymitter``, if available."""
+    
     def __init__(self):
-        self.eventEmitter = pymitter.EventEmitter()
+        self.eventEmitter = pymitter.EventEmitter() if pymitter else None
         self.dictFeedbacks = dict()
+        # Registered (event, handler) pairs, in the order of registration
+        self._registrations = []
+        # Pre-computed event -> (feedback, handlers) map
+        self._dispatchTable = {}
+        self._dispatchAny = (None, ())
+        # Queued dispatch, see startDispatchWorkers()
+        self._dispatchWorkers = []
+        self._dispatchQueue = []
+        self._dispatchQueueSize = 0
+        self._dispatchCoalesce = ()
+        self._dispatchPending = {}      # Queue entries of coalesced events
+        self._dispatchCond = None
+        self._dispatchDone = True
+        self._dispatchStats = DispatchStatistics()
             
     def registerInterruptHandler(self, onEvent=None, callerFeedBack=None, handler=None ):
         """Registers a handling routine for interrupt notification.
@@ -131,54 +191,213 @@ class Interruptable:
         if (onEvent is None) or (onEvent == Event.evtNone):
             if (handler is None):   # Clear all registrations
                 ret = self.disableInterrupt()
-                self.eventEmitter.off_all()
+                self._registrations = []
                 self.dictFeedbacks.clear()
+                if self.eventEmitter:
+                    self.eventEmitter.off_all()
             else:                   # De-register this handler from all events
-                self.eventEmitter.off( Event.evtInt1, handler )
-                if (len(self.eventEmitter.listeners(Event.evtInt1)) < 1) and \
-                   (Event.evtInt1 in self.dictFeedbacks):
-                    self.dictFeedbacks.pop( Event.evtInt1 )
-                self.eventEmitter.off( Event.evtInt2, handler )
-                if (len(self.eventEmitter.listeners(Event.evtInt2)) < 1) and \
-                   (Event.evtInt2 in self.dictFeedbacks):
-                    self.dictFeedbacks.pop( Event.evtInt2 )
-                self.eventEmitter.off_any( handler )
-                if (len(self.eventEmitter.listeners_any()) < 1) and \
-                   (Event.evtAny in self.dictFeedbacks):
-                    self.dictFeedbacks.pop( Event.evtAny )
+                self._registrations = [r for r in self._registrations if r[1] != handler]
+                for evt in list( self.dictFeedbacks.keys() ):
+                    if not self._hasHandlers( evt ):
+                        self.dictFeedbacks.pop( evt )
+                if self.eventEmitter:
+                    self.eventEmitter.off( Event.evtInt1, handler )
+                    self.eventEmitter.off( Event.evtInt2, handler )
+                    self.eventEmitter.off_any( handler )
                 checkLastDisabled = True
-        elif onEvent == Event.evtAny:
-            if (handler is None):   # Clear 'any' registrations
-                for f in self.eventEmitter.listeners_any():
-                    self.eventEmitter.off_any( f )
-                if onEvent in self.dictFeedbacks:
-                    self.dictFeedbacks.pop( onEvent )
-                checkLastDisabled = True
-            else:                   # Register new handler for 'any' event
-                self.eventEmitter.on_any( handler )
-                self.dictFeedbacks[onEvent] = callerFeedBack
-                enableInt = True
         else:
             if (handler is None):   # Clear all registrations for that event
-                for f in self.eventEmitter.listeners(onEvent):
-                    self.eventEmitter.off( onEvent, f )
+                self._registrations = [r for r in self._registrations if r[0] != onEvent]
                 if onEvent in self.dictFeedbacks:
                     self.dictFeedbacks.pop( onEvent )
+                if self.eventEmitter and (onEvent == Event.evtAny):
+                    for f in self.eventEmitter.listeners_any():
+                        self.eventEmitter.off_any( f )
+                elif self.eventEmitter:
+                    for f in self.eventEmitter.listeners(onEvent):
+                        self.eventEmitter.off( onEvent, f )
                 checkLastDisabled = True
             else:                   # Register this handler for that event
-                self.eventEmitter.on( onEvent, handler )
+                self._registrations.append( (onEvent, handler) )
                 self.dictFeedbacks[onEvent] = callerFeedBack
+                if self.eventEmitter and (onEvent == Event.evtAny):
+                    self.eventEmitter.on_any( handler )
+                elif self.eventEmitter:
+                    self.eventEmitter.on( onEvent, handler )
                 enableInt = True
                 
         if checkLastDisabled:     
-            if (len(self.eventEmitter.listeners_all()) < 1):
+            if (len(self._registrations) < 1):
                 self.disableInterrupt()
                 self.dictFeedbacks.clear()
+        self._buildDispatchTable()
         if enableInt:
             ret = self.enableInterrupt()
                 
-        return ret;
+        return ret
 
+    def _hasHandlers(self, event):
+        for evt, _ in self._registrations:
+            if evt == event:
+                return True
+        return False
+    
+    def _buildDispatchTable(self):
+        # Pre-compute the feedback and handlers to call for each event.
+        # Handlers are kept in the order of their registration.
+        anyHandlers = tuple( [h for evt, h in self._registrations if evt == Event.evtAny] )
+        table = {}
+        for event, _ in self._registrations:
+            if (event != Event.evtAny) and not (event in table):
+                handlers = tuple( [h for evt, h in self._registrations if (evt == event) or (evt == Event.evtAny)] )
+                table[event] = (self.dictFeedbacks.get( event ), handlers)
+        table[None] = (None, anyHandlers)
+        table[Event.evtNone] = (None, anyHandlers)
+        self._dispatchTable = table
+        self._dispatchAny = (self.dictFeedbacks.get( Event.evtAny ), anyHandlers)
+        return None
+
+    def startDispatchWorkers(self, numWorkers=1, queueSize=16, coalesce=None):
+        """Decouples the execution of handlers from raising events.
+        
+        After calling this method, :meth:`_fire` just puts the event into
+        a bounded queue and returns immediately. The queue is drained by
+        a pool of ``numWorkers`` threads, which call the registered
+        handlers. So, the time spent in interrupt context no longer
+        depends on the handlers' run time.
+        
+        If the queue is full, the oldest event waiting is discarded in
+        favor of the new one and the overflow counter is incremented.
+        Events listed in ``coalesce`` are not queued twice. Instead, a
+        pending event of the same kind is just updated with the latest
+        arguments. This is useful e.g. for data-ready notifications,
+        where only the most recent occurrence is of interest.
+        
+        Note that with more than one worker, handlers may run
+        concurrently and events may be handled out of order.
+        
+        This feature requires threading support and is not available
+        on MicroPython.
+        
+        :param int numWorkers: The number of worker threads. Must be positive.
+        :param int queueSize: The maximum number of pending events. Must be positive.
+        :param coalesce: The events to coalesce, or None.
+        :type coalesce: list or tuple
+        :return: An error code indicating either success or the reason\
+        of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        if (numWorkers < 1) or (queueSize < 1):
+            ret = ErrorCode.errInvalidParameter
+        elif self._dispatchWorkers:
+            ret = ErrorCode.errResourceConflict
+        else:
+            try:
+                from collections import deque
+                from threading import Condition, Thread
+            except ImportError:
+                ret = ErrorCode.errNotSupported
+            if ret.isOk():
+                self._dispatchQueue = deque( (), queueSize )
+                self._dispatchQueueSize = queueSize
+                self._dispatchCoalesce = tuple( coalesce ) if coalesce else ()
+                self._dispatchPending = {}
+                self._dispatchCond = Condition()
+                self._dispatchDone = False
+                self._dispatchStats = DispatchStatistics()
+                for idx in range( numWorkers ):
+                    worker = Thread( target=self._dispatchLoop,
+                                     name='Dispatcher'+str(idx), daemon=True )
+                    self._dispatchWorkers.append( worker )
+                    worker.start()
+        return ret
+    
+    def stopDispatchWorkers(self):
+        """Returns to executing handlers synchronously.
+        
+        Events still pending in the queue are handled before the workers
+        terminate. Then, this method returns. It must not be called from
+        within a handler.
+        
+        :return: An error code indicating either success or the reason\
+        of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        if self._dispatchWorkers:
+            with self._dispatchCond:
+                self._dispatchDone = True
+                self._dispatchCond.notify_all()
+            for worker in self._dispatchWorkers:
+                worker.join()
+            self._dispatchWorkers = []
+        else:
+            ret = ErrorCode.errInadequate
+        return ret
+    
+    def getDispatchStatistics(self):
+        """Retrieves the counters of the queued event dispatcher.
+        
+        The counters are reset by :meth:`startDispatchWorkers`.
+        
+        :return: A snapshot of the dispatcher's counters.
+        :rtype: DispatchStatistics
+        """
+        stats = self._dispatchStats
+        ret = DispatchStatistics( pending=len( self._dispatchQueue ),
+                                  processed=stats.processed,
+                                  coalesced=stats.coalesced,
+                                  overflows=stats.overflows )
+        return ret
+    
+    def _enqueueEvent(self, event, args):
+        # Put an event into the dispatch queue, coalescing or discarding
+        # entries as necessary. Returns False, if the workers are about
+        # to stop, so that the event would not be handled anymore.
+        with self._dispatchCond:
+            if self._dispatchDone:
+                return False
+            queue = self._dispatchQueue
+            pending = self._dispatchPending
+            if event in pending:
+                pending[event][1] = args
+                self._dispatchStats.coalesced += 1
+                return True
+            if len( queue ) >= self._dispatchQueueSize:
+                # The bounded deque discards the oldest entry on append
+                dropped = queue[0]
+                if pending.get( dropped[0] ) is dropped:
+                    del pending[dropped[0]]
+                self._dispatchStats.overflows += 1
+            entry = [event, args]
+            queue.append( entry )
+            if event in self._dispatchCoalesce:
+                pending[event] = entry
+            self._dispatchCond.notify()
+        return True
+    
+    def _dispatchLoop(self):
+        # Worker thread: Drain the queue, until stopped and empty.
+        cond = self._dispatchCond
+        while True:
+            with cond:
+                while (not self._dispatchQueue) and (not self._dispatchDone):
+                    cond.wait()
+                if not self._dispatchQueue:
+                    break
+                entry = self._dispatchQueue.popleft()
+                event, args = entry
+                if self._dispatchPending.get( event ) is entry:
+                    del self._dispatchPending[event]
+            try:
+                self._dispatch( event, args )
+            except Exception as exc:
+                logging.warning("Interruptable: handler for <%s> failed: %s", event, exc)
+            with cond:
+                self._dispatchStats.processed += 1
+        return None
+    
     def enableInterrupt(self):
         """Enables the interrupt(s) of the implementing device.
 
@@ -251,12 +470,169 @@ class Interruptable:
         """
         return ErrorCode.errNotImplemented
     
+    def iterEventContexts(self, event, context=None):
+        """Iterates over all context items of the given event.
+        
+        This is a convenience wrapper around the call/return protocol
+        of :meth:`getEventContext`. It allows for writing:
+        
+        ``for ctx in device.iterEventContexts( event ):``
+        
+        Note that the same context object is returned on every iteration,
+        just with its content updated. So, the caller should copy the
+        information it wants to keep. The iteration ends after the last
+        context item or as soon as :meth:`getEventContext` fails.
+        
+        :param int event: The original event occurred, as received by the\
+        handling routine.
+        :param EventContext context: The context object to fill. If\
+        ``None``, a new one is created by the implementation.
+        :return: A generator delivering the event context items.
+        :rtype: generator
+        """
+        if context is None:
+            context = self._createEventContext()
+        context.control = EventContextControl.getFirst
+        err = ErrorCode.errMoreData
+        while err == ErrorCode.errMoreData:
+            err = self.getEventContext( event, context )
+            if err.isOk() or (err == ErrorCode.errMoreData):
+                yield context
+    
+    def _createEventContext(self):
+        """Creates an empty event context object.
+        
+        Sub-classes should overwrite this method to return their
+        specific :class:`EventContext` derivative.
+        """
+        return EventContext()
+    
+    def _captureEventStatus(self, event):
+        """Reads all interrupt status information in one go.
+        
+        This is a helper method, meant to be overwritten by derived
+        classes, that implement :meth:`getEventContext` by means of
+        :meth:`_getEventContextFromStatus`. It is called exactly
+        once per event, i.e. upon :attr:`EventContextControl.getFirst`,
+        :attr:`EventContextControl.getLast` or
+        :attr:`EventContextControl.clearAll`. Implementations should
+        retrieve all relevant status registers in a single burst.
+        
+        :param int event: The original event occurred.
+        :return: The bit mask of pending interrupt reasons, the raw\
+        status information to be interpreted later on by\
+        :meth:`_fillEventContext` and an error code indicating either\
+        success or the reason of failure.
+        :rtype: int, object, ErrorCode
+        """
+        del event
+        return 0, None, ErrorCode.errNotImplemented
+    
+    def _fillEventContext(self, singleIntID, context):
+        """Fills the context for a single interrupt reason.
+        
+        This is a helper method, meant to be overwritten by derived
+        classes. The raw status information captured before, is
+        available as ``context.eventStatus``. It is kept with the
+        context, so several contexts may be walked through at a time.
+        
+        :param int singleIntID: The interrupt reason as a single bit.
+        :param EventContext context: The context to fill.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        context.source = singleIntID
+        return ErrorCode.errOk
+    
+    def _getEventPriority(self):
+        """Tells the order, in which interrupt reasons are reported.
+        
+        This is a helper method, meant to be overwritten by derived
+        classes, that must report certain reasons first, regardless of
+        their bit value. Reasons not listed are reported in the order of
+        their bit values, after the listed ones.
+        
+        :return: The interrupt reasons as single bits, most important        first, or None to just order them by their bit values.
+        :rtype: tuple
+        """
+        return None
+    
+    def _getEventContextFromStatus(self, event, context):
+        """Implements the call/return protocol of :meth:`getEventContext`.
+        
+        All interrupt status information is captured by
+        :meth:`_captureEventStatus` upon the first call after an event.
+        Subsequent calls are served from that snapshot without any
+        further communication. Interrupt reasons are delivered in the
+        order given by :meth:`_getEventPriority`, followed by the
+        remaining ones in the order of their bit values. That is,
+        starting with the most important reason or the highest bit for
+        :attr:`EventContextControl.getFirst` and in reverse order for
+        :attr:`EventContextControl.getLast`.
+        
+        This is a helper method, meant to be used by derived classes,
+        only. Parameters must be validated by the caller.
+        """
+        if (context.control == EventContextControl.clearAll):
+            _, _, ret = self._captureEventStatus( event )
+            context.eventStatus = None
+            context.remainInt = 0
+        else:
+            ret = ErrorCode.errOk
+            if (context.control == EventContextControl.getFirst):
+                context.remainInt, context.eventStatus, ret = self._captureEventStatus( event )
+                context.control = EventContextControl.getNext
+            elif (context.control == EventContextControl.getLast):
+                context.remainInt, context.eventStatus, ret = self._captureEventStatus( event )
+                context.control = EventContextControl.getPrevious
+            if (ret.isOk()):
+                if (context.remainInt == 0):
+                    ret = ErrorCode.errFewData
+                else:
+                    forward = (context.control == EventContextControl.getNext)
+                    priority = self._getEventPriority()
+                    if priority:
+                        listed = [intID for intID in priority if context.remainInt & intID]
+                        rest = context.remainInt
+                        for intID in listed:
+                            rest &= ~intID
+                    else:
+                        listed = []
+                        rest = context.remainInt
+                    if forward and listed:
+                        singleIntID = listed[0]
+                    elif forward:
+                        # Find value of highest bit:
+                        singleIntID = iprevpowtwo( rest )
+                    elif rest:
+                        # Find (value of) least bit set:
+                        singleIntID = vlbs( rest )
+                    else:
+                        singleIntID = listed[-1]
+                    ret = self._fillEventContext( singleIntID, context )
+                    context.remainInt &= ~singleIntID
+                    if ((ret.isOk()) and (context.remainInt != 0)):
+                        ret = ErrorCode.errMoreData
+        return ret
+    
     def _fire(self, event, *args):
         """Raise an event.
         
         This is a helper method, meant to be used by derived classes,
         only.
         """
+        # Whether the workers are stopping is checked under the queue lock.
+        if not (self._dispatchWorkers and self._enqueueEvent( event, args )):
+            self._dispatch( event, args )
+        return None
+    
+    def _dispatch(self, event, args):
+        # Call the handlers registered for the given event.
+        if self.DISPATCH_BUILTIN or not self.eventEmitter:
+            fb, handlers = self._dispatchTable.get( event, self._dispatchAny )
+            for handler in handlers:
+                handler( fb, *args )
+            return None
         if (event in self.dictFeedbacks):
             fb = self.dictFeedbacks[event]
         elif (not(event is None)) and (event != Event.evtNone) and (Event.evtAny in self.dictFeedbacks):
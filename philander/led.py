@@ -4,33 +4,189 @@ __author__ = "Oliver Maye"
 __version__ = "0.1"
 __all__ = ["LED"]
 
-import time, logging
+import heapq, logging, math, time
 
 from .gpio import GPIO
 from .module import Module
+from .pwm import PWM
 from .sysfactory import SysProvider
 from .systypes import ErrorCode
 
 
+class _BlinkJob():
+    """A blinking curve in progress, as driven by the :class:`_BlinkScheduler`.
+    """
+    
+    def __init__(self, led, curve, step, tick, stepsLeft):
+        self.led = led
+        self.curve = curve
+        # Duration of a single curve item in seconds
+        self.step = step
+        # Number of the next step, counted from the scheduler's epoch
+        self.tick = tick
+        # Index of the next curve item, counted from the start of blinking
+        self.index = 0
+        # Number of remaining steps or None for infinite blinking
+        self.stepsLeft = stepsLeft
+        self.done = False
+
+
+class _BlinkScheduler():
+    """Shared timing engine to drive the blinking curves of all LEDs.
+    
+    A single thread works off a heap of deadlines, sorted by time. All
+    deadlines are derived from a common epoch, so LEDs blinking at the
+    same rate switch at the same moments and do not drift. Still, each
+    curve is played from its first item, as the first deadline is just
+    rounded up to the epoch grid. Deadlines falling
+    together are handled in one wake-up. The thread is started on demand
+    and terminates as soon as no LED is blinking anymore.
+    
+    LEDs are set without holding the lock, so slow hardware access does
+    not block starting or stopping other LEDs.
+    """
+    
+    # Deadlines closer than that [s] are merged into the same wake-up.
+    SLACK = 0.001
+    
+    def __init__(self):
+        self.epoch = None
+        self._heap = []
+        self._seq = 0
+        self._cond = None
+        self._worker = None
+        # The job whose LED is being set just now, outside the lock
+        self._active = None
+        
+    def add(self, led, curve, cycle_length, num_cycles):
+        """Starts blinking an LED.
+        
+        Any blinking curve previously active on that LED is stopped.
+        
+        :param LED led: The LED to drive.
+        :param list curve: The brightness values of one cycle.
+        :param float cycle_length: The duration of one cycle in seconds.
+        :param int num_cycles: The number of cycles or None for infinite blinking.
+        :return: None
+        :rtype: None
+        """
+        if self._cond is None:
+            from threading import Condition
+            self._cond = Condition()
+            self.epoch = time.monotonic()
+        step = cycle_length / len( curve )
+        tick = math.ceil( (time.monotonic() - self.epoch) / step )
+        stepsLeft = None if (num_cycles is None) else num_cycles * len( curve )
+        job = _BlinkJob( led, curve, step, tick, stepsLeft )
+        with self._cond:
+            if led._blinkJob:
+                led._blinkJob.done = True
+            led._blinkJob = job
+            self._push( job )
+            if self._worker is None:
+                from threading import Thread
+                self._worker = Thread( target=self._loop, name='Blinker', daemon=True )
+                self._worker.start()
+            self._cond.notify()
+        return None
+    
+    def remove(self, led):
+        """Stops blinking an LED.
+        
+        Does not wait for the scheduler thread. When this method returns,
+        the LED is not touched by the scheduler anymore.
+        
+        :param LED led: The LED to stop.
+        :return: None
+        :rtype: None
+        """
+        if self._cond:
+            with self._cond:
+                if led._blinkJob:
+                    led._blinkJob.done = True
+                    led._blinkJob = None
+                # Let a step in progress finish, so it doesn't override
+                # what the caller sets next.
+                while self._active and (self._active.led is led):
+                    self._cond.wait()
+        return None
+    
+    def _push(self, job):
+        self._seq += 1
+        heapq.heappush( self._heap, (self.epoch + job.tick * job.step, self._seq, job) )
+        
+    def _loop(self):
+        logging.debug('LED blink scheduler starts.')
+        with self._cond:
+            while self._heap:
+                deadline, _, job = self._heap[0]
+                delay = deadline - time.monotonic()
+                if delay > self.SLACK:
+                    self._cond.wait( delay )
+                    continue
+                heapq.heappop( self._heap )
+                if job.done:
+                    continue
+                self._active = job
+                self._cond.release()
+                try:
+                    job.led.set( job.curve[job.index] )
+                finally:
+                    self._cond.acquire()
+                    self._active = None
+                    self._cond.notify_all()
+                if job.done:
+                    continue
+                job.tick += 1
+                job.index += 1
+                if job.index >= len( job.curve ):
+                    job.index = 0
+                if not (job.stepsLeft is None):
+                    job.stepsLeft -= 1
+                    if job.stepsLeft < 1:
+                        job.done = True
+                        if job.led._blinkJob is job:
+                            job.led._blinkJob = None
+                        continue
+                self._push( job )
+            self._worker = None
+        logging.debug('LED blink scheduler terminates.')
+        
+
 class LED( Module ):
     """Generic LED driver class.
+    
+    On MicroPython, blinking is driven by a hardware timer per LED. On
+    full Python, a single scheduler thread is shared among all LEDs.
+    
+    The LED may be attached either to a simple GPIO or to a PWM output.
+    In the latter case, brightness values are translated into duty
+    cycles, so curves can fade smoothly. The hardware does the fast
+    modulation, while the software just updates the duty cycle at the
+    breakpoints of the curve.
     """
     
     CURVE_HARTBEAT = [1, 0, 1, 0.7, 0.4, 0.2, 0, 0, 0, 0]
     CURVE_BLINK_CLASSIC = [1, 0]
+    CURVE_BREATHE = [0, 0.05, 0.2, 0.45, 0.75, 1, 0.75, 0.45, 0.2, 0.05]
     
     CYCLEN_SLOW   = 2
     CYCLEN_NORMAL = 1
     CYCLEN_FAST   = 0.4
 
     LABEL_DEFAULT = "LED"
+    PWM_FREQUENCY_DEFAULT = 1000
+    
+    _scheduler = _BlinkScheduler()
 
     def __init__(self):
         """Initialize the instance with defaults.
         """
         self.gpio = None
-        self.worker = None
+        self.pwm = None
+        self.provider = SysProvider.NONE
         self.workerDone = False
+        self._blinkJob = None
         self.label = LED.LABEL_DEFAULT
         self._timer = None
         self._cyclesLeft = None
@@ -52,9 +208,16 @@ class LED( Module ):
         =============================    =====================================================================================================
         LED.label                        ``str``; A descriptive string label; :attr:`LABEL_DEFAULT`.
         All LED.gpio.* settings as documented at :meth:`.GPIO.Params_init`.
+        All LED.pwm.* settings as documented at :meth:`.PWM.Params_init`.
         ======================================================================================================================================
         
-        Also see: :meth:`.Module.Params_init`, :meth:`.GPIO.Params_init`.
+        The LED is driven by a PWM output, if the configuration contains
+        any ``LED.pwm.*`` setting. In that case, ``LED.pwm.frequency``
+        defaults to :attr:`PWM_FREQUENCY_DEFAULT`. Otherwise, a GPIO is
+        used and the PWM settings are not filled in.
+        
+        Also see: :meth:`.Module.Params_init`, :meth:`.GPIO.Params_init`,
+        :meth:`.PWM.Params_init`.
         """
 
         if not ("LED.label" in paramDict):
@@ -70,8 +233,28 @@ class LED( Module ):
 
     def open(self, paramDict):
         ret = ErrorCode.errOk
-        if not (self.gpio is None):
+        if not (self.gpio is None) or not (self.pwm is None):
             ret = ErrorCode.errResourceConflict
+        elif [k for k in paramDict.keys() if k.startswith("LED.pwm.")]:
+            self.label = paramDict.get( "LED.label", LED.LABEL_DEFAULT )
+            # Extract PWM parameters
+            pwmParams = dict( [(k.replace("LED.", ""),v) for k,v in paramDict.items() if k.startswith("LED.pwm.")] )
+            if not ("pwm.frequency" in pwmParams):
+                pwmParams["pwm.frequency"] = LED.PWM_FREQUENCY_DEFAULT
+            pwmParams["pwm.duty"] = 0
+            self.pwm = PWM.getPWM()
+            if self.pwm is None:
+                ret = ErrorCode.errNotSupported
+            else:
+                ret = self.pwm.open(pwmParams)
+                if ret.isOk():
+                    ret = self.pwm.start()
+                    if not ret.isOk():
+                        self.pwm.close()
+                if ret.isOk():
+                    self.provider = self.pwm.provider
+                else:
+                    self.pwm = None
         else:
             defaults = {}
             LED.Params_init(defaults)
@@ -84,10 +267,8 @@ class LED( Module ):
             ret = self.gpio.open(gpioParams)
             if( ret != ErrorCode.errOk ):
                 self.gpio = None
-            #else:
-                # self.pwm = PWM( chip, channel )
-                # self.pwm.frequency = frequency
-                # self.pwm.enable()
+            else:
+                self.provider = self.gpio.provider
         logging.debug('LED <%s> opened, returns: %s.', self.label, ret)
         return ret
     
@@ -97,6 +278,10 @@ class LED( Module ):
         if self.gpio:
             ret = self.gpio.close()
             self.gpio = None
+        elif self.pwm:
+            ret = self.pwm.close()
+            self.pwm = None
+        self.provider = SysProvider.NONE
         logging.debug('LED <%s> closed.', self.label)
         return ret
     
@@ -105,13 +290,26 @@ class LED( Module ):
     #
     
     def set(self, brightness):
+        """Sets the brightness of the LED.
+        
+        For a GPIO-driven LED, the brightness is thresholded at 0.5.
+        With PWM, it is translated into a duty cycle. The hardware is
+        accessed only if the duty cycle actually changes.
+        
+        :param float brightness: The new brightness in [0, 1].
+        :return: None
+        :rtype: None
+        """
         if self.gpio:
             if (brightness < 0.5):
                 self.gpio.set( GPIO.LEVEL_LOW )
             else:
                 self.gpio.set( GPIO.LEVEL_HIGH )
-        # elif self.pwm:
-        #     self.pwm.duty_cycle = brightness
+        elif self.pwm:
+            duty = int( brightness * 100 + 0.5 )
+            duty = 0 if (duty < 0) else 100 if (duty > 100) else duty
+            if duty != self.pwm.duty:
+                self.pwm.setDuty( duty )
         logging.debug('LED <%s> set to %s.', self.label, brightness)
             
     def on(self):
@@ -130,7 +328,7 @@ class LED( Module ):
             ((num_cycles is None) or (num_cycles > 0)) ):
             self.stop_blinking()
             # On MicroPython, use its distinct timer features
-            if self.gpio.provider == SysProvider.MICROPYTHON:
+            if self.provider == SysProvider.MICROPYTHON:
                 from machine import Timer
                 self._timer = Timer()
                 self._cyclesLeft = num_cycles
@@ -142,47 +340,42 @@ class LED( Module ):
                                   callback= self._mpBlinkingLoop )
                 logging.debug('LED <%s> starts blinking timer, cycle_length=%s.', self.label, cycle_length)
             else:   # Full Python on SBC and alike
-                from threading import Thread
-                self.worker = Thread( target=self._blinkingLoop, name='Blinker',
-                                      args=(curve, cycle_length, num_cycles) )
-                self.worker.start()
+                LED._scheduler.add( self, curve, cycle_length, num_cycles )
+                logging.debug('LED <%s> starts blinking, cycle_length=%s.', self.label, cycle_length)
     
     def stop_blinking(self):
-        if self.gpio and (self.gpio.provider == SysProvider.MICROPYTHON):
+        if self.provider == SysProvider.MICROPYTHON:
             if not (self._timer is None):
                 self._timer.deinit()
                 self._timer = None
             self.workerDone = True
             logging.debug('LED <%s> stops blinking.', self.label)
         else:   # Full Python on SBC and alike
-            if self.worker:
-                if self.worker.is_alive():
-                    self.workerDone = True
-                    self.worker.join()
-            self.worker = None
-            
+            LED._scheduler.remove( self )
             
-    def _blinkingLoop(self, curve, cycle_length, num_cycles):
-        logging.debug('LED <%s> starts blinking thread, cycle_length=%s.', self.label, cycle_length)
-        self.workerDone = False
-        delay = cycle_length / len( curve )
-        if num_cycles:
-            for _ in range( num_cycles ):
-                for value in curve:
-                    if self.workerDone:
-                        break
-                    self.set( value )
-                    time.sleep( delay ) 
-                if self.workerDone:
-                    break
+    @property
+    def worker(self):
+        """The thread driving the blinking of this LED, or `None`.
+        
+        On full Python, this is the scheduler thread shared by all LEDs.
+        On MicroPython, blinking is timer-driven and this is always `None`.
+        """
+        ret = None
+        if self._blinkJob:
+            ret = LED._scheduler._worker
+        return ret
+    
+    def isBlinking(self):
+        """Tells whether the LED is currently blinking.
+        
+        :return: True, if a blinking curve is in progress; False otherwise.
+        :rtype: bool
+        """
+        if self.provider == SysProvider.MICROPYTHON:
+            ret = not (self._timer is None) and not self.workerDone
         else:
-            while not self.workerDone:
-                for value in curve:
-                    if self.workerDone:
-                        break
-                    self.set( value )
-                    time.sleep( delay ) 
-        logging.debug('LED <%s> terminates blinking thread.', self.label)
+            ret = not (self._blinkJob is None)
+        return ret
         
     def _mpBlinkingLoop(self, timer):
         self.set( self._curve[self._curveItem] )
@@ -9,11 +9,11 @@ from philander.max77960_reg import MAX77960_Reg
 
 from philander.battery import Status as BatStatus
 from philander.charger import Charger, Status as ChgStatus, DCStatus, PowerSrc,\
-    TemperatureRating, ChargerError, EventSource
+    TemperatureRating, ChargerError, EventContext, EventSource
 from philander.configurable import ConfigItem, Configurable
 from philander.gpio import GPIO
-from philander.imath import ctz, iprevpowtwo, vlbs
-from philander.interruptable import Event, Interruptable, EventContextControl
+from philander.imath import ctz
+from philander.interruptable import Event, Interruptable
 from philander.serialbus import SerialBusDevice
 from philander.systypes import ErrorCode, Info, RunLevel
 from philander.watchdog import Watchdog
@@ -44,31 +44,99 @@ class MAX77960( MAX77960_Reg, SerialBusDevice, Charger, Configurable, Interrupta
     REVISION_MINOR_MIN  = 0
     REVISION_MINOR_MAX  = 0x1F
     
+    # Register dump plan, compiled from the register map on first use.
+    # List of blocks (first register, length, entries), each entry
+    # being a tuple (register, name, decoders) with the decoders
+    # given as tuples (mask, shift, name).
+    _dumpPlan = None
+    
     def getRegisterMap(self):
         return self.registerMap
     
-    def getRegContentStr( self, regDescr, content ):
-        ret=''
-        if not regDescr[2]:    # No description of components/bits given
-            ret = hex(content)
+    @classmethod
+    def _getDumpPlan(cls):
+        if cls._dumpPlan is None:
+            plan = []
+            first = None
+            entries = None
+            for descr in sorted( cls.registerMap, key=lambda d: d[0] ):
+                decoders = tuple( (frag[0], ctz(frag[0]), frag[1]) for frag in descr[2] )
+                if (first is None) or (descr[0] != first + len(entries)):
+                    if first is not None:
+                        plan.append( (first, len(entries), tuple(entries)) )
+                    first = descr[0]
+                    entries = []
+                entries.append( (descr[0], descr[1], decoders) )
+            if first is not None:
+                plan.append( (first, len(entries), tuple(entries)) )
+            cls._dumpPlan = tuple(plan)
+        return cls._dumpPlan
+    
+    @staticmethod
+    def _decodeContent( content, decoders ):
+        return tuple( (name, (content & mask) >> shift) for mask, shift, name in decoders )
+    
+    @staticmethod
+    def formatRegisterContent( content, fields ):
+        """Formats register content, as retrieved by :meth:`getRegisterDump`.
+        
+        :param int content: The raw register content.
+        :param tuple fields: The decoded bit fields as pairs of name and value.
+        :return: The human-readable register content.
+        :rtype: str
+        """
+        if fields:
+            ret = ''.join( [name + '=' + str(value) + ' ' for name, value in fields] )
         else:
-            for frag in regDescr[2]:
-                shift = ctz( frag[0] )
-                fragVal = (content & frag[0]) >> shift
-                ret = ret + frag[1] + '=' + str(fragVal) + ' '
+            ret = hex(content)
         return ret
+    
+    def getRegContentStr( self, regDescr, content ):
+        fields = tuple( (frag[1], (content & frag[0]) >> ctz(frag[0])) for frag in regDescr[2] )
+        return self.formatRegisterContent( content, fields )
 
+    def getRegisterDump(self, decode=True):
+        """Reads and decodes all registers as given by the register map.
+        
+        Contiguous ranges of registers are read in a single block
+        transfer, each. Bit fields are decoded by means of tables that
+        are compiled only once. No string formatting is done. To get
+        human-readable output, use :meth:`formatRegisterContent`.
+        
+        :param bool decode: Whether or not to decode the bit fields.
+        :return: A list of tuples (register, name, content, fields) and\
+        an error code indicating either success or the reason of failure.\
+        The fields are given as a tuple of pairs (name, value), which\
+        is empty if no decoding was requested or there are no bit fields\
+        described for that register.
+        :rtype: list, ErrorCode
+        """
+        ret = []
+        err = ErrorCode.errOk
+        for first, length, entries in self._getDumpPlan():
+            data, err = self.readBufferRegister( first, length )
+            if not err.isOk():
+                break
+            for idx, (reg, name, decoders) in enumerate(entries):
+                if decode:
+                    fields = self._decodeContent( data[idx], decoders )
+                else:
+                    fields = ()
+                ret.append( (reg, name, data[idx], fields) )
+        return ret, err
 
     def getAllRegistersStr(self):
         ret = []
-        for descr in self.registerMap:
-            cont, err = self.readByteRegister( descr[0] )
-            if (err == ErrorCode.errOk):
-                contStr = self.getRegContentStr( descr, cont )
-            else:
-                cont = 0
-                contStr = f"Read error: {err}"
-            ret.append([descr[0], descr[1], cont, contStr])
+        for first, length, entries in self._getDumpPlan():
+            data, err = self.readBufferRegister( first, length )
+            for idx, (reg, name, decoders) in enumerate(entries):
+                if (err == ErrorCode.errOk):
+                    cont = data[idx]
+                    contStr = self.formatRegisterContent( cont, self._decodeContent( cont, decoders ) )
+                else:
+                    cont = 0
+                    contStr = f"Read error: {err}"
+                ret.append([reg, name, cont, contStr])
         return ret
 
             
@@ -124,6 +192,10 @@ class MAX77960( MAX77960_Reg, SerialBusDevice, Charger, Configurable, Interrupta
         CFG_VCHGIN_REG  : (10, MAX77960_Reg.VCHGIN_REG, MAX77960_Reg.VCHGIN_REG_DEFAULT),
     }
     
+    # Offsets of the write-protected config registers.
+    # Only #0, 6, 10 are not locked.
+    _PROTECTED_CONFIGS = (1, 2, 3, 4, 5, 7, 8, 9)
+    
     def __init__( self ):
         # Specific instance attributes
         self.pinInt = None
@@ -236,34 +308,10 @@ class MAX77960( MAX77960_Reg, SerialBusDevice, Charger, Configurable, Interrupta
             for key in (MAX77960.CFG_COMM_MODE,):
                 if not key in paramDict:
                     paramDict[key] = defParam[key]
-            # Note that config registers #1, 2, 3, 4, 5, 7, 8, 9
-            # are write protected (locked), while #0, 6, 10 are not.
-            # REG_CHG_CNFG_00, 01, 02, 03, ...
-            mask=[ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
-            data=[ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
-            for key, (regoff, msk, dflt) in MAX77960._CONFIGURABLES.items():
-                if (key in paramDict) and (paramDict[key] != dflt):
-                    value = paramDict[key]
-                    if key==MAX77960.CFG_CHGIN_ILIM:
-                        if value < 100:
-                            value = MAX77960_Reg.CHGIN_ILIM_100
-                        elif value > 6300:
-                            value = MAX77960_Reg.CHGIN_ILIM_6300
-                        else:
-                            value = value // 50 + 1
-                    mask[regoff] |= msk
-                    data[regoff] |= value
-        
-            self._unlockRegisters()
-            for idx in range( 11 ):
-                if mask[idx] != 0:
-                    reg = MAX77960_Reg.REG_CHG_CNFG_00 + idx
-                    # Copy masked bits to the register content
-                    value, _ = self.readByteRegister( reg )
-                    value = value & ~mask[idx]
-                    value = value | data[idx]
-                    ret = self.writeByteRegister(reg, value)
-            self._lockRegisters()
+            # Apply settings different from the hardware-reset defaults.
+            items = dict( [(key, paramDict[key]) for key, (_, _, dflt) in MAX77960._CONFIGURABLES.items()\
+                           if (key in paramDict) and (paramDict[key] != dflt)] )
+            ret = self.configureItems( items )
         # Setup interrupt related stuff.
         if (ret == ErrorCode.errOk):
             if ("Charger.int.gpio.pinDesignator" in paramDict):
@@ -582,6 +630,25 @@ class MAX77960( MAX77960_Reg, SerialBusDevice, Charger, Configurable, Interrupta
     def disableInterrupt(self):
         return ErrorCode.errOk
 
+    def _createEventContext(self):
+        return EventContext()
+
+    def _captureEventStatus(self, event):
+        # Retrieving the interrupt status resets all bits in these registers!
+        del event
+        topStatus, ret = self.readByteRegister( MAX77960_Reg.REG_TOP_INT )
+        if ret.isOk():
+            chgStatus, ret = self.readByteRegister( MAX77960_Reg.REG_CHG_INT )
+        if ret.isOk():
+            remainInt = self._mapIntImpl2Api( topStatus, chgStatus ).value
+        else:
+            topStatus = chgStatus = remainInt = 0
+        return remainInt, (topStatus, chgStatus), ret
+
+    def _fillEventContext(self, singleIntID, context):
+        context.source = EventSource( singleIntID )
+        return ErrorCode.errOk
+
     def getEventContext(self, event, context):
         """Retrieve more detailed information on an event.
         
@@ -592,6 +659,10 @@ class MAX77960( MAX77960_Reg, SerialBusDevice, Charger, Configurable, Interrupta
         which is semantically multiplexed by its :attr:`.charger.EventContext.source`
         attribute. 
         
+        Both interrupt status registers are read just once, upon the
+        first call after an event. Subsequent calls are served from
+        that status snapshot.
+        
         Also see: :meth:`.Interruptable.getEventContext`.
 
         :param int event: The original event occurred.
@@ -608,37 +679,8 @@ class MAX77960( MAX77960_Reg, SerialBusDevice, Charger, Configurable, Interrupta
         elif( event == Event.evtNone ):
             ret = ErrorCode.errFewData
         elif ((event == Event.evtInt1) or (event == Event.evtAny)):
-            ret = ErrorCode.errOk
-            # Retrieving the interrupt status resets all bits in these registers!
-            if( context.control == EventContextControl.clearAll ):
-                _, ret = self.readByteRegister( MAX77960_Reg.REG_TOP_INT )
-                _, ret = self.readByteRegister( MAX77960_Reg.REG_CHG_INT )
-                context.remainInt = 0;
-                context.source = EventSource.none
-            else:
-                if (context.control == EventContextControl.getFirst):
-                    topStatus, ret = self.readByteRegister( MAX77960_Reg.REG_TOP_INT )
-                    chgStatus, ret = self.readByteRegister( MAX77960_Reg.REG_CHG_INT )
-                    context.remainInt = self._mapIntImpl2Api( topStatus, chgStatus )
-                    context.control = EventContextControl.getNext
-                elif (context.control == EventContextControl.getLast):
-                    topStatus, ret = self.readByteRegister( MAX77960_Reg.REG_TOP_INT )
-                    chgStatus, ret = self.readByteRegister( MAX77960_Reg.REG_CHG_INT )
-                    context.remainInt = self._mapIntImpl2Api( topStatus, chgStatus )
-                    context.control = EventContextControl.getPrevious
-                if (ret.isOk()):
-                    if (context.remainInt == 0):
-                        ret = ErrorCode.errFewData
-                    else:
-                        if (context.control == EventContextControl.getNext):
-                            # Find value of highest bit:
-                            context.source = iprevpowtwo( context.remainInt )
-                        else:
-                            # Find (value of) least bit set:
-                            context.source = vlbs( context.remainInt )
-                        context.remainInt &= ~context.source
-                        if ((ret.isOk()) and (context.remainInt != 0)):
-                            ret = ErrorCode.errMoreData
+            context.source = EventSource.none
+            ret = self._getEventContextFromStatus( event, context )
         else:
             ret = ErrorCode.errInvalidParameter
         return ret
@@ -660,6 +702,59 @@ class MAX77960( MAX77960_Reg, SerialBusDevice, Charger, Configurable, Interrupta
         return ret
     
     
+    def configureItems(self, items):
+        """Applies a number of configuration settings at once.
+        
+        The settings are given as a dictionary with keys and values as
+        described in :meth:`Params_init`. Keys not referring to one of
+        the charger configurables are ignored. Note that the input
+        current limit ``Charger.Current.Input`` is to be given in mA.
+        
+        Settings are grouped by the register they belong to. So, each
+        affected register is read and written at most once. Unchanged
+        registers are not written. The write protection is unlocked
+        and locked again only once for the whole batch, and only if
+        any of the protected registers is involved.
+        
+        :param dict items: The configuration settings to apply.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        # Collect mask and data per register offset
+        regs = {}
+        for key, value in items.items():
+            if key in MAX77960._CONFIGURABLES:
+                regoff, msk, _ = MAX77960._CONFIGURABLES[key]
+                if key==MAX77960.CFG_CHGIN_ILIM:
+                    if value < 100:
+                        value = MAX77960_Reg.CHGIN_ILIM_100
+                    elif value > 6300:
+                        value = MAX77960_Reg.CHGIN_ILIM_6300
+                    else:
+                        value = value // 50 + 1
+                mask, data = regs.get( regoff, (0, 0) )
+                regs[regoff] = (mask | msk, (data & ~msk) | (value & msk))
+        if regs:
+            isLocked = any( [(regoff in MAX77960._PROTECTED_CONFIGS) for regoff in regs] )
+            if isLocked:
+                self._unlockRegisters()
+            for regoff in sorted( regs ):
+                mask, data = regs[regoff]
+                reg = MAX77960_Reg.REG_CHG_CNFG_00 + regoff
+                # Copy masked bits to the register content
+                content, err = self.readByteRegister( reg )
+                if err.isOk():
+                    value = (content & ~mask) | data
+                    if value != content:
+                        err = self.writeByteRegister( reg, value )
+                if ret.isOk():
+                    ret = err
+            if isLocked:
+                self._lockRegisters()
+        return ret
+    
+    
     #
     # The Watchdog API
     #
@@ -43,8 +43,9 @@ __version__ = "0.1"
 __all__ = ["Mux"]
 
 import logging
+import time
 
-from .gpio import GPIO
+from .gpio import GPIO, GPIOGroup
 from .module import Module
 from .systypes import ErrorCode
 
@@ -55,6 +56,7 @@ class Mux( Module ):
     
     MAXNUM_BITS = 4
     MODULE_PARAM_PREFIX = "mux."
+    DEFAULT_SETTLE_TIME = 0     # Settle time in microseconds
     
     def __init__(self):
         """Initialize the instance with defaults.
@@ -67,7 +69,13 @@ class Mux( Module ):
         """
         self.bit = list()
         self.ena = None
+        self._bitGroup = GPIOGroup()
         self.maxValue = 0
+        self.settleTime = Mux.DEFAULT_SETTLE_TIME
+        self.grayCode = False
+        self._value = None          # Current selection, None if unknown
+        self._scanKey = None        # Channels and ordering of the cached scan
+        self._scanOrder = tuple()   # Cached (index, channel) visiting order
 
     #
     # Module API
@@ -100,6 +108,10 @@ class Mux( Module ):
         mux.enable.gpio.pinDesignator        ENA pin: Name or number of the pin
         mux.enable.gpio.inverted             ENA pin: True, if pin is low-active
         mux.enable.gpio.level                ENA pin: Initial logic level
+        mux.settleTime                       Scan: Settle time after switching, in microseconds;
+                                             :attr:`DEFAULT_SETTLE_TIME`
+        mux.grayCode                         Scan: True to visit channels in Gray code order;
+                                             False
         =====================================================================================================
         
         The number of `mux.bit0.pinDesignator`, `mux.bit1.pinDesignator`
@@ -144,12 +156,13 @@ class Mux( Module ):
                 if not( tempKey in paramDict):
                     paramDict[tempKey] = paramDict[prefixDefault+key]
         # This class defaults
-        # defaults = {
-        #     Mux.PARAM_PREFIX + "key"   : False,
-        #     }
-        # for key, value in defaults.items():
-        #     if not key in paramDict:
-        #         paramDict[key] = value
+        defaults = {
+            Mux.MODULE_PARAM_PREFIX + "settleTime"   : Mux.DEFAULT_SETTLE_TIME,
+            Mux.MODULE_PARAM_PREFIX + "grayCode"     : False,
+            }
+        for key, value in defaults.items():
+            if not key in paramDict:
+                paramDict[key] = value
         return None
 
 
@@ -195,6 +208,11 @@ class Mux( Module ):
                     self.bit.clear()
         if( ret == ErrorCode.errOk ):
             self.maxValue = (1 << len(self.bit)) - 1
+            self._bitGroup = GPIOGroup( self.bit )
+            self.settleTime = paramDict[Mux.MODULE_PARAM_PREFIX + "settleTime"]
+            self.grayCode = paramDict[Mux.MODULE_PARAM_PREFIX + "grayCode"]
+            self._value = None
+            self._scanKey = None
         
         logging.debug('Mux.open() returns: %s.', ret)
         return ret
@@ -207,12 +225,15 @@ class Mux( Module ):
             if( (ret==ErrorCode.errOk) and (err!=ErrorCode.errOk)):
                 ret = err
         self.bit.clear()
+        self._bitGroup = GPIOGroup()
         if self.ena:
             err = self.ena.close()
             if( (ret==ErrorCode.errOk) and (err!=ErrorCode.errOk)):
                 ret = err
             self.ena = None
         self.maxValue = 0
+        self._value = None
+        self._scanKey = None
         logging.debug('Mux closed, return: %s.', ret)
         return ret
     
@@ -228,6 +249,10 @@ class Mux( Module ):
         `A`, `B`, `C` etc. That directly determines, which of the I/O
         channels `Y0`, `Y1`, etc. is connected to the common line `X`.
         
+        The current selection is remembered, so that only those control
+        lines are toggled, that actually differ from the previous
+        selection. These lines are set together, as a :class:`.GPIOGroup`.
+        
         If the `automute` flag is set, the device is first disabled.
         Then, the channel is selected and finally, the device is enabled,
         again. Note that this will always leave the device in an enabled
@@ -242,13 +267,11 @@ class Mux( Module ):
         if self.bit:
             if automute:
                 self.enable(False)
-            acc = int(number)
-            for pin in self.bit:
-                level = GPIO.LEVEL_HIGH if (acc & 1) else GPIO.LEVEL_LOW
-                err = pin.set( level )
-                if( (ret==ErrorCode.errOk) and (err!=ErrorCode.errOk)):
-                    ret = err
-                acc = acc >> 1
+            value = int(number) & self.maxValue
+            diff = self.maxValue if (self._value is None) else (value ^ self._value)
+            if diff:
+                ret = self._bitGroup.write( value, diff )
+            self._value = value if ret.isOk() else None
             if automute:
                 self.enable(True)
         else:
@@ -287,3 +310,95 @@ class Mux( Module ):
         :rtype: ErrorCode
         """
         return self.enable(False)
+    
+    def _getScanOrder(self, channels, grayCode):
+        """Get the sequence of channels to visit during a scan.
+        
+        The result is a tuple of `(index, channel)` pairs, with `index`
+        referring to the position of the channel in the `channels` list.
+        If `grayCode` is set, the channels are visited in the order of
+        the reflected binary code, so that subsequent selections differ
+        in just one control line, as far as possible.
+        The result is cached for subsequent scans of the same channels.
+        
+        :param channels: The channels to scan or `None` to scan all channels.
+        :param bool grayCode: Whether or not to scan in Gray code order.
+        :return: The visiting order as a tuple of (index, channel) pairs.
+        :rtype: tuple
+        """
+        if channels is None:
+            channels = range( self.maxValue + 1 )
+        key = (tuple(channels), grayCode)
+        if key != self._scanKey:
+            order = list( enumerate(key[0]) )
+            if grayCode:
+                def rank( item ):
+                    # Position of the channel in the Gray code sequence
+                    ret = item[1]
+                    shift = item[1] >> 1
+                    while shift:
+                        ret ^= shift
+                        shift >>= 1
+                    return ret
+                order.sort( key=rank )
+            self._scanOrder = tuple( order )
+            self._scanKey = key
+        return self._scanOrder
+    
+    def scan(self, adc, values, channels=None, settleTime=None, grayCode=None):
+        """Sample the given channels by the means of an ADC.
+        
+        Selects one channel after the other and takes a digital sample
+        from the given ADC, which is assumed to be connected to the
+        common line `X`. After switching, the given settle time is
+        waited before sampling.
+        
+        Only the control lines that differ from the previous selection
+        are toggled. Visiting the channels in Gray code order reduces
+        this to one line per step.
+        
+        The samples are stored into the pre-allocated `values` array,
+        so that `values[i]` receives the sample of `channels[i]`. If no
+        channels are given, all channels `0...maxValue` are scanned and
+        `values[ch]` receives the sample of channel `ch`.
+        
+        :param ADC adc: The opened ADC instance to take the samples.
+        :param values: The pre-allocated array to receive the samples, e.g. `array("H")`.
+        :param channels: The channels to scan or `None` to scan all channels.
+        :param int settleTime: The settle time in microseconds or `None` to use the configured one.
+        :param bool grayCode: Whether to scan in Gray code order or `None` to use the configured setting.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        if settleTime is None:
+            settleTime = self.settleTime
+        if grayCode is None:
+            grayCode = self.grayCode
+        if not self.bit:
+            ret = ErrorCode.errNotInited
+        elif (adc is None) or (values is None) or (settleTime < 0):
+            ret = ErrorCode.errInvalidParameter
+        else:
+            order = self._getScanOrder( channels, grayCode )
+            if len(values) < len(order):
+                ret = ErrorCode.errInvalidParameter
+            elif hasattr( time, "sleep_us" ):
+                delay = time.sleep_us
+            else:
+                delay = time.sleep
+                settleTime = settleTime / 1000000
+        if ret.isOk():
+            select = self.select
+            getDigital = adc.getDigital
+            for idx, channel in order:
+                ret = select( channel )
+                if not ret.isOk():
+                    break
+                if settleTime > 0:
+                    delay( settleTime )
+                values[idx], ret = getDigital()
+                if not ret.isOk():
+                    break
+        logging.debug('Mux scan of %d channels, return: %s.', len(values), ret)
+        return ret
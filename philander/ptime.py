@@ -0,0 +1,60 @@
+"""Portable access to the microsecond tick counter.
+
+For portability, this is to support the MicroPython environments, which
+lack :func:`time.monotonic`. There, the native ``time.ticks_us()`` and
+its companions are used. Ticks may wrap around, so differences and sums
+must be computed by :func:`ticksDiff` and :func:`ticksAdd`. On full
+Python, ticks are derived from :func:`time.perf_counter_ns` and never
+wrap.
+"""
+
+__author__ = "Oliver Maye"
+__version__ = "0.1"
+__all__ = ["sleepUs", "ticksAdd", "ticksDiff", "ticksUs"]
+
+import time
+
+if hasattr( time, "ticks_us" ):
+    ticksUs = time.ticks_us
+    ticksDiff = time.ticks_diff
+    ticksAdd = time.ticks_add
+else:
+    def ticksUs():
+        """Get the current value of the monotonic microsecond counter.
+        
+        :return: The current tick count in microseconds.
+        :rtype: int
+        """
+        return time.perf_counter_ns() // 1000
+    
+    def ticksDiff( later, earlier ):
+        """Compute the signed difference of two tick counts.
+        
+        :param int later: The later tick count.
+        :param int earlier: The earlier tick count.
+        :return: The difference in microseconds.
+        :rtype: int
+        """
+        return later - earlier
+    
+    def ticksAdd( ticks, delta ):
+        """Offset a tick count by the given number of microseconds.
+        
+        :param int ticks: The tick count.
+        :param int delta: The offset in microseconds, may be negative.
+        :return: The resulting tick count.
+        :rtype: int
+        """
+        return ticks + delta
+
+if hasattr( time, "sleep_us" ):
+    sleepUs = time.sleep_us
+else:
+    def sleepUs( us ):
+        """Sleep for the given number of microseconds.
+        
+        :param int us: The delay in microseconds.
+        :return: None
+        :rtype: None
+        """
+        time.sleep( us / 1000000 )
@@ -5,7 +5,7 @@ PWM implementing driver modules provided on the target system.
 """
 __author__ = "Oliver Maye"
 __version__ = "0.1"
-__all__ = ["PWM"]
+__all__ = ["PWM", "PWMGroup"]
 
 import logging
 
@@ -328,3 +328,122 @@ class PWM( Module ):
         else:
             self.state = PWM.OFF
         return err
+
+
+class PWMGroup():
+    """Several PWM channels to be updated as one batch.
+    
+    Changing the duty cycle or frequency of multiple channels one after
+    the other causes skew between them, especially if each change takes
+    more than one write access to the hardware. A group first computes
+    the new settings for all channels and skips channels, whose values
+    do not change. Then, it applies all frequency changes, followed by
+    all duty changes in a tight loop. Similarly, starting or stopping
+    the group touches all channels back-to-back, after any preparatory
+    work was done. So, the channels start as closely in phase as the
+    underlying implementation permits.
+    
+    The channels must be opened and closed by the caller.
+    """
+    
+    def __init__(self, channels=None):
+        """Initialize the instance.
+        
+        :param list channels: The PWM instances to group, or None.
+        """
+        self.channels = list( channels ) if channels else []
+    
+    def add(self, pwm):
+        """Adds a channel to this group.
+        
+        :param PWM pwm: The channel to add.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        if (pwm is None) or (pwm in self.channels):
+            ret = ErrorCode.errInvalidParameter
+        else:
+            self.channels.append( pwm )
+        return ret
+    
+    def _expand(self, value):
+        # Turn a scalar or list of values into one value per channel.
+        # None means: no change.
+        if isinstance( value, (list, tuple) ):
+            ret = list( value ) + [None] * (len(self.channels) - len(value))
+        else:
+            ret = [value] * len( self.channels )
+        return ret
+    
+    def update(self, duty=None, frequency=None):
+        """Sets new duty cycles and/or frequencies for the channels.
+        
+        Both parameters may be given either as a single value applying
+        to all channels, or as a list with one entry per channel. A value
+        of None leaves the corresponding setting unchanged. Channels,
+        whose values do not change, are not accessed at all. The on/off
+        state of the channels is not altered.
+        
+        :param duty: The new duty cycle(s) as a percentage in [0, 100].
+        :type duty: int or list
+        :param frequency: The new frequency (frequencies) in Hertz [Hz].
+        :type frequency: int or list
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        duties = self._expand( duty )
+        frequencies = self._expand( frequency )
+        if (len(duties) > len(self.channels)) or (len(frequencies) > len(self.channels)):
+            ret = ErrorCode.errInvalidParameter
+        else:
+            freqChanges = [(pwm, val) for pwm, val in zip( self.channels, frequencies ) \
+                           if not (val is None) and (val != pwm.frequency)]
+            dutyChanges = [(pwm, val) for pwm, val in zip( self.channels, duties ) \
+                           if not (val is None) and (val != pwm.duty)]
+            for pwm, val in freqChanges:
+                err = pwm.setFrequency( val )
+                if ret.isOk():
+                    ret = err
+            for pwm, val in dutyChanges:
+                err = pwm.setDuty( val )
+                if ret.isOk():
+                    ret = err
+        return ret
+    
+    def start(self, duty=None, frequency=None):
+        """Switches all channels on, as simultaneously as possible.
+        
+        New frequencies and duty cycles are applied by :meth:`update`,
+        first. Then, all channels are started back-to-back, without any
+        further configuration in between. See :meth:`update` for the
+        parameters.
+        
+        :param duty: The new duty cycle(s) as a percentage in [0, 100].
+        :type duty: int or list
+        :param frequency: The new frequency (frequencies) in Hertz [Hz].
+        :type frequency: int or list
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = self.update( duty=duty, frequency=frequency )
+        if ret.isOk():
+            for pwm in self.channels:
+                err = pwm.start()
+                if ret.isOk():
+                    ret = err
+        return ret
+    
+    def stop(self):
+        """Switches all channels off, back-to-back.
+        
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        for pwm in self.channels:
+            err = pwm.stop()
+            if ret.isOk():
+                ret = err
+        return ret
@@ -178,15 +178,20 @@ class _PWM_Periphery( PWM ):
         :return: An error code indicating either success or the reason of failure.
         :rtype: ErrorCode
         """
+        # The hardware duty setting is always kept up-to-date, so just
+        # enable the output, if it's not running, yet.
+        wasOn = (self.state == PWM.ON)
         err = super().start( duty=duty )
-        if err.isOk():
+        if err.isOk() and not wasOn:
             try:
-                self._pwm.duty_cycle = self.duty / 100
                 self._pwm.enable()
             except DriverError:
                 err = ErrorCode.errLowLevelFail
             except (TypeError, ValueError):
                 err = ErrorCode.errInvalidParameter
+            if not err.isOk():
+                # Not running, so that the next start retries to enable
+                self.state = PWM.OFF
         return err
 
     def stop(self):
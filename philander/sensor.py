@@ -6,9 +6,12 @@ set of common types and functions is provided.
 __author__ = "Oliver Maye"
 __version__ = "0.1"
 __all__ = ["Calibration", "CalibrationData", "CalibrationType", \
-           "SelfTest", "Sensor"]
+           "History", "SelfTest", "Sensor"]
+
+from array import array
 
 from .penum import Enum, Flag, unique, auto, idiotypic, dataclass
+from .ptime import ticksDiff, ticksUs
 
 from .configurable import Configurable, Configuration, ConfigItem
 from .module import Module
@@ -314,6 +317,100 @@ class SelfTest(Flag):
     """All possible self tests.
     """
     
+class History():
+    """Fixed-capacity ring buffer of time-stamped measurements.
+    
+    Appending is O(1) and never allocates memory. Each entry is stored
+    twice, at its ring position and, mirrored, one capacity further.
+    This way, the most recent entries are always found in one contiguous
+    region. So, :meth:`window` can hand out views, rather than copies.
+    
+    Time stamps are microsecond ticks as given by
+    :func:`.ptime.ticksUs`. They may wrap around on MicroPython, so
+    compare them using :func:`.ptime.ticksDiff`. If a
+    ``typecode`` is given, values are kept in an :class:`array.array`
+    of that type and windows on the values are zero-copy, too.
+    Otherwise, values may be arbitrary objects, but their window is a
+    (shallow) copy.
+    """
+    
+    def __init__(self, capacity, typecode=None):
+        self.capacity = capacity
+        self.count = 0      # Total number of entries ever appended
+        self._stamps = array('q', [0] * (2 * capacity))
+        if typecode:
+            self._values = array(typecode, [0] * (2 * capacity))
+        else:
+            self._values = [None] * (2 * capacity)
+    
+    def __len__(self):
+        return min( self.count, self.capacity )
+    
+    def clear(self):
+        """Discards all entries.
+        
+        :return: None
+        :rtype: None
+        """
+        self.count = 0
+        return None
+    
+    def append(self, value, stamp=None):
+        """Adds a new entry, overwriting the oldest one if full.
+        
+        :param object value: The measurement value.
+        :param int stamp: The time stamp in ticks or None to take the current time.
+        :return: None
+        :rtype: None
+        """
+        if stamp is None:
+            stamp = ticksUs()
+        idx = self.count % self.capacity
+        self._stamps[idx] = stamp
+        self._stamps[idx + self.capacity] = stamp
+        self._values[idx] = value
+        self._values[idx + self.capacity] = value
+        self.count += 1
+        return None
+    
+    def getLatest(self):
+        """Retrieves the most recent entry.
+        
+        :return: The value and time stamp of the latest entry, or\
+        ``(None, 0)`` if the history is empty.
+        :rtype: object, int
+        """
+        if self.count > 0:
+            idx = (self.count - 1) % self.capacity
+            ret = self._values[idx], self._stamps[idx]
+        else:
+            ret = None, 0
+        return ret
+    
+    def window(self, num=None):
+        """Provides the most recent entries, oldest first.
+        
+        The time stamps and, if a ``typecode`` was given, the values
+        are returned as :class:`memoryview` into the buffer. They remain
+        valid only until the next ``capacity - num`` calls to
+        :meth:`append`. Copy them, if needed for longer.
+        
+        :param int num: The number of entries or None for all available.
+        :return: The time stamps and values of the selected entries.
+        :rtype: memoryview, memoryview or list
+        """
+        size = len(self)
+        if (num is None) or (num > size):
+            num = size
+        end = self.count % self.capacity + self.capacity
+        stamps = memoryview( self._stamps )[end - num : end]
+        if isinstance( self._values, array ):
+            values = memoryview( self._values )[end - num : end]
+        else:
+            values = self._values[end - num : end]
+        return stamps, values
+        
+
 class Sensor(Module, Configurable):
     """This class is meant to be sub-classed to define interfaces for\
     more-specific categories of sensors.
@@ -328,6 +425,8 @@ class Sensor(Module, Configurable):
         # Create instance attributes
         self.dataRange = defaults["Sensor.dataRange"]
         self.dataRate  = defaults["Sensor.dataRate"]
+        self.history = None
+        self.maxAge = 0     # in seconds
  
     @classmethod
     def Params_init( cls, paramDict ):
@@ -338,6 +437,13 @@ class Sensor(Module, Configurable):
         Defaults to 1.
         * ``Sensor.dataRate``: Measurement frequency, given in Hz.\
         Default is 1.
+        * ``Sensor.history.size``: Number of measurements to keep in the\
+        :attr:`history`. Default is 0, i.e. no history.
+        * ``Sensor.history.typecode``: :mod:`array` type code of the\
+        measurement values, or None for arbitrary objects. Default is None.
+        * ``Sensor.history.maxAge``: Maximum age in milliseconds of a\
+        measurement that :meth:`getCachedData` may still serve from the\
+        history. Default is 0, meaning one period of the data rate.
         
         Also see :meth:`.module.Module.Params_init`.
         
@@ -350,6 +456,9 @@ class Sensor(Module, Configurable):
         defaults = {
             "Sensor.dataRange": 1,
             "Sensor.dataRate": 1,
+            "Sensor.history.size": 0,
+            "Sensor.history.typecode": None,
+            "Sensor.history.maxAge": 0,
         }
         # Fill paramDict with defaults
         for key, value in defaults.items():
@@ -363,6 +472,10 @@ class Sensor(Module, Configurable):
         
         Configures the sensor by reading the supported parameters or
         applying default values and calling :meth:`configure`.
+        
+        If a history size is configured, the :attr:`history` is created
+        to be used by :meth:`getCachedData`.
+        
         Also see: :meth:`.module.Module.open`.
         
         :param dict(str, object) paramDict: Configuration parameters as\
@@ -380,8 +493,57 @@ class Sensor(Module, Configurable):
                 ret = self.configure( cfg )
         if ret.isOk():
             Sensor.Params_init(paramDict)
+            size = paramDict["Sensor.history.size"]
+            if size > 0:
+                self.history = History( size, paramDict["Sensor.history.typecode"] )
+                self.maxAge = paramDict["Sensor.history.maxAge"] / 1000
+            else:
+                self.history = None
         return ret
 
+    def close(self):
+        """Closes this instance and releases associated resources.
+        
+        Also see: :meth:`.module.Module.close`.
+        
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        self.history = None
+        return ErrorCode.errOk
+    
+    def getCachedData(self):
+        """Retrieves recent data, accessing the hardware only if needed.
+        
+        As long as the latest entry of the :attr:`history` is not older
+        than the configured maximum age, that entry is returned without
+        touching the sensor. Otherwise, a measurement is taken by
+        :meth:`getLatestData` and recorded in the history. So, several
+        consumers of the same sensor don't multiply the bus traffic.
+        
+        Without a history, this is the same as :meth:`getLatestData`.
+        Note that :meth:`getLatestData` and :meth:`getNextData`
+        themselves always access the sensor and do not record anything.
+        
+        :return: The measurement data object and an error code indicating\
+        either success or the reason of failure.
+        :rtype: Object, ErrorCode
+        """
+        if self.history is None:
+            value, err = self.getLatestData()
+        else:
+            value, stamp = self.history.getLatest()
+            maxAge = self.maxAge
+            if (maxAge <= 0) and (self.dataRate > 0):
+                maxAge = 1 / self.dataRate
+            if (self.history.count > 0) and (ticksDiff( ticksUs(), stamp ) <= maxAge * 1000000):
+                err = ErrorCode.errOk
+            else:
+                value, err = self.getLatestData()
+                if err.isOk():
+                    self.history.append( value )
+        return value, err
+
     
     def selfTest(self, tests):
         """Carry out a sensor self test.
@@ -437,6 +599,8 @@ class Sensor(Module, Configurable):
         self.Params_init( defaults )
         self.dataRange = defaults["Sensor.dataRange"]
         self.dataRate = defaults["Sensor.dataRate"]
+        if self.history:
+            self.history.clear()
         return ret
 
 
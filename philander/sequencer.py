@@ -0,0 +1,287 @@
+"""Timed playback of duty cycle and frequency sequences on PWM channels.
+
+A :class:`Sequencer` takes one or more tracks, each of which is a list
+of (time, duty, frequency) steps for a certain :class:`.PWM` channel.
+It merges all tracks into a single, time-ordered program and executes
+it from one timing thread. Deadlines are computed from the start of the
+playback, rather than from the previous step. So, delays in executing
+one step do not accumulate. The lateness of each step is recorded and
+can be retrieved as a :class:`JitterStatistics` object.
+
+Pulse patterns, such as described by an actuator's ``onSpeedDuty``,
+``ctrlInterval`` and ``durationLengthCycles`` parameters, can be
+compiled into steps using :meth:`Sequencer.pulseTrain`.
+"""
+__author__ = "Oliver Maye"
+__version__ = "0.1"
+__all__ = ["JitterStatistics", "Sequencer"]
+
+import logging
+import time
+
+from .penum import dataclass
+from .systypes import ErrorCode
+
+
+@dataclass
+class JitterStatistics:
+    """Timing accuracy achieved while playing a sequence.
+    
+    Lateness is the difference between the actual time of executing a
+    step and its deadline, given in micro seconds [us]. Errors count
+    the frequency and duty cycle updates, that failed.
+    """
+    count:      int = 0
+    mean:       int = 0
+    minimum:    int = 0
+    maximum:    int = 0
+    errors:     int = 0
+
+
+class Sequencer():
+    """Plays back compiled (time, duty, frequency) steps on PWM channels.
+    
+    All channels must be opened before starting the playback. A step
+    with a duty value starts the channel, if necessary. Steps given
+    for the same point in time are executed en bloc, in the order of
+    their tracks.
+    """
+    
+    def __init__(self):
+        self._tracks = []
+        self._program = []
+        self._worker = None
+        self._stopEvent = None
+        # Running lateness statistics: count, sum, minimum, maximum.
+        # Replaced as a whole, so readers always see a consistent tuple.
+        self._lateness = (0, 0, 0, 0)
+        # Number of PWM calls failed
+        self._errors = 0
+
+    @staticmethod
+    def pulseTrain( period, on, count, intensity, delay=0 ):
+        """Compiles a train of rectangular pulses into sequence steps.
+        
+        Each pulse switches the duty cycle to ``intensity`` for ``on``
+        milliseconds and back to zero for the rest of the period.
+        A final, empty step marks the end of the last period, so the
+        train can be repeated seamlessly.
+        
+        :param int period: The length of one pulse period in ms.
+        :param int on: The length of the ON phase of each pulse in ms.
+        :param int count: The number of pulses.
+        :param int intensity: The duty cycle during the ON phase in percent.
+        :param int delay: The time of the first pulse in ms.
+        :return: The list of (time, duty, frequency) steps.
+        :rtype: list
+        """
+        steps = []
+        for idx in range( count ):
+            start = delay + idx * period
+            steps.append( (start, intensity, None) )
+            steps.append( (start + on, 0, None) )
+        steps.append( (delay + count * period, None, None) )
+        return steps
+    
+    def addTrack(self, pwm, steps):
+        """Adds a list of steps to be played on the given PWM channel.
+        
+        Each step is a tuple (time, duty, frequency). The time is given
+        in milliseconds relative to the start of the playback. The duty
+        is a percentage in [0, 100], while the frequency is in Hertz.
+        Either of them may be None to leave the current setting
+        unchanged. The channel is started, if necessary, by the first
+        step giving a duty value.
+        
+        :param PWM pwm: The (opened) PWM channel to control.
+        :param list steps: The steps to execute on that channel.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        if self.isPlaying():
+            ret = ErrorCode.errBusy
+        elif (pwm is None) or not steps:
+            ret = ErrorCode.errInvalidParameter
+        else:
+            for step in steps:
+                if (len(step) != 3) or (step[0] < 0):
+                    ret = ErrorCode.errInvalidParameter
+                    break
+            if ret.isOk():
+                self._tracks.append( (pwm, list(steps)) )
+                self._program = []
+        return ret
+    
+    def clear(self):
+        """Removes all tracks.
+        
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        if self.isPlaying():
+            ret = ErrorCode.errBusy
+        else:
+            self._tracks = []
+            self._program = []
+        return ret
+    
+    def _compile(self):
+        # Merge all tracks into a list of (time [s], actions), sorted by time.
+        # Each action is a tuple (pwm, duty, frequency).
+        merged = {}
+        for pwm, steps in self._tracks:
+            for tms, duty, frequency in steps:
+                merged.setdefault( tms, [] ).append( (pwm, duty, frequency) )
+        self._program = [(tms / 1000, tuple(merged[tms])) for tms in sorted( merged.keys() )]
+        return None
+    
+    def start(self, repeat=1, priority=0):
+        """Starts playing the sequence in the background.
+        
+        With ``repeat`` greater than one, the sequence is played
+        multiple times. The length of one round is given by the time
+        of the latest step, which may be an empty (time, None, None)
+        step just to mark the end. If ``repeat`` is zero, the sequence
+        is repeated until :meth:`stop` is called.
+        
+        With a non-zero ``priority``, the timing thread asks for
+        real-time (FIFO) scheduling at that priority, where the OS
+        supports it. This usually requires privileges. If not granted,
+        the playback just runs with normal scheduling.
+        
+        :param int repeat: The number of rounds to play.
+        :param int priority: The real-time priority 1...99, or 0 for normal scheduling.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        if self.isPlaying():
+            ret = ErrorCode.errBusy
+        elif not self._tracks or (repeat < 0):
+            ret = ErrorCode.errInadequate
+        elif (priority < 0) or (priority > 99):
+            ret = ErrorCode.errInvalidParameter
+        else:
+            if not self._program:
+                self._compile()
+            # Repeating requires rounds of non-zero length
+            if (repeat != 1) and (self._program[-1][0] <= 0):
+                ret = ErrorCode.errInadequate
+        if ret.isOk():
+            from threading import Event, Thread
+            self._lateness = (0, 0, 0, 0)
+            self._errors = 0
+            self._stopEvent = Event()
+            self._worker = Thread( target=self._playLoop, name='Sequencer',
+                                   args=(repeat, priority), daemon=True )
+            self._worker.start()
+        return ret
+    
+    def stop(self):
+        """Stops the playback immediately.
+        
+        The PWM channels are left in their current state.
+        
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        if self._worker:
+            self._stopEvent.set()
+            self._worker.join()
+            self._worker = None
+        else:
+            ret = ErrorCode.errInadequate
+        return ret
+    
+    def isPlaying(self):
+        """Tells whether a playback is in progress.
+        
+        :return: True, if the sequence is currently being played; False otherwise.
+        :rtype: bool
+        """
+        return bool( self._worker ) and self._worker.is_alive()
+    
+    def wait(self, timeout=None):
+        """Waits for the playback to finish.
+        
+        :param float timeout: The maximum time to wait in seconds, or None.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        if self._worker:
+            self._worker.join( timeout )
+            if self._worker.is_alive():
+                ret = ErrorCode.errUnavailable
+        return ret
+    
+    def getJitter(self):
+        """Retrieves the timing accuracy achieved so far.
+        
+        Refers to the current or latest playback.
+        
+        :return: The lateness statistics of all steps executed.
+        :rtype: JitterStatistics
+        """
+        count, total, minimum, maximum = self._lateness
+        ret = JitterStatistics()
+        ret.errors = self._errors
+        if count > 0:
+            ret.count = count
+            ret.mean = int( total * 1000000 / count + 0.5 )
+            ret.minimum = int( minimum * 1000000 + 0.5 )
+            ret.maximum = int( maximum * 1000000 + 0.5 )
+        return ret
+    
+    @staticmethod
+    def _setPriority(priority):
+        # Ask for real-time scheduling of the calling thread. Not available
+        # on all platforms and usually requires privileges.
+        ret = False
+        try:
+            import os
+            os.sched_setscheduler( 0, os.SCHED_FIFO, os.sched_param( priority ) )
+            ret = True
+        except (AttributeError, ImportError, OSError):
+            ret = False
+        return ret
+    
+    def _playLoop(self, repeat, priority):
+        logging.debug('Sequencer starts playing %d steps.', len( self._program ))
+        if (priority > 0) and not Sequencer._setPriority( priority ):
+            logging.debug('Sequencer could not get real-time priority %d.', priority)
+        program = self._program
+        roundLength = program[-1][0]
+        startTime = time.monotonic()
+        rnd = 0
+        while ((repeat == 0) or (rnd < repeat)) and not self._stopEvent.is_set():
+            offset = startTime + rnd * roundLength
+            for tsec, actions in program:
+                deadline = offset + tsec
+                delay = deadline - time.monotonic()
+                if (delay > 0) and self._stopEvent.wait( delay ):
+                    break
+                for pwm, duty, frequency in actions:
+                    if not (frequency is None):
+                        err = pwm.setFrequency( frequency )
+                        if not err.isOk():
+                            self._errors += 1
+                            logging.debug('Sequencer setting frequency %s failed: %s.', frequency, err)
+                    if not (duty is None):
+                        err = pwm.start( duty )
+                        if not err.isOk():
+                            self._errors += 1
+                            logging.debug('Sequencer setting duty %s failed: %s.', duty, err)
+                late = time.monotonic() - deadline
+                count, total, minimum, maximum = self._lateness
+                if count > 0:
+                    minimum = min( minimum, late )
+                    maximum = max( maximum, late )
+                else:
+                    minimum = maximum = late
+                self._lateness = (count + 1, total + late, minimum, maximum)
+            rnd += 1
+        logging.debug('Sequencer terminates after %d rounds.', rnd)
@@ -52,7 +52,7 @@ __all__ = ["ShiftReg"]
 
 import logging
 
-from .gpio import GPIO
+from .gpio import GPIO, GPIOGroup
 from .module import Module
 from .sysfactory import SysProvider
 from .systypes import ErrorCode
@@ -85,12 +85,27 @@ class ShiftReg( Module ):
     MODULE_PARAM_PREFIX = "shiftreg"
     ITEM_PARAM_PREFIX   = ("dclr", "enable", "rclk", "rclr", "din", "dclk")
     
+    DEFAULT_LENGTH      = 0     # Length of the register chain unknown
+    
+    # DIN levels to shift in each possible byte, MSB first
+    _BYTE_LEVELS = tuple( tuple( (b >> (7-idx)) & 0x01 for idx in range(8) ) for b in range(0x100) )
+    
     def __init__(self):
         """Initialize the instance with defaults.
         
         Also see: :meth:`.Params_init`
         """
         self.pin = [None] * ShiftReg.PIN_MAXNUM
+        self.length = ShiftReg.DEFAULT_LENGTH
+        self._content = 0           # Shadow of the flip-flops' content
+        self._contentValid = False  # Whether the shadow reflects the hardware
+        self._isLatched = False     # Whether the buffer equals the flip-flops
+        self._dinLevel = None       # Current DIN level, if known
+        self._dinClk = None         # DIN and DCLK as a group, bits #0 and #1
+        self._image = bytearray()   # Pending content for bit-wise access
+        self._imageValid = False    # Whether the image is based on the shadow
+        self._dirty = {}            # Offsets of changed image bytes and their former values
+        self._contentInImage = False # Whether the shadow must be taken from the image
 
     #
     # Module API
@@ -109,6 +124,7 @@ class ShiftReg( Module ):
         ==================================   ================================================================
         Key name                             Value type, meaning and default
         ==================================   ================================================================
+        shiftreg.length                      Number of flip-flops in the (cascaded) chain; 0 if unknown; 0
         shiftreg.gpio.provider               Global setting: GPIO provider
         shiftreg.gpio.pinNumbering           Global setting: numbering scheme
         shiftreg.gpio.inverted               Global setting: True if low-active
@@ -142,12 +158,19 @@ class ShiftReg( Module ):
         If the `shiftreg.*.pinDesignator` is not given, the driver
         assumes, the corresponding line is not present or implemented.
         
+        If `shiftreg.length` is known, the driver keeps a shadow of the
+        register content. Then, :meth:`write` shifts in only as many bits
+        as necessary to reach the new content.
+        
         Also see: :meth:`.Module.Params_init`, :meth:`.GPIO.Params_init`.
         
         :param dict(str, object) paramDict: Dictionary of configuration settings.
         :return: none
         :rtype: None
         """
+        key = ShiftReg.MODULE_PARAM_PREFIX + ".length"
+        if not( key in paramDict ):
+            paramDict[key] = ShiftReg.DEFAULT_LENGTH
         # Driver defaults
         gpioDefaults = {}
         gpioDefaults["gpio.direction"] = GPIO.DIRECTION_OUT
@@ -176,6 +199,14 @@ class ShiftReg( Module ):
             ret = ErrorCode.errResourceConflict
         if ret.isOk():
             self.Params_init( paramDict )
+            self.length = paramDict[ShiftReg.MODULE_PARAM_PREFIX + ".length"]
+            self._contentValid = False
+            self._isLatched = False
+            self._dinLevel = None
+            self._image = bytearray( (self.length + 7) >> 3 )
+            self._imageValid = False
+            self._dirty = {}
+            self._contentInImage = False
             for idx in range(ShiftReg.PIN_MAXNUM):
                 prefix = ShiftReg.MODULE_PARAM_PREFIX + "." + \
                          ShiftReg.ITEM_PARAM_PREFIX[idx] + "."
@@ -199,6 +230,9 @@ class ShiftReg( Module ):
                         self.pin[idx].close()
                         self.pin[idx] = None
         if ret.isOk():
+            if self.pin[ShiftReg.PIN_IDX_DIN] and self.pin[ShiftReg.PIN_IDX_DCLK]:
+                self._dinClk = GPIOGroup( [self.pin[ShiftReg.PIN_IDX_DIN],
+                                           self.pin[ShiftReg.PIN_IDX_DCLK]] )
             for idx in (ShiftReg.PIN_IDX_DCLR, ShiftReg.PIN_IDX_RCLK, ShiftReg.PIN_IDX_RCLR):
                 if self.pin[idx]:
                     self.pin[idx].set( GPIO.LEVEL_LOW )
@@ -211,6 +245,7 @@ class ShiftReg( Module ):
     def close(self):
         ret = ErrorCode.errOk
         self.disable()
+        self._dinClk = None
         for idx in range(ShiftReg.PIN_MAXNUM):
             if self.pin[idx]:
                 err = self.pin[idx].close()
@@ -220,11 +255,220 @@ class ShiftReg( Module ):
         logging.debug('ShiftReg closed, return: %s.', ret)
         return ret
     
+    #
+    # Internal helpers
+    #
+    
+    def _shiftBits(self, data, numBits):
+        """Shift the given bits into the register through DIN and DCLK.
+        
+        Levels are taken from a pre-computed table. Bits are taken over
+        on the rising DCLK edge. So, DIN may change together with the
+        falling edge of the previous clock cycle: if its level changes,
+        DIN and DCLK are written as a :class:`.GPIOGroup`, which is a
+        single call on implementations supporting bulk access. If
+        setting DIN fails, the clock is not raised anymore, so no stale
+        bit is shifted in. DCLK is left low and the first error
+        encountered is returned.
+        
+        `data` is either an integer or a byte image. For an image, its
+        trailing `numBits` bits are shifted in.
+        """
+        ret = ErrorCode.errOk
+        isImage = not isinstance( data, int )
+        setDinClk = self._dinClk.write
+        setClk = self.pin[ShiftReg.PIN_IDX_DCLK].set
+        level = self._dinLevel
+        clkHigh = False
+        while (numBits > 0) and ret.isOk():
+            num = numBits % 8 or 8
+            numBits -= num
+            if isImage:
+                byte = data[len(data) - 1 - (numBits >> 3)]
+            else:
+                byte = (data >> numBits) & 0xFF
+            for bit in ShiftReg._BYTE_LEVELS[byte][8-num:]:
+                if bit != level:
+                    # DIN is bit #0, DCLK bit #1 of the group, so DCLK goes low
+                    ret = setDinClk( bit )
+                    level = bit
+                elif clkHigh:
+                    ret = setClk( GPIO.LEVEL_LOW )
+                if not ret.isOk():
+                    break
+                clkHigh = False
+                # wait for ~12 ns
+                ret = setClk( GPIO.LEVEL_HIGH )
+                clkHigh = True
+                if not ret.isOk():
+                    break
+        if clkHigh or not ret.isOk():
+            err = setClk( GPIO.LEVEL_LOW )
+            if ret.isOk():
+                ret = err
+        self._dinLevel = level if ret.isOk() else None
+        return ret
+    
+    def _writeImage(self):
+        """Shift the whole image into the register.
+        
+        Derived classes may override this to transfer the image bytes
+        directly, e.g. via SPI.
+        """
+        if not self.pin[ShiftReg.PIN_IDX_DIN] or not self.pin[ShiftReg.PIN_IDX_DCLK]:
+            ret = ErrorCode.errNotSupported
+        else:
+            ret = self._shiftBits( self._image, self.length )
+        return ret
+    
+    def _syncContent(self):
+        """Take the shadow from the image, if it was flushed, last.
+        """
+        if self._contentInImage:
+            mask = (1 << self.length) - 1
+            self._content = int.from_bytes( self._image, "big" ) & mask
+            self._contentInImage = False
+        return None
+    
+    def _skipBits(self, data, numBits, step=1):
+        """Find out, how many bits must be shifted in to get the new content.
+        
+        With the length of the register and its current content known,
+        the leading bits of the new content may already be present in
+        the register, just some stages further in front. Then, shifting
+        in only the trailing bits is sufficient.
+        
+        :param int data: The data to write.
+        :param int numBits: The number of bits in `data` to write.
+        :param int step: Granularity of shifting, e.g. 8 for byte-wise transfers.
+        :return: The number of least-significant bits in `data` to actually shift in.
+        :rtype: int
+        """
+        ret = numBits
+        self._syncContent()
+        if self._contentValid and (self.length > 0) and (numBits >= self.length):
+            target = data & ((1 << self.length) - 1)
+            ret = min( numBits, (self.length + step - 1) // step * step )
+            for num in range(0, self.length, step):
+                if (target >> num) == (self._content & ((1 << (self.length - num)) - 1)):
+                    ret = num
+                    break
+        return ret
+    
+    def _updateContent(self, data, num, numBits):
+        """Update the shadow after shifting in `num` out of `numBits` bits.
+        """
+        self._syncContent()
+        if self.length > 0:
+            mask = (1 << self.length) - 1
+            self._content = ((self._content << num) | (data & ((1 << num) - 1))) & mask
+            if numBits >= self.length:
+                self._contentValid = True
+        if num > 0:
+            self._isLatched = False
+        self._imageValid = False
+        self._dirty = {}
+        return None
+    
     #
     # Module specific API
     #
     
-    def write(self, data, numBits=1, autoLatch=True):
+    @property
+    def content(self):
+        """The current content of the register as remembered by the shadow, or `None` if unknown."""
+        self._syncContent()
+        return self._content if self._contentValid else None
+    
+    def setBit(self, idx, value=True):
+        """Set or clear a single bit of the register content.
+        
+        The change is not written to the register, immediately. Instead,
+        it is kept pending until :meth:`flush` is called. So, any number
+        of bits can be altered at the price of just one write.
+        
+        Bits are indexed the same way as the `data` argument of
+        :meth:`write`. So, index zero is the least-significant bit,
+        which is the bit shifted in last.
+        If the register content is not known, bits not altered
+        explicitly are assumed to be zero.
+        
+        This requires the register length to be configured.
+        Also see: :meth:`Params_init`.
+        
+        :param int idx: The index of the bit to change, 0...length-1.
+        :param bool value: `True` to set, `False` to clear the bit.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        if self.length < 1:
+            ret = ErrorCode.errNotSupported
+        elif not isinstance( idx, int ) or (idx < 0) or (idx >= self.length):
+            ret = ErrorCode.errInvalidParameter
+        else:
+            if not self._imageValid:
+                content = self._content if self._contentValid else 0
+                self._image[:] = content.to_bytes( len(self._image), "big" )
+                self._imageValid = True
+            pos = len(self._image) - 1 - (idx >> 3)
+            mask = 1 << (idx & 0x07)
+            if not pos in self._dirty:
+                self._dirty[pos] = self._image[pos]
+            if value:
+                self._image[pos] |= mask
+            else:
+                self._image[pos] &= ~mask & 0xFF
+        return ret
+    
+    def clearBit(self, idx):
+        """Clear a single bit of the register content.
+        
+        Also see: :meth:`setBit`.
+        
+        :param int idx: The index of the bit to clear, 0...length-1.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        return self.setBit( idx, False )
+    
+    def flush(self, autoLatch=True):
+        """Write all pending bit changes to the register.
+        
+        Does nothing, if there are no changes pending. Only the bytes
+        touched by :meth:`setBit` are compared with the shadow. If none of
+        them differs, nothing is written. Otherwise, the image is written
+        as a whole, byte by byte, without converting it.
+        Also see: :meth:`setBit`.
+        
+        :param bool autoLatch: Whether to automatically latch the result into the buffer.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        if self._dirty:
+            changed = not self._contentValid
+            for pos, value in self._dirty.items():
+                if self._image[pos] != value:
+                    changed = True
+                    break
+            if changed:
+                ret = self._writeImage()
+            if ret.isOk():
+                if changed:
+                    self._contentValid = True
+                    self._contentInImage = True
+                    self._isLatched = False
+                self._dirty = {}
+                if autoLatch and not self._isLatched:
+                    # Intentionally ignore the return as operation might not be supprted
+                    self.latch()
+            else:
+                self._contentValid = False
+        logging.debug('ShiftReg flush, return: %s.', ret)
+        return ret
+    
+    def write(self, data, numBits=None, autoLatch=True):
         """Feed data into the first stage of the shift register.
         
         The lowest significant number of bits as given by the `numBits`
@@ -245,14 +489,31 @@ class ShiftReg( Module ):
         hardware, the resulting content of the shift register is
         latched into the buffer.
         
-        :param int data: The data to send to the shift register.
+        If the register length is configured and `numBits` covers the
+        whole chain, only the bits necessary to obtain the new content
+        are shifted in. Nothing is shifted at all, if the content does
+        not change. Also see: :meth:`Params_init`.
+        
+        Instead of an integer, `data` may also be given as a `bytes` or
+        `bytearray` image, its first byte being the most significant.
+        
+        :param data: The data to send to the shift register.
+        :type data: int or bytes
         :param int numBits: Non-negative number of least-significant \
-        bits in 'data' to shift-in. Usually 1, 4 or multiple of 8. 
+        bits in 'data' to shift-in. Usually 1, 4 or multiple of 8. \
+        If `None`, defaults to 1 for integers and all bits of an image.
         :param bool autoLatch: Whether to automatically latch the result into the buffer.
         :return: An error code indicating either success or the reason of failure.
         :rtype: ErrorCode
         """
         ret = ErrorCode.errOk
+        isImage = data is self._image
+        if isinstance( data, (bytes, bytearray) ):
+            if numBits is None:
+                numBits = len(data) << 3
+            data = int.from_bytes( data, "big" )
+        elif numBits is None:
+            numBits = 1
         if not self.pin[ShiftReg.PIN_IDX_DIN] or not self.pin[ShiftReg.PIN_IDX_DCLK]:
             ret = ErrorCode.errNotSupported
         elif not isinstance( data, int ) or \
@@ -262,17 +523,14 @@ class ShiftReg( Module ):
             # Do nothing
             ret = ErrorCode.errOk
         else:
-            mask = 1 << (numBits-1)
-            for _ in range(numBits):
-                level = GPIO.LEVEL_HIGH if (data & mask) else GPIO.LEVEL_LOW
-                ret = self.pin[ShiftReg.PIN_IDX_DIN].set( level )
-                ret = self.pin[ShiftReg.PIN_IDX_DCLK].set( GPIO.LEVEL_HIGH )
-                # wait for ~12 ns
-                ret = self.pin[ShiftReg.PIN_IDX_DCLK].set( GPIO.LEVEL_LOW )
-                if not ret.isOk():
-                    break
-                mask >>= 1
-            if( ret.isOk() and autoLatch ):
+            num = self._skipBits( data, numBits )
+            ret = self._shiftBits( data, num )
+            if ret.isOk():
+                self._updateContent( data, num, numBits )
+                self._imageValid = isImage
+            else:
+                self._contentValid = False
+            if( ret.isOk() and autoLatch and not self._isLatched ):
                 # Intentionally ignore the return as operation might not be supprted
                 self.latch()
         logging.debug('ShiftReg write(data=%02x, numBits=%d), return: %s.',
@@ -308,6 +566,10 @@ class ShiftReg( Module ):
         if self.pin[ShiftReg.PIN_IDX_ENA]:
             level = GPIO.LEVEL_HIGH if activate else GPIO.LEVEL_LOW
             ret = self.pin[ShiftReg.PIN_IDX_ENA].set( level )
+            if not activate:
+                # Content may get lost
+                self._contentValid = False
+                self._imageValid = False
         else:
             ret = ErrorCode.errNotSupported
         logging.debug('ShiftReg ENA set to %s, return: %s.', activate, ret)
@@ -339,6 +601,11 @@ class ShiftReg( Module ):
             ret = self.pin[ShiftReg.PIN_IDX_DCLR].set( GPIO.LEVEL_HIGH )
             # wait for ~12 ns
             ret = self.pin[ShiftReg.PIN_IDX_DCLR].set( GPIO.LEVEL_LOW )
+            self._content = 0
+            self._contentInImage = False
+            self._contentValid = ret.isOk()
+            self._isLatched = False
+            self._imageValid = False
         else:
             ret = ErrorCode.errNotSupported
         logging.debug('ShiftReg clearData, return: %s.', ret)
@@ -360,6 +627,8 @@ class ShiftReg( Module ):
             ret = self.pin[ShiftReg.PIN_IDX_RCLR].set( GPIO.LEVEL_HIGH )
             # wait for ~12 ns
             ret = self.pin[ShiftReg.PIN_IDX_RCLR].set( GPIO.LEVEL_LOW )
+            self._syncContent()
+            self._isLatched = ret.isOk() and self._contentValid and (self._content == 0)
         else:
             ret = ErrorCode.errNotSupported
         logging.debug('ShiftReg clearLatch, return: %s.', ret)
@@ -381,6 +650,7 @@ class ShiftReg( Module ):
             ret = self.pin[ShiftReg.PIN_IDX_RCLK].set( GPIO.LEVEL_HIGH )
             # wait for ~12 ns
             ret = self.pin[ShiftReg.PIN_IDX_RCLK].set( GPIO.LEVEL_LOW )
+            self._isLatched = ret.isOk()
         else:
             ret = ErrorCode.errNotSupported
         logging.debug('ShiftReg latch, return: %s.', ret)
@@ -409,6 +679,7 @@ class ShiftReg( Module ):
             flagWrite = True
     
         if flagWrite:
-            ret = self.write( 0, 32 )	# autoLatch clears the buffer
+            numBits = self.length if self.length > 0 else 32
+            ret = self.write( 0, numBits )	# autoLatch clears the buffer
         return ret
     
\ No newline at end of file
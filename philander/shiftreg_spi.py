@@ -107,50 +107,82 @@ class ShiftRegSPI( ShiftReg ):
         logging.debug('ShiftReg closed, return: %s.', ret)
         return ret
     
+    def _writeImage(self):
+        """Send the whole image in a single SPI transfer.
+        """
+        if not self.serbusdev:
+            ret = ErrorCode.errNotInited
+        else:
+            ret = self.serbusdev.writeBuffer( list( self._image ) )
+        return ret
+    
     #
     # Module specific API
     #
     
-    def write(self, data, numBits=8, autoLatch=True):
+    def write(self, data, numBits=None, autoLatch=True):
         """Feed data into the shift register.
         
         As the underlying mechanism is SPI, only full bytes can be
         written to the register. So, 'numBits' must be a multiple of 8.
-        At maximum, four bytes can be written at once, so numBits must
-        be one of `numBits={8 | 16 | 24 | 32}`.
         The highest-significant byte selected is written first.
         If, for example, `data = 0xa4b3c2d1` and `numBits=24`, the
         sequence shifted into the register is `b3-c2-d1`. 
         
+        Any number of bytes is sent in a single SPI transfer. For long
+        chains, `data` may as well be given as a `bytes` or `bytearray`
+        image, its first byte being shifted in first. If the register
+        length is configured and `numBits` covers the whole chain, only
+        the trailing bytes that differ from the current content are
+        sent. Also see: :meth:`.ShiftReg.write`.
+        
         If `autoLatch` is `True` and depending on the underlying
         hardware, the resulting content of the shift register is
         latched into the buffer.
         
-        :param int data: The data to send to the shift register.
+        :param data: The data to send to the shift register.
+        :type data: int or bytes
         :param int numBits: Non-negative number of least-significant \
-        bits in 'data' to shift-in. One of `{8 | 16 | 24 | 32}`. 
+        bits in 'data' to shift-in. Must be a multiple of 8. If `None`, \
+        defaults to 8 for integers and all bits of an image.
         :param bool autoLatch: Whether to automatically latch the result into the buffer.
         :return: An error code indicating either success or the reason of failure.
         :rtype: ErrorCode
         """
         ret = ErrorCode.errOk
+        isImage = data is self._image
+        buf = None
+        if isinstance( data, (bytes, bytearray) ):
+            if numBits is None:
+                numBits = len(data) << 3
+            if isinstance( numBits, int ) and (numBits <= (len(data) << 3)):
+                buf = data[len(data) - (numBits >> 3):]
+            data = int.from_bytes( data, "big" )
+        elif numBits is None:
+            numBits = 8
         if not self.serbusdev:
             ret = ErrorCode.errNotInited
         elif not isinstance( data, int ) or \
-             not isinstance( numBits, int ) or (numBits not in [0,8,16,24,32]):
+             not isinstance( numBits, int ) or (numBits < 0) or (numBits & 0x07):
             ret = ErrorCode.errInvalidParameter
         elif numBits == 0:
             # Do nothing
             ret = ErrorCode.errOk
         else:
-            buf = []
-            while numBits > 0:
-                numBits -= 8
-                buf.append( (data >> numBits) & 0xFF )
-            ret = self.serbusdev.writeBuffer(buf)
-            if( ret.isOk() and autoLatch ):
+            numBytes = numBits >> 3
+            if buf is None:
+                buf = (data & ((1 << numBits) - 1)).to_bytes( numBytes, "big" )
+            num = self._skipBits( data, numBits, 8 )
+            if num > 0:
+                ret = self.serbusdev.writeBuffer( list( buf[numBytes - (num >> 3):] ) )
+            if ret.isOk():
+                self._updateContent( data, num, numBits )
+                self._imageValid = isImage
+            else:
+                self._contentValid = False
+            if( ret.isOk() and autoLatch and not self._isLatched ):
                 self.latch()
                 
-        logging.debug('ShiftReg write(data=%02x, numBits=%d), return: %s.',
+        logging.debug('ShiftReg write(data=%x, numBits=%s), return: %s.',
                       data, numBits, ret)
         return ret
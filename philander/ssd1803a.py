@@ -84,6 +84,7 @@ class SSD1803A( TextDisplay ):
         # Derived attributes
         self._widthChar = 20
         self._heightChar = 4
+        self._numUserChars = 8  # CGRAM characters, codes 0...7
         # Own attributes
         self._serbusdev = None
 
@@ -165,19 +166,19 @@ class SSD1803A( TextDisplay ):
         if not data:
             ret = ErrorCode.errFewData
         elif self._serbusdev.serialBus.type == SerialBusType.SPI:
-            # Start byte, RS=1, R/W=0
+            # Start byte, RS=1, R/W=0, followed by two nibbles per
+            # data byte. Send all of it in one transfer.
+            wbuf = [0] * (2 * len(data))
+            for idx in range( len(data) ):
+                b = data[idx]
+                wbuf[2*idx] = b & 0x0F
+                wbuf[2*idx+1] = (b & 0xF0) >> 4
             if self._serbusdev.serialBus.spiBitOrder == "MSB":
-                ret = self._serbusdev.writeBuffer( [0xFA] )
+                self._reverseBitOrder( wbuf )
+                wbuf.insert( 0, 0xFA )
             else:
-                ret = self._serbusdev.writeBuffer( [0x5F] )
-
-            for b in data:
-                wbuf = [ (b & 0x0F), (b & 0xF0)>>4 ]
-                if self._serbusdev.serialBus.spiBitOrder == "MSB":
-                    self._reverseBitOrder( wbuf )
-                ret = self._serbusdev.writeBuffer( wbuf )
-                if not ret.isOk():
-                    break
+                wbuf.insert( 0, 0x5F )
+            ret = self._serbusdev.writeBuffer( wbuf )
         elif self._serbusdev.serialBus.type == SerialBusType.I2C:
             # D/C#=1, Co=0
             ret = self._serbusdev.writeBufferRegister( 0x40, data )
@@ -596,6 +597,48 @@ class SSD1803A( TextDisplay ):
         :return: An error code indicating either success or the reason of failure.
         :rtype: ErrorCode
         """
-        ret = self._writeRAM( code )
+        ret = self._writeRAM( [code] )
+        return ret
+
+    def _drvPrintString( self, data ):
+        """Print a run of characters starting at the internal ``current position``.
+        
+        The address counter auto-increments, so the whole run goes
+        into one RAM write.
+        
+        :param bytes data: The character codes to print.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = self._writeRAM( data )
+        return ret
+
+    def _drvSetUserChar( self, code, data ):
+        """Define the appearance of a user-definable character.
+        
+        The SSD1803A provides 8 CGRAM characters at codes 0...7, each
+        of them 8 rows high. Rows not given are left blank.
+        
+        :param int code: The character code to re-define, 0...7.
+        :param bytes data: The glyph data, one byte per row.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        if (code < 0) or (code >= self._numUserChars) or (len(data) > 8):
+            ret = ErrorCode.errInvalidParameter
+        else:
+            width = self._font.charWidth if self._font else 5
+            mask = (1 << width) - 1
+            rows = [(b & mask) for b in data] + [0] * (8 - len(data))
+            self._instrFunctionSet(RE=0)
+            ret = self._writeCmd( 0x40 | (code << 3) )  # Set CGRAM address
+            if ret.isOk():
+                ret = self._writeRAM( rows )
+            # Get back to DDRAM, so printing continues where it was.
+            err = self._drvGoTo( self._currentX, self._currentY )
+            ret = err if ret.isOk() else ret
+        logging.debug("SSD1803A._drvSetUserChar> code=%d, return: %s",
+                      code, ret)
         return ret
 
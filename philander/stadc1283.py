@@ -8,7 +8,11 @@ __author__ = "Oliver Maye"
 __version__ = "0.1"
 __all__ = ["_ADC_STADC1283"]
 
+from array import array
+import logging
+
 from philander.adc import ADC
+from philander.ptime import sleepUs, ticksAdd, ticksDiff, ticksUs
 from philander.serialbus import SerialBusDevice, SerialBusType
 from philander.sysfactory import SysProvider
 from philander.systypes import ErrorCode
@@ -24,12 +28,23 @@ class STADC1283( ADC, SerialBusDevice ):
     
     USE_CONFIGURED_CHANNEL = 8
     
+    BURST_MAX_FRAMES = 1024     # Maximum number of conversions per SPI transfer
+    DEFAULT_SCAN_DEPTH = 64     # Number of sweeps kept by a continuous scan
+    
     def __init__(self):
         """Initialize the instance with defaults.
         """
         ADC.__init__(self)
         SerialBusDevice.__init__(self)
         self.provider = SysProvider.COMPOSITE
+        self._scanWorker = None
+        self._scanDone = True
+        self._scanLock = None
+        self._scanBuf = None        # Ring buffer of sweeps
+        self._scanWidth = 0         # Number of channels per sweep
+        self._scanHead = 0          # Number of sweeps written
+        self._scanTail = 0          # Number of sweeps read
+        self._scanErr = ErrorCode.errOk
 
     #
     # Module API
@@ -110,6 +125,7 @@ class STADC1283( ADC, SerialBusDevice ):
         """
         ret = ErrorCode.errOk
         if self.isOpen:
+            self.stopScan()
             ret = SerialBusDevice.close(self)
             err = ADC.close(self)
             if ret.isOk():
@@ -170,3 +186,266 @@ class STADC1283( ADC, SerialBusDevice ):
             val, err = self.toVoltage( dval )
         return val, err
 
+    def _readSample(self):
+        """Take a single sample from the configured channel without further checks.
+        
+        Also see: :meth:`.ADC._readSample`.
+        
+        :return: A value in the range [0, DIGITAL_MAX] and an error code\
+        indicating either success or the reason of failure.
+        :rtype: int, ErrorCode
+        """
+        val = 0
+        if self.channel == self.DEFAULT_CHANNEL:
+            data, err = self.writeReadBuffer( [0, 0], 2 )
+        else:
+            data, err = self.writeReadBuffer( [self.channel << 3, 0, 0, 0], 2 )
+        if err.isOk():
+            val = ((data[0] << 8) + data[1]) & self.DIGITAL_MAX
+        return val, err
+
+    def _readBlock(self, samples, stamps, rate, oversampling):
+        """Fill the given buffers with consecutive samples.
+        
+        When sampling as fast as possible and without time stamps, many
+        conversions are clocked out in a single SPI transfer. The chip
+        converts the channel addressed in the previous frame. So, the
+        transfer just repeats the channel address in every frame.
+        Otherwise, samples are taken one by one.
+        
+        Also see: :meth:`.ADC._readBlock`.
+        
+        :param array samples: The pre-allocated buffer to receive the samples.
+        :param array stamps: The pre-allocated buffer to receive the time stamps or `None`.
+        :param int rate: The sampling rate in Hz or zero.
+        :param int oversampling: The number of readings to average per sample; positive.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        if (rate > 0) or (stamps is not None):
+            err = super()._readBlock( samples, stamps, rate, oversampling )
+        else:
+            err = ErrorCode.errOk
+            remain = len(samples) * oversampling
+            half = oversampling // 2
+            cb = self.channel << 3
+            idx = acc = cnt = 0
+            while err.isOk() and (remain > 0):
+                num = min( remain, self.BURST_MAX_FRAMES )
+                # The first frame after CS falls always converts channel 0.
+                if self.channel == self.DEFAULT_CHANNEL:
+                    outBuf = [0, 0] * num
+                else:
+                    outBuf = [cb, 0] * (num + 1)
+                data, err = self.writeReadBuffer( outBuf, 2 * num )
+                if err.isOk():
+                    for pos in range( 0, 2 * num, 2 ):
+                        acc += ((data[pos] << 8) + data[pos+1]) & self.DIGITAL_MAX
+                        cnt += 1
+                        if cnt >= oversampling:
+                            samples[idx] = (acc + half) // oversampling
+                            idx += 1
+                            acc = cnt = 0
+                remain -= num
+        return err
+
+    def _checkChannels(self, channels):
+        """Check the given list of channels for a multi-channel conversion.
+        
+        :param channels: The channels to check.
+        :return: True, if the channels are valid; False otherwise.
+        :rtype: bool
+        """
+        ret = (channels is not None) and (0 < len(channels) < self.BURST_MAX_FRAMES)
+        if ret:
+            for channel in channels:
+                if not isinstance(channel, int) or (channel < 0) or (channel > 7):
+                    ret = False
+                    break
+        return ret
+    
+    def _prepareMulti(self, channels):
+        """Build the SPI output buffer for a multi-channel conversion.
+        
+        Every frame sends the address of the channel to convert in the
+        next frame. The first frame after CS falls always converts
+        channel 0. So, an extra leading frame is needed only if the
+        first channel is not channel 0.
+        
+        :param channels: The channels to convert.
+        :return: The output buffer.
+        :rtype: list
+        """
+        if channels[0] == self.DEFAULT_CHANNEL:
+            addresses = list(channels[1:]) + [0]
+        else:
+            addresses = list(channels) + [0]
+        outBuf = [0, 0] * len(addresses)
+        for idx, channel in enumerate(addresses):
+            outBuf[2*idx] = channel << 3
+        return outBuf
+    
+    def _decodeMulti(self, data, values, offset=0):
+        """Decode the response of a multi-channel conversion.
+        
+        :param data: The bytes received.
+        :param values: The buffer to receive the digital values.
+        :param int offset: The index in `values` to store the first value at.
+        :return: None
+        :rtype: None
+        """
+        mask = self.DIGITAL_MAX
+        for pos in range( 0, len(data), 2 ):
+            values[offset] = ((data[pos] << 8) + data[pos+1]) & mask
+            offset += 1
+        return None
+    
+    def getDigitalMulti(self, channels, values=None):
+        """Retrieve samples of several channels in a single transfer.
+        
+        The chip converts the channel addressed in the previous SPI
+        frame, while clocking out the current result. This pipelining
+        is used to convert all channels in a single SPI transfer of
+        just one frame more than the number of channels.
+        Channels may be given in any order and may repeat.
+        
+        :param channels: The list of channels to convert, each in [0, 7].
+        :param values: Optional pre-allocated buffer to receive the results. If `None`, a new `array("H")` is created.
+        :return: The digital values in the order of `channels` and an\
+        error code indicating either success or the reason of failure.
+        :rtype: array, ErrorCode
+        """
+        err = ErrorCode.errOk
+        if not self.isOpen:
+            err = ErrorCode.errResourceConflict
+        elif not self._checkChannels( channels ):
+            err = ErrorCode.errInvalidParameter
+        elif values is None:
+            values = array( "H", [0] * len(channels) )
+        elif len(values) < len(channels):
+            err = ErrorCode.errInvalidParameter
+        if err.isOk():
+            outBuf = self._prepareMulti( channels )
+            data, err = self.writeReadBuffer( outBuf, 2 * len(channels) )
+            if err.isOk():
+                self._decodeMulti( data, values )
+        return values, err
+
+    def _scanLoop(self, outBuf, period):
+        logging.debug("STADC1283 starts scanning.")
+        inLength = 2 * self._scanWidth
+        depth = len(self._scanBuf) // self._scanWidth
+        periodUs = int( period * 1000000 )
+        tNext = ticksUs()
+        while not self._scanDone:
+            if periodUs > 0:
+                delay = ticksDiff( tNext, ticksUs() )
+                if delay > 0:
+                    sleepUs( delay )
+                tNext = ticksAdd( tNext, periodUs )
+            data, err = self.writeReadBuffer( outBuf, inLength )
+            with self._scanLock:
+                if err.isOk():
+                    self._decodeMulti( data, self._scanBuf, (self._scanHead % depth) * self._scanWidth )
+                    self._scanHead += 1
+                else:
+                    self._scanErr = err
+                    self._scanDone = True
+        logging.debug("STADC1283 terminates scanning.")
+
+    def startScan(self, channels, rate=0, depth=DEFAULT_SCAN_DEPTH):
+        """Start converting the given channels, continuously.
+        
+        A background worker repeatedly sweeps over the given channels
+        as in :meth:`getDigitalMulti` and stores the results in a ring
+        buffer of `depth` sweeps. Use :meth:`readScan` to retrieve the
+        results and :meth:`stopScan` to end scanning.
+        
+        :param channels: The list of channels to convert, each in [0, 7].
+        :param int rate: The number of sweeps per second or zero to scan as fast as possible.
+        :param int depth: The number of sweeps to keep in the ring buffer.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        err = ErrorCode.errOk
+        if not self.isOpen:
+            err = ErrorCode.errResourceConflict
+        elif not self._checkChannels( channels ) or \
+             not isinstance(rate, int) or (rate < 0) or \
+             not isinstance(depth, int) or (depth < 1):
+            err = ErrorCode.errInvalidParameter
+        else:
+            try:
+                from threading import Thread, Lock
+            except ImportError:
+                err = ErrorCode.errNotSupported
+        if err.isOk():
+            self.stopScan()
+            self._scanWidth = len(channels)
+            self._scanBuf = array( "H", [0] * (depth * self._scanWidth) )
+            self._scanHead = self._scanTail = 0
+            self._scanErr = ErrorCode.errOk
+            self._scanLock = Lock()
+            self._scanDone = False
+            period = (1 / rate) if (rate > 0) else 0
+            self._scanWorker = Thread( target=self._scanLoop, name="STADC1283 scan",
+                                       args=(self._prepareMulti( channels ), period) )
+            self._scanWorker.start()
+        return err
+
+    def readScan(self):
+        """Retrieve the sweeps converted since the last call.
+        
+        The result holds the sweeps, oldest first, one after the other.
+        Each sweep consists of one value per channel, in the order given
+        to :meth:`startScan`. If the ring buffer overflowed, the oldest
+        sweeps are lost and :attr:`.ErrorCode.errOverflow` is returned
+        along with the remaining ones. If scanning was terminated by an
+        error, that error is reported once all sweeps have been read.
+        
+        :return: The digital values and an error code indicating either\
+        success or the reason of failure.
+        :rtype: array, ErrorCode
+        """
+        err = ErrorCode.errOk
+        values = array( "H" )
+        if self._scanBuf is None:
+            err = ErrorCode.errNotInited
+        else:
+            width = self._scanWidth
+            depth = len(self._scanBuf) // width
+            with self._scanLock:
+                if self._scanHead - self._scanTail > depth:
+                    self._scanTail = self._scanHead - depth
+                    err = ErrorCode.errOverflow
+                first = (self._scanTail % depth) * width
+                last = (self._scanHead % depth) * width
+                if self._scanHead == self._scanTail:
+                    pass
+                elif first < last:
+                    values = self._scanBuf[first:last]
+                else:
+                    values = self._scanBuf[first:] + self._scanBuf[:last]
+                self._scanTail = self._scanHead
+                if err.isOk() and (len(values) == 0) and not self._scanErr.isOk():
+                    err = self._scanErr
+        return values, err
+
+    def stopScan(self):
+        """Stop a continuous scan.
+        
+        Sweeps converted but not read yet, can still be retrieved by
+        :meth:`readScan`.
+        
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        err = ErrorCode.errOk
+        if self._scanWorker:
+            if self._scanWorker.is_alive():
+                self._scanDone = True
+                self._scanWorker.join()
+            self._scanWorker = None
+        else:
+            err = ErrorCode.errInadequate
+        return err
@@ -89,6 +89,18 @@ class STC3117(STC311x):
                 ret = self._transferCurrentAvg(data)
         return ret
 
+    def _decodeSnapshotAvg(self, opMode, data):
+        # The average current register holds the change rate in voltage mode.
+        reg = self.REGISTER.REG_AVG_CURRENT - self.REGISTER.REG_MODE
+        raw = data[reg] | (data[reg + 1] << 8)
+        currentAvg = Current.invalid
+        changeRate = SOCChangeRate.invalid
+        if opMode == OperatingMode.opModeMixed:
+            currentAvg = self._transferCurrentAvg(raw)
+        elif opMode == OperatingMode.opModeVoltage:
+            changeRate = self._transferChangeRate(raw)
+        return currentAvg, changeRate
+
     def _setupCurrentMonitoring(self):
         err = super()._setupCurrentMonitoring()
         if err.isOk():
@@ -25,6 +25,7 @@ class STC3117_Reg(STC311x_Reg):
 
     # Register 1: REG_CTRL
     CTRL_UVLOD = 0x80  # UVLO event detection
+    CTRL_INT_SOURCES = STC311x_Reg.CTRL_INT_SOURCES | CTRL_UVLOD
 
     # Register 2: REG_SOC_L
     # Register 3: REG_SOC_H
@@ -40,6 +41,7 @@ class STC3117_Reg(STC311x_Reg):
     REG_AVG_CURRENT_L = 11
     REG_AVG_CURRENT_H = 12
     REG_AVG_CURRENT = REG_AVG_CURRENT_L  # Battery average current or SOC change rate
+    REG_SNAPSHOT_LAST = REG_AVG_CURRENT_H
 
     # Register 13: REG_OCV_L
     # Register 14: REG_OCV_H
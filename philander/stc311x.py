@@ -2,13 +2,14 @@
 """
 __author__ = "Carl Bellgardt"
 __version__ = "0.1"
-__all__ = ["STC311x", "OperatingMode"]
+__all__ = ["STC311x", "OperatingMode", "Snapshot"]
 
+from collections import namedtuple
 import time
 from philander.penum import Enum, unique, auto, idiotypic
 
 from philander.battery import Status as BatStatus, Level as BatLevel
-from philander.gasgauge import GasGauge, SOCChangeRate, StatusID
+from philander.gasgauge import GasGauge, SOCChangeRate, StatusID, EventContext, EventSource
 from philander.gpio import GPIO
 from philander.interruptable import Interruptable, Event
 from philander.primitives import Current, Voltage, Percentage, Temperature
@@ -26,6 +27,17 @@ class OperatingMode(Enum):
     opModeMixed = auto()
 
 
+Snapshot = namedtuple( "Snapshot", ("timestamp", "counter", "opMode",
+                                    "soc", "voltage", "current", "temperature",
+                                    "currentAvg", "changeRate") )
+"""Immutable record of the gas gauge telemetry, as taken by :meth:`.STC311x.getSnapshot`.
+
+The `timestamp` is given in seconds as retrieved by `time.time()`.
+The `counter` is the chip's conversion counter, that may be used to
+tell if two snapshots are based on the same conversion.
+"""
+
+
 class STC311x(GasGauge, SerialBusDevice, Interruptable):
     """Base implementation for the stc311x gas gauge chip family.
     
@@ -47,6 +59,7 @@ class STC311x(GasGauge, SerialBusDevice, Interruptable):
     ALARM_VOLTAGE_DEFAULT = 3000 # default voltage alarm threshold [mV]
     RELAX_CURRENT_DEFAULT = 5000 # default current monitoring threshold [uA]
     RELAX_TIMER_DEFAULT   = 480  # default current monitoring timer [s]
+    BACKUP_INTERVAL_DEFAULT = 60 # default RAM backup interval [s]
     
     # Constants needed only for the implementation
     POR_TIMEOUT = 3  # POR timeout i seconds
@@ -64,17 +77,23 @@ class STC311x(GasGauge, SerialBusDevice, Interruptable):
         self.alarmVoltage = None    # Voltage alarm threshold [mV]
         self.relaxCurrent = None    # Current monitoring threshold [uA]
         self.relaxTimerCC2VM = None # Current monitor timing CC->VM [s]
+        self.backupInterval = None  # RAM backup interval [s]
+        self._backupTime = 0        # Time of the last RAM backup
+
+    def _decodeOperatingMode(self, data):
+        if data & self.REGISTER.MODE_GG_RUN:
+            if data & self.REGISTER.MODE_VMODE:
+                ret = OperatingMode.opModeVoltage
+            else:
+                ret = OperatingMode.opModeMixed
+        else:
+            ret = OperatingMode.opModeStandby
+        return ret
 
     def _getOperatingMode(self):
         data, err = self.readByteRegister(self.REGISTER.REG_MODE)
         if err.isOk():
-            if data & self.REGISTER.MODE_GG_RUN:
-                if data & self.REGISTER.MODE_VMODE:
-                    ret = OperatingMode.opModeVoltage
-                else:
-                    ret = OperatingMode.opModeMixed
-            else:
-                ret = OperatingMode.opModeStandby
+            ret = self._decodeOperatingMode(data)
         else:
             ret = OperatingMode.opModeUnknown
         return ret
@@ -100,6 +119,7 @@ class STC311x(GasGauge, SerialBusDevice, Interruptable):
         Gasgauge.alarm.voltage               ``int`` Voltage alarm threshold [mV]; default is ``ALARM_VOLTAGE_DEFAULT``
         Gasgauge.relax.current               ``int`` Current monitoring threshold [uA]; default is ``RELAX_CURRENT_DEFAULT``
         Gasgauge.relax.timer                 ``int`` Current monitoring timer count [s]; default is ``RELAX_TIMER_DEFAULT``
+        Gasgauge.backup.interval             ``int`` Minimum time between two SOC backups to the chip RAM [s]; 0 disables periodic backups; default is ``BACKUP_INTERVAL_DEFAULT``
         Gasgauge.int.gpio.*                  ALM pin configuration; See :meth:`.GPIO.Params_init`.
         ===============================================================================================================================================
         
@@ -114,6 +134,7 @@ class STC311x(GasGauge, SerialBusDevice, Interruptable):
             "Gasgauge.alarm.voltage":       cls.ALARM_VOLTAGE_DEFAULT,
             "Gasgauge.relax.current":       cls.RELAX_CURRENT_DEFAULT,
             "Gasgauge.relax.timer":         cls.RELAX_TIMER_DEFAULT,
+            "Gasgauge.backup.interval":     cls.BACKUP_INTERVAL_DEFAULT,
             "Gasgauge.int.gpio.direction":  GPIO.DIRECTION_IN,
             "Gasgauge.int.gpio.trigger":    GPIO.TRIGGER_EDGE_FALLING,
             "Gasgauge.int.gpio.bounce" :    GPIO.BOUNCE_NONE,
@@ -129,6 +150,10 @@ class STC311x(GasGauge, SerialBusDevice, Interruptable):
         user-adjustable parameters to meaningful defaults.
         In this case the registers for the specific chip are defined
         and optionally the GPIO-Pin for interrupts is initialized.
+        If the chip RAM holds a consistent backup of a previous session
+        and the battery was not removed in the meantime, the gas gauge
+        state is restored from that backup. Otherwise, the gas gauge is
+        initialized from scratch.
         This function must be called prior to any further usage of the
         instance. Involving it in the system ramp-up procedure could be
         a good choice. After usage of this instance is finished, the
@@ -150,6 +175,7 @@ class STC311x(GasGauge, SerialBusDevice, Interruptable):
             self.alarmVoltage = paramDict["Gasgauge.alarm.voltage"]
             self.relaxCurrent = paramDict["Gasgauge.relax.current"]
             self.relaxTimerCC2VM = paramDict["Gasgauge.relax.timer"]
+            self.backupInterval = paramDict["Gasgauge.backup.interval"]
             err = self._setup()
         if err.isOk() and ("Gasgauge.int.gpio.pinDesignator" in paramDict):
             # Setup GPIO pin for interrupts
@@ -168,6 +194,7 @@ class STC311x(GasGauge, SerialBusDevice, Interruptable):
         e.g. as part of the application exit procedure.
         The following steps are executed:
 
+        * backup the gas gauge state to the chip RAM and shut down
         * close I2C-Bus connection
         * close GPIO pin for interrupts
         
@@ -192,11 +219,15 @@ class STC311x(GasGauge, SerialBusDevice, Interruptable):
         recovers from these modes. Situation-aware deployment of these
         modes can greatly reduce the system's total power consumption.
         
+        When shutting down, the RAM backup is done first. If that fails,
+        the device is shut down, anyway, and the backup error is reported.
+        
         :param RunLevel level: The level to switch to.
         :return: An error code indicating either success or the reason of failure.
         :rtype: ErrorCode
         """
         ret = ErrorCode.errOk
+        backupErr = ErrorCode.errOk
         mode = self.REGISTER.MODE_OFF
         if level in [RunLevel.active, RunLevel.idle]:
             # Mixed mode: coulomb counter + voltage gas gauge -> Leave VMODE off
@@ -209,13 +240,15 @@ class STC311x(GasGauge, SerialBusDevice, Interruptable):
             if self.pinInt:
                 mode |= self.REGISTER.MODE_ALM_ENA
         elif level == RunLevel.shutdown:
-            # ret = backupRam(self)
+            backupErr = self._backupRam()
             mode = self.REGISTER.MODE_VMODE | self.REGISTER.MODE_FORCE_VM
         else:
             ret = ErrorCode.errNotSupported
         # set mode and return ErrorCode
         if ret.isOk():
             ret = SerialBusDevice.writeByteRegister(self,  self.REGISTER.REG_MODE, mode)
+        if ret.isOk():
+            ret = backupErr
         return ret
     
     #
@@ -354,9 +387,9 @@ class STC311x(GasGauge, SerialBusDevice, Interruptable):
         data, err = SerialBusDevice.readWordRegister(self, self.REGISTER.REG_SOC)
         if err.isOk():
             ret = self._transferSOC(data)
-            # future RAM-functions could be implemented here
-            # if ret != Percentage.invalid:
-            #    updateRamWord(self,  self.REGISTER._IDX_RAM_SOC)
+            if (self.backupInterval is not None) and (self.backupInterval > 0) and \
+               (time.time() - self._backupTime >= self.backupInterval):
+                self._backupSOC(data)
         else:
             ret = Percentage.invalid
         return ret
@@ -411,6 +444,55 @@ class STC311x(GasGauge, SerialBusDevice, Interruptable):
             ret = Current.invalid
         return ret
 
+    def _decodeSnapshotAvg(self, opMode, data):
+        # Chip-specific part of a snapshot: average current and change rate.
+        del opMode, data
+        return Current.invalid, SOCChangeRate.invalid
+
+    def _decodeSnapshot(self, data):
+        # Data is the register block, starting at REG_MODE.
+        first = self.REGISTER.REG_MODE
+        def word(reg):
+            return data[reg - first] | (data[reg - first + 1] << 8)
+        opMode = self._decodeOperatingMode(data[self.REGISTER.REG_MODE - first])
+        temp = data[self.REGISTER.REG_TEMPERATURE - first]
+        if temp >= 0x80:
+            temp -= 0x100
+        currentAvg, changeRate = self._decodeSnapshotAvg(opMode, data)
+        return Snapshot( timestamp=time.time(),
+                         counter=word(self.REGISTER.REG_COUNTER),
+                         opMode=opMode,
+                         soc=self._transferSOC(word(self.REGISTER.REG_SOC)),
+                         voltage=self._transferVoltage(word(self.REGISTER.REG_VOLTAGE)),
+                         current=Current(self._transferCurrent(word(self.REGISTER.REG_CURRENT))),
+                         temperature=Temperature(temp),
+                         currentAvg=currentAvg,
+                         changeRate=changeRate )
+
+    def getSnapshot(self):
+        """Retrieves all telemetry data at once.
+        
+        The contiguous block of registers from the mode register up to
+        the temperature (STC3115) or average current (STC3117) is read
+        in a single bus transfer. Compared to calling
+        :meth:`getStateOfCharge`, :meth:`getBatteryVoltage`,
+        :meth:`getBatteryCurrent` etc. one after the other, this saves
+        bus traffic and delivers values that are consistent with each
+        other.
+        
+        Fields that are not available in the current operating mode or
+        on this chip are set to their respective ``invalid`` value.
+        
+        :return: The snapshot record and an error code indicating either success or the reason of failure.
+        :rtype: Snapshot, ErrorCode
+        """
+        ret = None
+        first = self.REGISTER.REG_MODE
+        data, err = self.readBufferRegister(first, self.REGISTER.REG_SNAPSHOT_LAST - first + 1)
+        if err.isOk():
+            ret = self._decodeSnapshot(data)
+        return ret, err
+
     # Local functions for internal use
 
     @staticmethod
@@ -445,57 +527,54 @@ class STC311x(GasGauge, SerialBusDevice, Interruptable):
                 ret = ErrorCode.errOk
         return ret
 
-# UNUSED static ErrorCode_t updateRamWord( const Device_Index_t devIdx, const unsigned int ramIndex, const uint16_t newData )
-# {
-#     ErrorCode_t ret = errOk;
-#     uint8_t buffer[RAM_SIZE + 1];
-#     uint8_t *ramContent;
-#     uint8_t data8;
-#
-#     ramContent = &buffer[1];
-#     data8 = REG_RAM_FIRST;
-#     ret = Serial_Bus_read_write_Buffer( &dContext[devIdx].sdev, ramContent, RAM_SIZE, &data8, 1);
-#
-#     if( ret == errOk )
-#     {
-#         ret = checkRamConsistency( ramContent, RAM_SIZE );
-#     }
-#     if( ret == errOk )
-#     {
-#         ramContent[ramIndex] = newData & 0xFF;
-#         ramContent[ramIndex+1] = newData >> 8;
-#         ramContent[IDX_RAM_CRC] = crc( ramContent, RAM_SIZE-1 );
-#         buffer[0] = REG_RAM_FIRST;
-#         ret = Serial_Bus_write_Buffer( &dContext[devIdx].sdev, buffer, RAM_SIZE + 1 );
-#     }
-#     return ret;
-# }
-#
-# UNUSED static ErrorCode_t backupRam( const Device_Index_t devIdx )
-# {
-#     ErrorCode_t ret = errOk;
-#     uint8_t buffer[RAM_SIZE + 1];
-#     uint8_t *ramContent;
-#     uint16_t data16;
-#
-#     ramContent = &buffer[1];
-#     memset( ramContent, 0, RAM_SIZE );
-#     ramContent[IDX_RAM_TEST] = RAM_TEST;
-#     ret = Serial_Bus_read_Reg_Word( &dContext[devIdx].sdev, REG_SOC, &data16 );
-#     ramContent[IDX_RAM_SOC_L]= data16 & 0xFF;
-#     ramContent[IDX_RAM_SOC_H]= data16 >> 8;
-#     ret = Serial_Bus_read_Reg_Word( &dContext[devIdx].sdev, REG_CC_CNF, &data16 );
-#     ramContent[IDX_RAM_CC_CNF_L]= data16 & 0xFF;
-#     ramContent[IDX_RAM_CC_CNF_H]= data16 >> 8;
-#     ret = Serial_Bus_read_Reg_Word( &dContext[devIdx].sdev, REG_VM_CNF, &data16 );
-#     ramContent[IDX_RAM_VM_CNF_L]= data16 & 0xFF;
-#     ramContent[IDX_RAM_VM_CNF_H]= data16 >> 8;
-#     ramContent[IDX_RAM_CRC] =   crc( ramContent, RAM_SIZE - 1 );
-#     buffer[0] = REG_RAM_FIRST;
-#     Serial_Bus_write_Buffer(&dContext[devIdx].sdev, buffer, RAM_SIZE + 1 );
-#
-#     return ret;
-# }
+    def _composeRam(self, soc, cnfCC, cnfVM):
+        ramContent = [0] * self.REGISTER.RAM_SIZE
+        ramContent[self.REGISTER.IDX_RAM_TEST] = self.REGISTER.RAM_TEST
+        ramContent[self.REGISTER.IDX_RAM_SOC_L] = soc & 0xFF
+        ramContent[self.REGISTER.IDX_RAM_SOC_H] = soc >> 8
+        ramContent[self.REGISTER.IDX_RAM_CC_CNF_L] = cnfCC & 0xFF
+        ramContent[self.REGISTER.IDX_RAM_CC_CNF_H] = cnfCC >> 8
+        ramContent[self.REGISTER.IDX_RAM_VM_CNF_L] = cnfVM & 0xFF
+        ramContent[self.REGISTER.IDX_RAM_VM_CNF_H] = cnfVM >> 8
+        ramContent[self.REGISTER.IDX_RAM_CRC] = self._crc(ramContent, self.REGISTER.RAM_SIZE - 1)
+        return ramContent
+
+    def _updateRamWord(self, index, value):
+        # Update a single word in the RAM backup, if it is consistent.
+        ramContent, err = self.readBufferRegister(self.REGISTER.REG_RAM_FIRST, self.REGISTER.RAM_SIZE)
+        if err.isOk():
+            err = self._checkRamConsistency(ramContent)
+        if err.isOk():
+            ramContent = list(ramContent)
+            ramContent[index] = value & 0xFF
+            ramContent[index + 1] = value >> 8
+            ramContent[self.REGISTER.IDX_RAM_CRC] = self._crc(ramContent, self.REGISTER.RAM_SIZE - 1)
+            err = self.writeBufferRegister(self.REGISTER.REG_RAM_FIRST, ramContent)
+        return err
+
+    def _backupRam(self):
+        # Store the full gas gauge state to RAM.
+        soc, err = self.readWordRegister(self.REGISTER.REG_SOC)
+        if err.isOk():
+            cnfCC, err = self.readWordRegister(self.REGISTER.REG_CC_CNF)
+        if err.isOk():
+            cnfVM, err = self.readWordRegister(self.REGISTER.REG_VM_CNF)
+        if err.isOk():
+            err = self.writeBufferRegister(self.REGISTER.REG_RAM_FIRST,
+                                           self._composeRam(soc, cnfCC, cnfVM))
+        if err.isOk():
+            self._backupTime = time.time()
+        return err
+
+    def _backupSOC(self, soc):
+        # Just update the SOC. Fall back to a full backup, if the RAM
+        # content got lost.
+        err = self._updateRamWord(self.REGISTER.IDX_RAM_SOC, soc)
+        if err.isOk():
+            self._backupTime = time.time()
+        else:
+            err = self._backupRam()
+        return err
 
     def _setupAlarm(self):
         # REG_ALARM_SOC, LSB=0,5%, scaling = 2.
@@ -523,20 +602,35 @@ class STC311x(GasGauge, SerialBusDevice, Interruptable):
         # Read RAM content
         if err.isOk():
             ramContent, err = self.readBufferRegister(self.REGISTER.REG_RAM_FIRST, self.REGISTER.RAM_SIZE)
+        # Determine the content of REG_CC_CNF
+        # Following the STC3115 data sheet, chapter 6.2.1. on coulomb counter,
+        # this register "scales the charge integrated by the
+        # sigma delta converter into a percentage value of the battery capacity"
+        # It depends on the battery capacity (Cnom) and the current sense resistor (Rsense) as follows:
+        # REG_CC_CNF = Rsense [mOhm] * Cnom [mAh] ⁄ 49,556
+        # Scaling factor: 1/49,556 = 1000/49556 = 250/12389
+        cnfCC = (self.RSense * self.batCapacity * 250 + 6194) // 12389
+        # Determine the content of REG_VM_CNF
+        # Following to chapter 6.2.2, this register "configures the parameter used by the algorithm".
+        # It is calculated from the battery's impedance (Ri) and apacity (Cnom) as follows:
+        # REG_VM_CNF = Ri [mOhm] * Cnom [mAh] ⁄ 977,78
+        # Scaling factor: 1/977.78 = 100/97778 = 50/48889
+        cnfVM = (self.batImpedance * self.batCapacity * 50 + 24444) // 48889
         # Check RAM consistency
-        canRestore = False  # Set True to enable RAM restoration
+        canRestore = False
         if err.isOk():
             err = self._checkRamConsistency(ramContent)
             if err.isOk():
                 # check CTRL_PORDET and CTRL_BATFAIL
                 data, err = self.readByteRegister(self.REGISTER.REG_CTRL)
                 if err.isOk():
-                    if data & (self.REGISTER.CTRL_BATFAIL | self.REGISTER.CTRL_PORDET):
-                        # battery removed / voltage dropped below threshold
-                        # no restoration, start anew, instead!
-                        canRestore = False
+                    # If the battery was removed or the voltage dropped
+                    # below threshold, do not restore but start anew.
+                    # The same is true, if the configuration changed.
+                    canRestore = not (data & (self.REGISTER.CTRL_BATFAIL | self.REGISTER.CTRL_PORDET)) and \
+                        ((ramContent[self.REGISTER.IDX_RAM_CC_CNF_H] << 8) | ramContent[self.REGISTER.IDX_RAM_CC_CNF_L]) == cnfCC and \
+                        ((ramContent[self.REGISTER.IDX_RAM_VM_CNF_H] << 8) | ramContent[self.REGISTER.IDX_RAM_VM_CNF_L]) == cnfVM
             else:
-                canRestore = False
                 err = ErrorCode.errOk
         if err.isOk():
             # common steps (pre-phase)
@@ -544,15 +638,13 @@ class STC311x(GasGauge, SerialBusDevice, Interruptable):
                 # restore configuration from RAM
                 # ensure that GG_RUN is cleared
                 self.writeByteRegister(self.REGISTER.REG_MODE, self.REGISTER.MODE_OFF)
-                # restore REG_CC_CNF
-                data = (ramContent[self.REGISTER.IDX_RAM_CC_CNF_H] << 8) | ramContent[self.REGISTER.IDX_RAM_CC_CNF_L]
-                self.writeWordRegister(self.REGISTER.REG_CC_CNF, data)
-                # restore REG_VM_CNF
-                data = (ramContent[self.REGISTER.IDX_RAM_VM_CNF_H] << 8) | ramContent[self.REGISTER.IDX_RAM_VM_CNF_L]
-                self.writeWordRegister(self.REGISTER.REG_VM_CNF, data)
+                # restore REG_CC_CNF and REG_VM_CNF
+                self.writeWordRegister(self.REGISTER.REG_CC_CNF, cnfCC)
+                self.writeWordRegister(self.REGISTER.REG_VM_CNF, cnfVM)
                 # restore REG_SOC
                 data = (ramContent[self.REGISTER.IDX_RAM_SOC_H] << 8) | ramContent[self.REGISTER.IDX_RAM_SOC_L]
                 self.writeWordRegister(self.REGISTER.REG_SOC, data)
+                self._backupTime = time.time()
             else:
                 # initialize configuration with defaults
                 # run gas gauge to get first OCV and current measurement
@@ -566,21 +658,8 @@ class STC311x(GasGauge, SerialBusDevice, Interruptable):
                 current = self._transferCurrent(data)
                 # ensure that GG_RUN is cleared
                 self.writeByteRegister(self.REGISTER.REG_MODE, self.REGISTER.MODE_OFF)
-                # Determine and write the content of REG_CC_CNF
-                # Following the STC3115 data sheet, chapter 6.2.1. on coulomb counter,
-                # this register "scales the charge integrated by the
-                # sigma delta converter into a percentage value of the battery capacity"
-                # It depends on the battery capacity (Cnom) and the current sense resistor (Rsense) as follows:
-                # REG_CC_CNF = Rsense [mOhm] * Cnom [mAh] ⁄ 49,556
-                # Scaling factor: 1/49,556 = 1000/49556 = 250/12389
-                cnfCC = (self.RSense * self.batCapacity * 250 + 6194) // 12389
+                # Write the content of REG_CC_CNF and REG_VM_CNF
                 self.writeWordRegister(self.REGISTER.REG_CC_CNF, cnfCC)
-                # Determine and write the content of REG_VM_CNF
-                # Following to chapter 6.2.2, this register "configures the parameter used by the algorithm".
-                # It is calculated from the battery's impedance (Ri) and apacity (Cnom) as follows:
-                # REG_VM_CNF = Ri [mOhm] * Cnom [mAh] ⁄ 977,78
-                # Scaling factor: 1/977.78 = 100/97778 = 50/48889
-                cnfVM = (self.batImpedance * self.batCapacity * 50 + 24444) // 48889
                 self.writeWordRegister(self.REGISTER.REG_VM_CNF, cnfVM)
                 # compensate OCV
                 if current > 1000000:
@@ -598,16 +677,10 @@ class STC311x(GasGauge, SerialBusDevice, Interruptable):
                     time.sleep(0.1)
                 data, _ = self.readWordRegister(self.REGISTER.REG_SOC)
                 # store new backup to RAM
-                ramContent = [0] * self.REGISTER.RAM_SIZE
-                ramContent[self.REGISTER.IDX_RAM_TEST] = self.REGISTER.RAM_TEST
-                ramContent[self.REGISTER.IDX_RAM_SOC_L] = data & 0xFF
-                ramContent[self.REGISTER.IDX_RAM_SOC_H] = data >> 8
-                ramContent[self.REGISTER.IDX_RAM_CC_CNF_L] = cnfCC & 0xFF
-                ramContent[self.REGISTER.IDX_RAM_CC_CNF_H] = cnfCC >> 8
-                ramContent[self.REGISTER.IDX_RAM_VM_CNF_L] = cnfVM & 0xFF
-                ramContent[self.REGISTER.IDX_RAM_VM_CNF_H] = cnfVM >> 8
-                ramContent[self.REGISTER.IDX_RAM_CRC] = self._crc(ramContent, self.REGISTER.RAM_SIZE - 1)
-                self.writeBufferRegister(self.REGISTER.REG_RAM_FIRST, ramContent)
+                err = self.writeBufferRegister(self.REGISTER.REG_RAM_FIRST,
+                                               self._composeRam(data, cnfCC, cnfVM))
+                if err.isOk():
+                    self._backupTime = time.time()
             
             # Common steps (post-phase)
             self._setupAlarm()
@@ -675,68 +748,86 @@ class STC311x(GasGauge, SerialBusDevice, Interruptable):
             err = ErrorCode.errUnavailable
         return err
 
-    def _getEventContext(self, event):
-        pass  # TODO: this function, see original implementation
+    def _createEventContext(self):
+        return EventContext()
 
-    # ErrorCode_t stc311x_getEventContext( const Device_Index_t devIdx,
-    #                                      const gasgauge_Event_t event,
-    #                                       gasgauge_EventContext_t *context )
-    # {
-    #     ErrorCode_t ret = errOk;
-    #     uint8_t data8=0, clear8;
-    #
-    #     if( (devIdx == DEVICE_INDEX_INVALID) || (devIdx >= CONFIG_GASGAUGE_COUNT) || (context == NULL) )
-    #     {
-    #         ret = errInvalidParameter;
-    #     } else if( event == gasgauge_EvtNone ) {
-    #         ret = errFewData;
-    #     } else if( event != gasgauge_EvtInt1 ) {
-    #         ret = errCorruptData;
-    #     } else {
-    #
-    #         ret = Serial_Bus_read_Reg_Byte( &dContext[devIdx].sdev, REG_CTRL, &data8 );
-    #         if( ret == errOk )
-    #         {
-    #             context->source = gasgauge_EvtSrcUnknown;
-    #     #if defined(CONFIG_GASGAUGE_IS_STC3117)
-    #             clear8 = CTRL_IO0DATA | CTRL_BATFAIL | CTRL_ALM_SOC | CTRL_ALM_VOLT | CTRL_UVLOD;
-    #     #else
-    #             clear8 = CTRL_IO0DATA | CTRL_BATFAIL | CTRL_ALM_SOC | CTRL_ALM_VOLT;
-    #     #endif
-    #
-    #             // Highest priority, as by reading, PORDET was cleared, so we don't get it another time!
-    #             if( data8 & CTRL_PORDET )
-    #             {
-    #                 context->source = gasgauge_EvtSrcPOR;
-    #             } else if( data8 & CTRL_ALM_VOLT )
-    #             {
-    #                 context->source = gasgauge_EvtSrcLowVolt;
-    #                 context->detail.voltage = stc311x_getBatteryVoltage( devIdx );
-    #                 clear8 &= ~CTRL_ALM_VOLT;
-    #             } else if( data8 & CTRL_ALM_SOC )
-    #             {
-    #                 context->source = gasgauge_EvtSrcLowSOC;
-    #                 context->detail.soc = stc311x_getStateOfCharge( devIdx );
-    #                 clear8 &= ~CTRL_ALM_SOC;
-    #             } else if( data8 & CTRL_BATFAIL )
-    #             {
-    #                 context->source = gasgauge_EvtSrcBatFail;
-    #                 clear8 &= ~CTRL_BATFAIL;
-    #             }
-    #     #if defined(CONFIG_GASGAUGE_IS_STC3117)
-    #             else if( data8 & CTRL_UVLOD )
-    #             {
-    #                 context->source = stc311x_EvtSrcUndervoltage;
-    #                 clear8 &= ~CTRL_UVLOD;
-    #             }
-    #     #endif
-    #
-    #             if( context->source != gasgauge_EvtSrcUnknown )
-    #             {
-    #                 ret = Serial_Bus_write_Reg_Byte( &dContext[devIdx].sdev, REG_CTRL, clear8 );
-    #             }
-    #         }
-    #     }
-    #     return ret;
-    # }
+    def _captureEventStatus(self, event):
+        # Read the control register together with SOC and voltage
+        # in one go. Then, clear the captured alarm flags.
+        del event
+        first = self.REGISTER.REG_MODE
+        data, err = self.readBufferRegister(first, self.REGISTER.REG_SNAPSHOT_LAST - first + 1)
+        if err.isOk():
+            remainInt = data[self.REGISTER.REG_CTRL - first] & self.REGISTER.CTRL_INT_SOURCES
+            status = self._decodeSnapshot(data)
+            if remainInt:
+                data = self.REGISTER.CTRL_IO0DATA | (self.REGISTER.CTRL_INT_SOURCES & ~remainInt & ~self.REGISTER.CTRL_PORDET)
+                err = self.writeByteRegister(self.REGISTER.REG_CTRL, data)
+        else:
+            remainInt = 0
+            status = None
+        return remainInt, status, err
+
+    def _getEventPriority(self):
+        # A POR is reported first, as its flag is cleared by reading.
+        # Then, the alarms follow in the order of the C reference code.
+        ret = (self.REGISTER.CTRL_PORDET, self.REGISTER.CTRL_ALM_VOLT,
+               self.REGISTER.CTRL_ALM_SOC, self.REGISTER.CTRL_BATFAIL)
+        if hasattr(self.REGISTER, "CTRL_UVLOD"):
+            ret = ret + (self.REGISTER.CTRL_UVLOD,)
+        return ret
 
+    def _fillEventContext(self, singleIntID, context):
+        ret = ErrorCode.errOk
+        context.soc = Percentage.invalid
+        context.voltage = Voltage.invalid
+        if singleIntID == self.REGISTER.CTRL_PORDET:
+            context.source = EventSource.hardReset
+        elif singleIntID == self.REGISTER.CTRL_ALM_VOLT:
+            context.source = EventSource.lowVolt
+            context.voltage = context.eventStatus.voltage
+        elif singleIntID == self.REGISTER.CTRL_ALM_SOC:
+            context.source = EventSource.lowSOC
+            context.soc = context.eventStatus.soc
+        elif singleIntID == self.REGISTER.CTRL_BATFAIL:
+            context.source = EventSource.batFail
+        elif singleIntID == getattr(self.REGISTER, "CTRL_UVLOD", None):
+            context.source = EventSource.undervoltage
+        else:
+            context.source = EventSource.unknown
+        return ret
+
+    def getEventContext(self, event, context):
+        """Retrieve more detailed information on an event.
+        
+        The ``event`` parameter should be :attr:`.interruptable.Event.evtInt1`,
+        as there is only the ALM pin to signal interrupts.
+        On return, the ``context`` parameter carries the resulting
+        information. It must be an instance of :class:`.gasgauge.EventContext`,
+        which is semantically multiplexed by its :attr:`.gasgauge.EventContext.source`
+        attribute. For :attr:`.gasgauge.EventSource.lowVolt` and
+        :attr:`.gasgauge.EventSource.lowSOC`, the ``voltage`` and ``soc``
+        attributes are set, respectively.
+        
+        The control register is read just once, together with the SOC
+        and voltage registers, upon the first call after an event.
+        The alarm flags captured are cleared, then. Subsequent calls
+        are served from that snapshot.
+        
+        Also see: :meth:`.Interruptable.getEventContext`.
+
+        :param int event: The original event occurred.
+        :param .gasgauge.EventContext context: Context information. 
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        if (context is None):
+            ret = ErrorCode.errInvalidParameter
+        elif (event is None) or (event == Event.evtNone):
+            ret = ErrorCode.errFewData
+        elif (event == Event.evtInt1) or (event == Event.evtAny):
+            context.source = EventSource.none
+            ret = self._getEventContextFromStatus( event, context )
+        else:
+            ret = ErrorCode.errInvalidParameter
+        return ret
@@ -36,6 +36,7 @@ class STC311x_Reg:
     CTRL_ALM_SOC = 0x20  # Set with a low-SOC condition
     CTRL_ALM_VOLT = 0x40  # Set with a low-voltage condition
     CTRL_DEFAULT = CTRL_IO0DATA
+    CTRL_INT_SOURCES = CTRL_PORDET | CTRL_BATFAIL | CTRL_ALM_SOC | CTRL_ALM_VOLT  # Interrupt reasons
 
     REG_SOC_L = 2
     REG_SOC_H = 3
@@ -55,6 +56,8 @@ class STC311x_Reg:
     
     REG_TEMPERATURE = 10  # Temperature [C]
     
+    REG_SNAPSHOT_LAST = REG_TEMPERATURE  # Last register read by a snapshot
+    
     # REG 11, 12 chip specific implementation
     
     REG_OCV_L = 13
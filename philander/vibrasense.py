@@ -5,15 +5,33 @@ element.
 """
 __author__ = "Oliver Maye"
 __version__ = "0.1"
-__all__ = ["VibraSense"]
+__all__ = ["EdgeCount", "VibraSense"]
 from pymitter import EventEmitter
+import time
 
 from philander.gpio import GPIO
 from philander.interruptable import Interruptable
+from philander.penum import dataclass
 from philander.sensor import Sensor
 from philander.systypes import ErrorCode
 
 
+@dataclass
+class EdgeCount:
+    """Vibration intensity as measured by counting signal edges.
+    
+    This is the measurement data delivered in counter mode.
+    """
+    count:      int = 0
+    """Number of edges counted in the latest window."""
+    rate:       float = 0
+    """Edges per second in the latest window."""
+    window:     int = 0
+    """Length of the counting window in milliseconds."""
+    history:    tuple = ()
+    """Edge counts of the most recent windows, oldest first."""
+
+
 class VibraSense( EventEmitter, Sensor, Interruptable):
     """Vibra sense driver implementation.
     
@@ -35,9 +53,21 @@ class VibraSense( EventEmitter, Sensor, Interruptable):
     
     DEBOUNCE_MS     = GPIO.BOUNCE_NONE
     
+    COUNTER_WINDOW_DEFAULT  = 0     # Window length in ms; 0 = counter mode off
+    COUNTER_HISTORY_DEFAULT = 10    # Number of windows to remember
+    
+    EVENT_WINDOW    = "vibraWindow" # Fired at the end of each counting window
+    
     def __init__(self):
         self.gpioEnable = None
         self.gpioSignal = None
+        self.counterWindow = VibraSense.COUNTER_WINDOW_DEFAULT
+        self.counterHistory = VibraSense.COUNTER_HISTORY_DEFAULT
+        self._latest = None
+        self._history = []
+        self._windowCond = None
+        self._windowDone = True
+        self._windowWorker = None
         EventEmitter.__init__(self)
         Sensor.__init__(self)
         Interruptable.__init__(self)
@@ -59,8 +89,15 @@ class VibraSense( EventEmitter, Sensor, Interruptable):
         VibraSense.int.gpio.*            configuration of the INT pin, as documented at :meth:`.GPIO.Params_init`, overrides VibraSense.slot
         VibraSense.enable.gpio.*         configuration of the EN pin, as documented at :meth:`.GPIO.Params_init`, optional.
         VibraSense.slot                  ``int=[1|2]`` the click board's slot, alternative for int+enable pin configuration; :attr:`SLOT_DEFAULT`.
+        VibraSense.counter.window        ``int`` length of the counting window in ms, 0 to switch counter mode off; :attr:`COUNTER_WINDOW_DEFAULT`.
+        VibraSense.counter.history       ``int`` number of windows to keep in the history; :attr:`COUNTER_HISTORY_DEFAULT`.
         =============================    ==========================================================================================================
         
+        In counter mode, the edges of the signal are just counted, rather
+        than emitted one by one. At the end of each window, the result is
+        stored as an :class:`EdgeCount` and an :attr:`EVENT_WINDOW` event
+        is emitted. So, handlers are called once per window, only.
+        
         Also see: :meth:`.Sensor.Params_init`, :meth:`.SerialBusDevice.Params_init`. 
         """
         if "VibraSense.int.gpio.pinDesignator" in paramDict:
@@ -89,6 +126,10 @@ class VibraSense( EventEmitter, Sensor, Interruptable):
                 }
             paramDict.update( gpioEnaParams )
             paramDict.update( gpioIntParams )
+        if not "VibraSense.counter.window" in paramDict:
+            paramDict["VibraSense.counter.window"] = VibraSense.COUNTER_WINDOW_DEFAULT
+        if not "VibraSense.counter.history" in paramDict:
+            paramDict["VibraSense.counter.history"] = VibraSense.COUNTER_HISTORY_DEFAULT
             
         Sensor.Params_init(paramDict)
         return None
@@ -104,20 +145,31 @@ class VibraSense( EventEmitter, Sensor, Interruptable):
             gpioEnaParams = dict( [(k.replace(prefix, ""),v) for k,v in paramDict.items() if k.startswith(prefix)] )
         else:
             gpioEnaParams = None
+        if self.gpioSignal or self.gpioEnable:
+            ret = ErrorCode.errResourceConflict
         # Setup the enable pin
         if ret.isOk() and gpioEnaParams:
             self.gpioEnable = GPIO.getGPIO()
             ret = self.gpioEnable.open(gpioEnaParams)
             if ret.isOk():
                 ret = self.gpioEnable.set( GPIO.LEVEL_HIGH )
+        # Setup the counter
+        if ret.isOk():
+            self.counterWindow = paramDict["VibraSense.counter.window"]
+            self.counterHistory = paramDict["VibraSense.counter.history"]
+            if (self.counterWindow < 0) or (self.counterHistory < 1):
+                ret = ErrorCode.errInvalidParameter
         # Setup the signal pin
         if ret.isOk():
             self.gpioSignal = GPIO.getGPIO()
             ret = self.gpioSignal.open(gpioIntParams)
+        if ret.isOk() and (self.counterWindow > 0):
+            self._startCounter()
         return ret
     
     def close(self):
         ret = ErrorCode.errOk
+        self._stopCounter()
         if self.gpioSignal:
             ret = self.gpioSignal.close()
             self.gpioSignal = None
@@ -134,13 +186,106 @@ class VibraSense( EventEmitter, Sensor, Interruptable):
     def _intHandler(self, *arg):
         self.emit(GPIO.EVENT_DEFAULT, *arg)
     
+    #
+    # Counter mode
+    #
+    
+    # Edges are counted by the GPIO implementation, so no Python handler
+    # is called per edge. Here, the count is just sampled per window.
+    def _startCounter(self):
+        from threading import Condition, Thread
+        self.gpioSignal.enableCounter()
+        self._latest = None
+        self._history = []
+        self._windowCond = Condition()
+        self._windowDone = False
+        self._windowWorker = Thread( target=self._windowLoop, name='VibraSense', daemon=True )
+        self._windowWorker.start()
+        return None
+    
+    def _stopCounter(self):
+        if self._windowWorker:
+            with self._windowCond:
+                self._windowDone = True
+                self._windowCond.notify_all()
+            self._windowWorker.join()
+            self._windowWorker = None
+            if self.gpioSignal:
+                self.gpioSignal.disableCounter()
+        self._windowDone = True
+        return None
+    
+    def _windowLoop(self):
+        # Close a window at each deadline. Deadlines are derived from the
+        # start time, so that windows don't drift.
+        window = self.counterWindow / 1000
+        start = time.monotonic()
+        lastCount = self.gpioSignal.edgeCount
+        num = 0
+        while True:
+            with self._windowCond:
+                num += 1
+                delay = start + num * window - time.monotonic()
+                while (delay > 0) and not self._windowDone:
+                    self._windowCond.wait( delay )
+                    delay = start + num * window - time.monotonic()
+                if self._windowDone:
+                    break
+                total = self.gpioSignal.edgeCount
+                count = total - lastCount
+                lastCount = total
+                self._history = (self._history + [count])[-self.counterHistory:]
+                data = EdgeCount( count=count,
+                                  rate=count / window,
+                                  window=self.counterWindow,
+                                  history=tuple( self._history ) )
+                self._latest = data
+                self._windowCond.notify_all()
+            self.emit(VibraSense.EVENT_WINDOW, data)
+        return None
+    
     def getLatestData(self):
-        return self.getNextData()
+        """Retrieve the latest data available, immediately.
+        
+        In counter mode, this is the :class:`EdgeCount` of the latest
+        window finished. Otherwise, it's the current level of the signal
+        pin.
+        
+        :return: The measurement data and an error code indicating\
+        either success or the reason of failure.
+        :rtype: EdgeCount or int, ErrorCode
+        """
+        if self._windowDone:
+            ret = self.getNextData()
+        elif self._latest is None:
+            ret = (EdgeCount( window=self.counterWindow ), ErrorCode.errFewData)
+        else:
+            ret = (self._latest, ErrorCode.errOk)
+        return ret
 
     def getNextData(self):
+        """Retrieve the next data, possibly with a delay.
+        
+        In counter mode, waits for the current window to finish and
+        returns its :class:`EdgeCount`. Otherwise, returns the current
+        level of the signal pin.
+        
+        :return: The measurement data and an error code indicating\
+        either success or the reason of failure.
+        :rtype: EdgeCount or int, ErrorCode
+        """
         err = ErrorCode.errOk
         value = 0
-        if self.gpioSignal:
+        if not self._windowDone:
+            with self._windowCond:
+                latest = self._latest
+                self._windowCond.wait( 2 * self.counterWindow / 1000 )
+                if self._latest is latest:
+                    value = EdgeCount( window=self.counterWindow )
+                    err = ErrorCode.errUnavailable
+                else:
+                    value = self._latest
+        elif self.gpioSignal:
             value = self.gpioSignal.get()
             err = ErrorCode.errOk
         else:
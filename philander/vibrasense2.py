@@ -1,11 +1,18 @@
 """Support module for the Mikro-e Vibra sense 2 click board.
 
 This board carries a TE LDT0-028K Piezo Film sensor as its core element. 
+
+Besides reading single values on demand, the driver can sample
+continuously at the configured data rate into a ring buffer. Each sample
+is stored with a monotonic time stamp. Consumers take batches of samples
+using :meth:`VibraSense2.getBlock`, e.g. for a spectral analysis.
 """
 __author__ = "Oliver Maye"
 __version__ = "0.1"
 __all__ = ["VibraSense2"]
+from array import array
 from pymitter import EventEmitter
+import time
 
 from .interruptable import Interruptable
 from .sensor import Sensor
@@ -28,11 +35,22 @@ class VibraSense2( EventEmitter, Sensor, Interruptable, SerialBusDevice):
     # The only address. No alternative.
     ADDRESSES_ALLOWED = [0x4D]
     
+    BUFFER_SIZE_DEFAULT = 0     # Number of samples; 0 = no continuous sampling
+    
     def __init__(self):
         SerialBusDevice.__init__(self)
         Sensor.__init__(self)
         Interruptable.__init__(self)
         EventEmitter.__init__(self)
+        self.bufferSize = VibraSense2.BUFFER_SIZE_DEFAULT
+        self.overruns = 0
+        self._values = array('H')
+        self._stamps = array('d')
+        self._writeIdx = 0      # Total number of samples written
+        self._readIdx = 0       # Total number of samples consumed
+        self._sampleCond = None
+        self._sampleDone = True
+        self._sampleWorker = None
         
     #
     # Module API
@@ -48,12 +66,17 @@ class VibraSense2( EventEmitter, Sensor, Interruptable, SerialBusDevice):
         Key name                         Value type, meaning and default
         =============================    ==========================================================================================================
         SerialBusDevice.address          ``int`` I2C serial device address, must be :attr:`ADDRESS`; default is :attr:`ADDRESS`.
+        VibraSense2.buffer.size          ``int`` ring buffer size in samples; if non-zero, sampling starts on open; :attr:`BUFFER_SIZE_DEFAULT`.
         =============================    ==========================================================================================================
         
+        Continuous sampling is done at the rate given by ``Sensor.dataRate``.
+        
         Also see: :meth:`.Sensor.Params_init`, :meth:`.SerialBusDevice.Params_init`. 
         """
 
         paramDict["SerialBusDevice.address"] = VibraSense2.ADDRESSES_ALLOWED[0]
+        if not "VibraSense2.buffer.size" in paramDict:
+            paramDict["VibraSense2.buffer.size"] = VibraSense2.BUFFER_SIZE_DEFAULT
         Sensor.Params_init(paramDict)
         SerialBusDevice.Params_init(paramDict)
         return None
@@ -71,6 +94,10 @@ class VibraSense2( EventEmitter, Sensor, Interruptable, SerialBusDevice):
         ret = SerialBusDevice.open(self, paramDict)
         if ret.isOk():
             ret = Sensor.open(self, paramDict)
+        if ret.isOk():
+            size = paramDict.get("VibraSense2.buffer.size", VibraSense2.BUFFER_SIZE_DEFAULT)
+            if size > 0:
+                ret = self.startSampling( size )
         return ret
     
     def close(self):
@@ -81,12 +108,170 @@ class VibraSense2( EventEmitter, Sensor, Interruptable, SerialBusDevice):
         :return: An error code indicating either success or the reason of failure.
         :rtype: ErrorCode
         """
+        self.stopSampling()
         ret = Sensor.close(self)
         ret2 = SerialBusDevice.close(self)
         if ret.isOk():
             ret = ret2
         return ret
         
+    #
+    # Continuous sampling
+    #
+    
+    def _readSample(self):
+        # Read 2 bytes without prior writing of a register number
+        data, err = self.readBuffer(2)
+        if (err.isOk()):
+            data = (data[0] << 8) | data[1]
+        else:
+            data = 0
+        return data, err
+    
+    def startSampling(self, size=None):
+        """Starts continuous sampling into the ring buffer.
+        
+        Samples are taken at the rate given by the ``dataRate``
+        attribute, see :meth:`.Sensor.configure`. The ring buffer is
+        allocated once, here. If the consumer does not keep pace, the
+        oldest samples are overwritten and the :attr:`overruns` counter
+        is incremented.
+        
+        :param int size: Ring buffer size in samples, or None to keep the current size.
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        if size is None:
+            size = self.bufferSize
+        if self._sampleWorker:
+            ret = ErrorCode.errResourceConflict
+        elif (size < 1) or (self.dataRate <= 0):
+            ret = ErrorCode.errInvalidParameter
+        else:
+            from threading import Condition, Thread
+            self.bufferSize = size
+            self._values = array('H', [0] * self.bufferSize)
+            self._stamps = array('d', [0] * self.bufferSize)
+            self._writeIdx = 0
+            self._readIdx = 0
+            self.overruns = 0
+            self._sampleCond = Condition()
+            self._sampleDone = False
+            self._sampleWorker = Thread( target=self._samplingLoop, name='VibraSense2', daemon=True )
+            self._sampleWorker.start()
+        return ret
+    
+    def stopSampling(self):
+        """Stops continuous sampling.
+        
+        Samples still in the buffer can be retrieved by :meth:`getBlock`.
+        
+        :return: An error code indicating either success or the reason of failure.
+        :rtype: ErrorCode
+        """
+        ret = ErrorCode.errOk
+        if self._sampleWorker:
+            with self._sampleCond:
+                self._sampleDone = True
+                self._sampleCond.notify_all()
+            self._sampleWorker.join()
+            self._sampleWorker = None
+        else:
+            ret = ErrorCode.errInadequate
+        return ret
+    
+    def _samplingLoop(self):
+        # Sample at deadlines derived from the start time, so that the
+        # rate doesn't drift.
+        period = 1 / self.dataRate
+        size = self.bufferSize
+        start = time.monotonic()
+        num = 0
+        while True:
+            with self._sampleCond:
+                delay = start + num * period - time.monotonic()
+                while (delay > 0) and not self._sampleDone:
+                    self._sampleCond.wait( delay )
+                    delay = start + num * period - time.monotonic()
+                if self._sampleDone:
+                    break
+            num += 1
+            value, err = self._readSample()
+            stamp = time.monotonic()
+            if err.isOk():
+                with self._sampleCond:
+                    idx = self._writeIdx % size
+                    self._values[idx] = value
+                    self._stamps[idx] = stamp
+                    self._writeIdx += 1
+                    if self._writeIdx - self._readIdx > size:
+                        self._readIdx = self._writeIdx - size
+                        self.overruns += 1
+                    self._sampleCond.notify_all()
+        return None
+    
+    def getAvailable(self):
+        """Tells the number of samples waiting in the ring buffer.
+        
+        :return: The number of samples not yet retrieved by :meth:`getBlock`.
+        :rtype: int
+        """
+        return self._writeIdx - self._readIdx
+    
+    def getBlock(self, num, values=None, timestamps=None, timeout=None):
+        """Retrieves the next block of samples from the ring buffer.
+        
+        Waits until ``num`` samples are available. The samples are
+        removed from the buffer and returned in the order of their
+        acquisition, together with their time stamps as given by
+        :func:`time.monotonic`.
+        
+        To avoid allocating memory on each call, the caller may pass in
+        arrays to be filled. Otherwise, new arrays are created.
+        
+        :param int num: The number of samples to retrieve.
+        :param array values: Array of at least ``num`` entries to take\
+        the samples, or None.
+        :param array timestamps: Array of at least ``num`` entries to take\
+        the time stamps in seconds, or None.
+        :param float timeout: Maximum time to wait in seconds. By default,\
+        twice the time needed to acquire ``num`` samples.
+        :return: The sample values, their time stamps and an error code\
+        indicating either success or the reason of failure.
+        :rtype: array, array, ErrorCode
+        """
+        err = ErrorCode.errOk
+        if (num < 1) or (num > self.bufferSize) or not self._sampleCond:
+            err = ErrorCode.errInvalidParameter
+        elif ((values is not None) and (len(values) < num)) or \
+             ((timestamps is not None) and (len(timestamps) < num)):
+            err = ErrorCode.errInvalidParameter
+        if values is None:
+            values = array('H', [0] * num) if err.isOk() else array('H')
+        if timestamps is None:
+            timestamps = array('d', [0] * num) if err.isOk() else array('d')
+        if err.isOk():
+            if timeout is None:
+                timeout = 2 * num / self.dataRate
+            deadline = time.monotonic() + timeout
+            with self._sampleCond:
+                while (self._writeIdx - self._readIdx < num) and not self._sampleDone:
+                    delay = deadline - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._sampleCond.wait( delay )
+                if self._writeIdx - self._readIdx < num:
+                    err = ErrorCode.errFewData
+                else:
+                    size = self.bufferSize
+                    for cnt in range( num ):
+                        idx = (self._readIdx + cnt) % size
+                        values[cnt] = self._values[idx]
+                        timestamps[cnt] = self._stamps[idx]
+                    self._readIdx += num
+        return values, timestamps, err
+    
     #
     # Sensor API
     #
@@ -100,6 +285,10 @@ class VibraSense2( EventEmitter, Sensor, Interruptable, SerialBusDevice):
         intensity or bending deflection.
         Note that a rest condition does not necessarily correspond to a
         value of zero.
+        
+        While sampling continuously, this is the most recent sample in
+        the ring buffer, regardless of whether it was retrieved by
+        :meth:`getBlock`, already.
          
         Also see: :meth:`philander.sensor.Sensor.getLatestData`.
 
@@ -107,22 +296,41 @@ class VibraSense2( EventEmitter, Sensor, Interruptable, SerialBusDevice):
         an error code indicating either success or the reason of failure.
         :rtype: Object, ErrorCode
         """
-        # Read 2 bytes without prior writing of a register number
-        data, err = self.readBuffer(2)
-        if (err.isOk()):
-            data = (data[0] << 8) | data[1]
+        if self._sampleWorker:
+            with self._sampleCond:
+                if self._writeIdx > 0:
+                    data = self._values[(self._writeIdx - 1) % self.bufferSize]
+                    err = ErrorCode.errOk
+                else:
+                    data = 0
+                    err = ErrorCode.errFewData
         else:
-            data = 0
+            data, err = self._readSample()
         return data, err
 
     def getNextData(self):
         """Retrieve the next data, possibly with a delay.
         
+        While sampling continuously, waits for the next sample to be
+        acquired.
+        
         Also see: :meth:`philander.sensor.Sensor.getNextData`.
 
         :return: The measurement data as a 16bit integer and \
         an error code indicating either success or the reason of failure.
         :rtype: Object, ErrorCode
         """
-        return self.getLatestData()
+        if self._sampleWorker:
+            with self._sampleCond:
+                count = self._writeIdx
+                self._sampleCond.wait( 2 / self.dataRate )
+                if self._writeIdx == count:
+                    data = 0
+                    err = ErrorCode.errUnavailable
+                else:
+                    data = self._values[(self._writeIdx - 1) % self.bufferSize]
+                    err = ErrorCode.errOk
+        else:
+            data, err = self._readSample()
+        return data, err
     
\ No newline at end of file
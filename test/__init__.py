@@ -24,7 +24,7 @@ __all__ = ["generalTestSuite",
            "uthtu21d",
            "utimath", "utinterruptable",
            "utl6924",
-           "utpenum", "utpotentiometer", "utpymitter",
+           "utpenum", "utpotentiometer", "utptime", "utpymitter",
            "utserialbus", "utserialbus_impl",
            "utshiftreg", "utshiftreg_spi", "utssd1803a",
            "utthermometer", ]
@@ -8,11 +8,14 @@ from test.utadc import TestADC
 from test.utbattery import TestBattery
 #from test.utbutton import TestButton
 from test.utdictionary import TestDictionary
+from test.utdisplay_text import TestTextDisplay
 from test.utimath import TestIMath
 from test.utinterruptable import TestInterruptable
 from test.utpenum import TestPenum
 from test.utpotentiometer import TestPotentiometer
+from test.utptime import TestPtime
 from test.utpymitter import TestPymitter
+from test.utsensor import TestSensor
 from test.utthermometer import TestThermometer
 
 def suite():
@@ -23,11 +26,14 @@ def suite():
     suite.addTest( TestBattery )
     #suite.addTest( TestButton )
     suite.addTest( TestDictionary )
+    suite.addTest( TestTextDisplay )
     suite.addTest( TestIMath )
     suite.addTest( TestInterruptable )
     suite.addTest( TestPenum )
     suite.addTest( TestPotentiometer )
+    suite.addTest( TestPtime )
     suite.addTest( TestPymitter )
+    suite.addTest( TestSensor )
     suite.addTest( TestThermometer )
     return suite
 
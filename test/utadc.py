@@ -3,6 +3,7 @@
 import unittest
 
 from philander.adc import ADC
+from philander.sysfactory import SysProvider
 from philander.systypes import ErrorCode
 
 class TestADC( unittest.TestCase ):
@@ -72,6 +73,77 @@ class TestADC( unittest.TestCase ):
         err = device.close()
         self.assertEqual( err, ErrorCode.errOk )
                 
+    #@unittest.skip("Known working.")
+    def test_conversions(self):
+        device = ADC()
+        self.assertIsNotNone( device )
+        _, err = device.toVoltages( [0] )
+        self.assertEqual( err, ErrorCode.errResourceConflict )
+        params = { "adc.channel": 1, }
+        err = device.open(params)
+        self.assertEqual( err, ErrorCode.errOk )
+        _, err = device.toVoltages( [0, ADC.DIGITAL_MAX + 1] )
+        self.assertEqual( err, ErrorCode.errSpecRange )
+        dvals = list( range( 0, 0x10000, 0x123 ) )
+        for (lo, hi) in [(0, 3000), (-837, 2417), (-50132, -67)]:
+            device.vref_lower = lo
+            device.vref_upper = hi
+            vals, err = device.toVoltages( dvals )
+            self.assertEqual( err, ErrorCode.errOk )
+            self.assertEqual( len(vals), len(dvals) )
+            for dval, val in zip( dvals, vals ):
+                val1, _ = device.toVoltage( dval )
+                self.assertEqual( val, val1 )
+        # Calibration of interleaved channels
+        device.vref_lower = 0
+        device.vref_upper = 3000
+        vals, err = device.toVoltages( [0, 0, ADC.DIGITAL_MAX, ADC.DIGITAL_MAX],
+                                       calibration=[(1, 0), (0.5, 10)] )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( list(vals), [0, 10, 3000, 1510] )
+        err = device.close()
+        self.assertEqual( err, ErrorCode.errOk )
+        
+    #@unittest.skip("Known working.")
+    def test_samples(self):
+        device = ADC.getADC( SysProvider.SIM )
+        self.assertIsNotNone( device )
+        _, _, err = device.getSamples( 10 )
+        self.assertEqual( err, ErrorCode.errResourceConflict )
+        params = { "adc.channel": 1, }
+        err = device.open(params)
+        self.assertEqual( err, ErrorCode.errOk )
+        _, _, err = device.getSamples( 0 )
+        self.assertEqual( err, ErrorCode.errInvalidParameter )
+        _, _, err = device.getSamples( 10, oversampling=0 )
+        self.assertEqual( err, ErrorCode.errInvalidParameter )
+        # Simulation increments by a fixed step
+        device.simValue = 0
+        samples, stamps, err = device.getSamples( 10 )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertIsNone( stamps )
+        self.assertEqual( samples.typecode, "H" )
+        self.assertEqual( list(samples), [idx * 0x21D for idx in range(10)] )
+        # Oversampling averages subsequent readings
+        device.simValue = 0
+        samples, _, err = device.getSamples( 5, oversampling=2 )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( list(samples), [(idx * 2 * 0x21D) + 0x10F for idx in range(5)] )
+        # Time stamps follow the rate
+        samples, stamps, err = device.getSamples( 5, rate=100, timestamps=True )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( len(stamps), 5 )
+        for idx in range(5):
+            self.assertGreaterEqual( stamps[idx], idx * 10000 )
+        # Iterator form
+        device.simValue = 0
+        values = [val for val, err in device.iterSamples( 4, rate=1000 )]
+        self.assertEqual( values, [idx * 0x21D for idx in range(4)] )
+        err = device.close()
+        self.assertEqual( err, ErrorCode.errOk )
+        values = list( device.iterSamples( 4 ) )
+        self.assertEqual( values, [(0, ErrorCode.errResourceConflict)] )
+        
         
 if __name__ == '__main__':
     unittest.main()
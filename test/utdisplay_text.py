@@ -0,0 +1,166 @@
+"""
+"""
+import unittest
+
+from philander.display_text import Font, TextDisplay
+from philander.systypes import ErrorCode
+
+
+class MyDisplay( TextDisplay ):
+
+    def __init__(self):
+        super().__init__()
+        self._widthChar = 10
+        self._heightChar = 2
+        self.screen = [bytearray(b" " * self._widthChar) for _ in range(self._heightChar)]
+        self.numGoTo = 0
+        self.numWrite = 0
+        self._numUserChars = 2
+        self.userChars = [None] * self._numUserChars
+        self.numUpload = 0
+
+    def _drvOpen(self, paramDict):
+        return ErrorCode.errOk
+
+    def _drvClose(self):
+        return ErrorCode.errOk
+
+    def _drvGoTo(self, x, y):
+        self.numGoTo += 1
+        return ErrorCode.errOk
+
+    def _drvClearScreen(self):
+        for line in self.screen:
+            line[:] = b" " * len(line)
+        return ErrorCode.errOk
+
+    def _drvGetBuiltinFont(self, name=""):
+        return Font(), ErrorCode.errOk
+
+    def _drvSetFont(self, font):
+        return ErrorCode.errOk
+
+    def _drvPrintChar(self, code):
+        self.numWrite += 1
+        self.screen[self._currentY][self._currentX] = code
+        return ErrorCode.errOk
+
+    def _drvPrintString(self, data):
+        self.numWrite += 1
+        self.screen[self._currentY][self._currentX:self._currentX+len(data)] = data
+        return ErrorCode.errOk
+
+    def _drvSetUserChar(self, code, data):
+        self.numUpload += 1
+        self.userChars[code] = data
+        return ErrorCode.errOk
+
+
+class TestTextDisplay( unittest.TestCase ):
+
+    def test_diffRuns(self):
+        runs = TextDisplay._diffRuns( b"abcdefghij", b"abcdefghij", 2 )
+        self.assertEqual( runs, [] )
+        runs = TextDisplay._diffRuns( None, b"abc", 2 )
+        self.assertEqual( runs, [(0, 3)] )
+        runs = TextDisplay._diffRuns( b"abcdefghij", b"Xbcdefghij", 2 )
+        self.assertEqual( runs, [(0, 1)] )
+        runs = TextDisplay._diffRuns( b"abcdefghij", b"XbcXefghiX", 2 )
+        self.assertEqual( runs, [(0, 4), (9, 10)] )
+        runs = TextDisplay._diffRuns( b"abcdefghij", b"XbcXefghiX", 0 )
+        self.assertEqual( runs, [(0, 1), (3, 4), (9, 10)] )
+
+    def test_update(self):
+        dev = MyDisplay()
+        err = dev.open( {} )
+        self.assertEqual( err, ErrorCode.errOk )
+        # First update writes what differs from the cleared screen
+        dev.numGoTo = dev.numWrite = 0
+        err = dev.updateScreen( ["Temp 21.5", "Hum  45%"] )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( dev.screen[0], bytearray(b"Temp 21.5 ") )
+        self.assertEqual( dev.screen[1], bytearray(b"Hum  45%  ") )
+        self.assertEqual( dev.numWrite, 2 )
+        # Unchanged content does not cause any traffic
+        dev.numGoTo = dev.numWrite = 0
+        err = dev.updateScreen( ["Temp 21.5", "Hum  45%"] )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( dev.numGoTo, 0 )
+        self.assertEqual( dev.numWrite, 0 )
+        # Only changed runs are re-written
+        err = dev.updateScreen( ["Temp 21.7", "Hum  45%"] )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( dev.screen[0], bytearray(b"Temp 21.7 ") )
+        self.assertEqual( dev.numGoTo, 1 )
+        self.assertEqual( dev.numWrite, 1 )
+        # Printing the usual way keeps the shadow in sync
+        err = dev.goToChar( 0, 1 )
+        self.assertEqual( err, ErrorCode.errOk )
+        err = dev.printString( "Hu" )
+        self.assertEqual( err, ErrorCode.errOk )
+        dev.numGoTo = dev.numWrite = 0
+        err = dev.updateText( 0, 1, "Hum" )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( dev.numWrite, 0 )
+        # Out of range
+        err = dev.updateText( 10, 0, "x" )
+        self.assertEqual( err, ErrorCode.errSpecRange )
+        err = dev.close()
+        self.assertEqual( err, ErrorCode.errOk )
+
+    def test_glyphs(self):
+        dev = MyDisplay()
+        err = dev.open( {} )
+        self.assertEqual( err, ErrorCode.errOk )
+        bars = [bytes([row] * 8) for row in (0x00, 0x10, 0x18)]
+        for idx, data in enumerate(bars):
+            err = dev.defineGlyph( "bar" + str(idx), data )
+            self.assertEqual( err, ErrorCode.errOk )
+        err = dev.defineGlyph( "", bars[0] )
+        self.assertEqual( err, ErrorCode.errInvalidParameter )
+        _, err = dev.getGlyphCode( "unknown" )
+        self.assertEqual( err, ErrorCode.errInvalidParameter )
+        # Load two glyphs into the two slots
+        code0, err = dev.getGlyphCode( "bar0" )
+        self.assertEqual( err, ErrorCode.errOk )
+        code1, err = dev.getGlyphCode( "bar1" )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertNotEqual( code0, code1 )
+        self.assertEqual( dev.numUpload, 2 )
+        # Resident glyphs are not uploaded, again
+        code, err = dev.getGlyphCode( "bar0" )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( code, code0 )
+        self.assertEqual( dev.numUpload, 2 )
+        # Least recently used bar1 is evicted
+        code2, err = dev.getGlyphCode( "bar2" )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( code2, code1 )
+        self.assertEqual( dev.userChars[code2], bars[2] )
+        self.assertEqual( dev.numUpload, 3 )
+        # Now, bar0 is the least recently used
+        code, err = dev.getGlyphCode( "bar1" )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( code, code0 )
+        self.assertEqual( dev.numUpload, 4 )
+        code, err = dev.getGlyphCode( "bar2" )
+        self.assertEqual( code, code1 )
+        self.assertEqual( dev.numUpload, 4 )
+        # Re-definition with the same data does not cause an upload
+        err = dev.defineGlyph( "bar2", bytes([0x18] * 8) )
+        self.assertEqual( err, ErrorCode.errOk )
+        code, err = dev.getGlyphCode( "bar2" )
+        self.assertEqual( code, code1 )
+        self.assertEqual( dev.numUpload, 4 )
+        # Re-definition updates a resident glyph on its next use
+        err = dev.defineGlyph( "bar2", bytes([0x1F] * 8) )
+        self.assertEqual( err, ErrorCode.errOk )
+        code, err = dev.getGlyphCode( "bar2" )
+        self.assertEqual( code, code1 )
+        self.assertEqual( dev.numUpload, 5 )
+        err = dev.close()
+        self.assertEqual( err, ErrorCode.errOk )
+
+
+if __name__ == '__main__':
+    unittest.main()
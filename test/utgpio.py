@@ -2,8 +2,9 @@
 """
 from time import sleep
 import unittest
+from unittest import mock
 
-from philander.gpio import GPIO
+from philander.gpio import GPIO, GPIOGroup
 from philander.sysfactory import SysProvider
 from philander.systypes import ErrorCode
 
@@ -81,6 +82,115 @@ class TestGPIO( unittest.TestCase ):
         err = pin.close()
         self.assertEqual( err, ErrorCode.errOk )
         
+    def test_group(self):
+        pins = []
+        for designator in (5, 6, 13):
+            pin = GPIO.getGPIO()
+            gpioParams = { "gpio.pinDesignator": designator, "gpio.direction": GPIO.DIRECTION_OUT }
+            GPIO.Params_init( gpioParams )
+            err = pin.open(gpioParams)
+            self.assertEqual( err, ErrorCode.errOk )
+            pins.append( pin )
+        group = GPIOGroup()
+        self.assertEqual( group.write( 0x07 ), ErrorCode.errNotInited )
+        group = GPIOGroup( pins )
+        err = group.write( 0x05 )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( [p.get() for p in pins], [GPIO.LEVEL_HIGH, GPIO.LEVEL_LOW, GPIO.LEVEL_HIGH] )
+        self.assertEqual( group.read(), (0x05, ErrorCode.errOk) )
+        # Only the masked pins are touched
+        err = group.write( 0x02, mask=0x03 )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( group.read(), (0x06, ErrorCode.errOk) )
+        # Bulk access is delegated to the implementation
+        calls = []
+        impl = type( pins[0] )
+        def setMultiple( grpPins, levels ):
+            calls.append( ([p.designator for p in grpPins], levels) )
+            return GPIO._setMultiple( grpPins, levels )
+        with mock.patch.object( impl, "_setMultiple", staticmethod( setMultiple ) ):
+            err = group.write( 0x01, mask=0x05 )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( calls, [([5, 13], [GPIO.LEVEL_HIGH, GPIO.LEVEL_LOW])] )
+        self.assertEqual( group.read(), (0x03, ErrorCode.errOk) )
+        for pin in pins:
+            self.assertEqual( pin.close(), ErrorCode.errOk )
+    
+    def test_counter(self):
+        pin = GPIO.getGPIO()
+        gpioParams = { "gpio.pinDesignator": 17, "gpio.direction": GPIO.DIRECTION_IN,
+                       "gpio.bounce": GPIO.BOUNCE_NONE }
+        GPIO.Params_init( gpioParams )
+        self.assertEqual( pin.enableCounter(), ErrorCode.errResourceConflict )
+        err = pin.open(gpioParams)
+        self.assertEqual( err, ErrorCode.errOk )
+        with mock.patch.object( pin, "_fire" ) as fire:
+            self.assertEqual( pin.enableCounter(), ErrorCode.errOk )
+            for _ in range(3):
+                pin._callback( None )
+            self.assertEqual( pin.edgeCount, 3 )
+            fire.assert_not_called()
+            self.assertEqual( pin.disableCounter(), ErrorCode.errOk )
+            pin._callback( None )
+            self.assertEqual( pin.edgeCount, 3 )
+            self.assertEqual( fire.call_count, 1 )
+        err = pin.close()
+        self.assertEqual( err, ErrorCode.errOk )
+    
+    @unittest.skipUnless( hasImpl( "periphery", "GPIO" ), "periphery not installed" )
+    def test_periphery_events(self):
+        from philander.gpio_periphery import _GPIO_Periphery
+        class FakeEvent():
+            def __init__(self, timestamp):
+                self.timestamp = timestamp
+        class FakePin():
+            # Kernel event queue, time stamps in ns
+            def __init__(self):
+                self.queue = []
+                self.polls = 0
+            def read_event(self):
+                return self.queue.pop(0)
+            def poll(self, timeout):
+                self.polls += 1
+                return len( self.queue ) > 0
+        gpio = _GPIO_Periphery()
+        gpio.pin = FakePin()
+        with mock.patch.object( gpio, "_fire" ) as fire:
+            # All queued events are drained in one wake-up, even without
+            # de-bouncing. Otherwise, poll() would keep the worker spinning.
+            gpio.bounce = GPIO.BOUNCE_NONE
+            gpio.pin.queue = [FakeEvent( 1000000 * t ) for t in (1, 2, 3)]
+            gpio._callback( gpio.pin )
+            self.assertEqual( gpio.pin.queue, [] )
+            self.assertEqual( fire.call_count, 3 )
+            # A batch stops at the maximum size
+            fire.reset_mock()
+            num = _GPIO_Periphery.EVENT_BATCH_MAX + 4
+            gpio.pin.queue = [FakeEvent( 1000000 * t ) for t in range(num)]
+            gpio._callback( gpio.pin )
+            self.assertEqual( fire.call_count, _GPIO_Periphery.EVENT_BATCH_MAX )
+            self.assertEqual( len(gpio.pin.queue), 4 )
+            gpio._callback( gpio.pin )
+            self.assertEqual( fire.call_count, num )
+            # Bounces are dropped based on the kernel time stamps [ms]
+            fire.reset_mock()
+            gpio.bounce = 200
+            gpio._lastEventTime = 0
+            gpio.pin.queue = [FakeEvent( 1000000 * t ) for t in (1000, 1005, 1150, 1300, 1350, 1600)]
+            gpio._callback( gpio.pin )
+            self.assertEqual( gpio.pin.queue, [] )
+            self.assertEqual( fire.call_count, 3 )
+            # In counter mode, a batch is counted without firing events
+            fire.reset_mock()
+            gpio.isOpen = True
+            self.assertEqual( gpio.enableCounter(), ErrorCode.errOk )
+            gpio.bounce = GPIO.BOUNCE_NONE
+            gpio.pin.queue = [FakeEvent( 1000000 * t ) for t in (1, 2, 3, 4, 5)]
+            gpio._callback( gpio.pin )
+            self.assertEqual( gpio.edgeCount, 5 )
+            fire.assert_not_called()
+            gpio.isOpen = False
+        
 if __name__ == '__main__':
     unittest.main()
 
@@ -2,11 +2,13 @@
 """
 import argparse
 import sys
+import time
 import unittest
 
 from philander.htu21d import HTU21D as Sensor, StatusID
 from philander.sensor import SelfTest
 from philander.serialbus import SerialBusType
+from philander.simdev import SimDevNull
 from philander.systypes import ErrorCode
 
 config = {
@@ -14,6 +16,34 @@ config = {
     "Sensor.dataRate"     : 100,
 }
 
+class SimHTU21D( SimDevNull ):
+    """Simulates no-hold master conversions, that are not acknowledged early.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.cmd = None
+        self.tStart = 0
+    
+    def writeBuffer( self, data ):
+        self.cmd = data[0]
+        self.tStart = time.time()
+        return ErrorCode.errOk
+    
+    def readBuffer( self, length ):
+        data = None
+        err = ErrorCode.errOk
+        if self.cmd == Sensor.CMD_GET_TEMP:
+            tConv = Sensor.MEAS_TIME_MAX_MS_T14 / 1000
+            data = [0x66, 0x4C, 0]
+        else:
+            tConv = Sensor.MEAS_TIME_MAX_MS_RH12 / 1000
+            data = [0x7C, 0x82, 0]
+        if time.time() - self.tStart < tConv:
+            err = ErrorCode.errLowLevelFail
+        return data[:length], err
+
+
 class TestHTU21D( unittest.TestCase ):
             
     def test_paramsinit(self):
@@ -95,6 +125,52 @@ class TestHTU21D( unittest.TestCase ):
         err = sensor.close()
         self.assertTrue( err.isOk() )
 
+    def test_nohold(self):
+        global config
+        cfg = config.copy()
+        Sensor.Params_init( cfg )
+        sensor = Sensor()
+        self.assertIsNotNone( sensor )
+        err = sensor.open(cfg)
+        self.assertTrue( err.isOk() )
+        sensor.sim = SimHTU21D()
+        # Blocking
+        temp, err = sensor._getTemperature()
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertAlmostEqual( temp, 23.4, delta=0.1 )
+        # Non-blocking
+        _, err = sensor.fetchMeasurement()
+        self.assertEqual( err, ErrorCode.errInadequate )
+        err = sensor.startMeasurement()
+        self.assertEqual( err, ErrorCode.errOk )
+        meas, err = sensor.fetchMeasurement()
+        self.assertEqual( err, ErrorCode.errBusy )
+        self.assertIsNone( meas )
+        for _ in range(20):
+            time.sleep( 0.01 )
+            meas, err = sensor.fetchMeasurement()
+            if err != ErrorCode.errBusy:
+                break
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertAlmostEqual( meas.temperature, 23.4, delta=0.1 )
+        self.assertAlmostEqual( meas.humidity, 54.5, delta=0.5 )
+        self.assertIs( sensor.latestData, meas )
+        # A conversion not acknowledged when due is read once per call
+        err = sensor.startMeasurement()
+        self.assertEqual( err, ErrorCode.errOk )
+        sensor._pendingDue = 0
+        start = time.time()
+        for _ in range( Sensor.FETCH_RETRY_NUM - 1 ):
+            _, err = sensor.fetchMeasurement()
+            self.assertEqual( err, ErrorCode.errBusy )
+        _, err = sensor.fetchMeasurement()
+        self.assertEqual( err, ErrorCode.errLowLevelFail )
+        self.assertLess( time.time() - start, Sensor.FETCH_RETRY_MS / 1000 )
+        _, err = sensor.fetchMeasurement()
+        self.assertEqual( err, ErrorCode.errInadequate )
+        err = sensor.close()
+        self.assertTrue( err.isOk() )
+
         
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
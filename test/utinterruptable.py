@@ -50,6 +50,25 @@ class MySource( Interruptable ):
         return ret
 
 
+class MyStatusSource( MySource ):
+    """Serves event contexts from a status snapshot.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.status = 0
+        self.numCaptures = 0
+        
+    def _captureEventStatus(self, event):
+        self.numCaptures += 1
+        status = self.status
+        self.status = 0
+        return status, status, ErrorCode.errOk
+    
+    def getEventContext(self, event, context):
+        return self._getEventContextFromStatus( event, context )
+
+
 def handlingRoutine( feedback, *args ):
     global globSemaphore
     # print("Handler called. event=", event, "feedback=", feedback)
@@ -89,6 +108,59 @@ class TestInterruptable( unittest.TestCase ):
                 self.assertEqual( context.control, EventContextControl.getNext )
             self.assertEqual( err, ErrorCode.errOk )
             
+    def test_status(self):
+        src = MyStatusSource()
+        context = EventContext()
+        # Nothing pending
+        err = src.getEventContext( Event.evtInt1, context )
+        self.assertEqual( err, ErrorCode.errFewData )
+        # Status is captured just once
+        src.status = 0x29
+        src.numCaptures = 0
+        context.control = EventContextControl.getFirst
+        sources = []
+        err = ErrorCode.errMoreData
+        while err == ErrorCode.errMoreData:
+            err = src.getEventContext( Event.evtInt1, context )
+            self.assertIn( err, [ErrorCode.errMoreData, ErrorCode.errOk] )
+            sources.append( context.source )
+        self.assertEqual( sources, [0x20, 0x08, 0x01] )
+        self.assertEqual( src.numCaptures, 1 )
+        self.assertEqual( context.eventStatus, 0x29 )
+        # Contexts walked through at a time keep their own snapshot
+        src.status = 0x29
+        ctx1 = EventContext()
+        err = src.getEventContext( Event.evtInt1, ctx1 )
+        self.assertEqual( err, ErrorCode.errMoreData )
+        src.status = 0x06
+        ctx2 = EventContext()
+        err = src.getEventContext( Event.evtInt1, ctx2 )
+        self.assertEqual( err, ErrorCode.errMoreData )
+        err = src.getEventContext( Event.evtInt1, ctx1 )
+        self.assertEqual( ctx1.source, 0x08 )
+        self.assertEqual( ctx1.eventStatus, 0x29 )
+        self.assertEqual( ctx2.eventStatus, 0x06 )
+        # Reverse order
+        src.status = 0x29
+        context.control = EventContextControl.getLast
+        err = src.getEventContext( Event.evtInt1, context )
+        self.assertEqual( err, ErrorCode.errMoreData )
+        self.assertEqual( context.source, 0x01 )
+        # Iterator
+        src.status = 0x06
+        src.numCaptures = 0
+        sources = [ctx.source for ctx in src.iterEventContexts( Event.evtInt1 )]
+        self.assertEqual( sources, [0x04, 0x02] )
+        self.assertEqual( src.numCaptures, 1 )
+        sources = [ctx.source for ctx in src.iterEventContexts( Event.evtInt1 )]
+        self.assertEqual( sources, [] )
+        # Clear all
+        src.status = 0x06
+        context.control = EventContextControl.clearAll
+        err = src.getEventContext( Event.evtInt1, context )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( src.status, 0 )
+            
     def test_register(self):
         src = MySource()
         global globSemaphore
@@ -136,6 +208,98 @@ class TestInterruptable( unittest.TestCase ):
         while (not globSemaphore) and (time.time()-start < 2): pass
         self.assertIsNone( globSemaphore, "Event fired on de-registered handler!")
     
+    def test_dispatch(self):
+        for builtin in [True, False]:
+            src = MySource()
+            src.DISPATCH_BUILTIN = builtin
+            calls = []
+            def handlerA( feedback, *args ):
+                calls.append( ("A", feedback, args) )
+            def handlerB( feedback, *args ):
+                calls.append( ("B", feedback, args) )
+            err = src.registerInterruptHandler( Event.evtInt1, "fb1", handlerA )
+            self.assertEqual( err, ErrorCode.errOk )
+            err = src.registerInterruptHandler( Event.evtAny, "fbAny", handlerB )
+            self.assertEqual( err, ErrorCode.errOk )
+            self.assertTrue( src.isEnabled )
+            src._fire( Event.evtInt1, 42 )
+            self.assertEqual( calls, [("A", "fb1", (42,)), ("B", "fb1", (42,))] )
+            calls.clear()
+            src._fire( Event.evtInt2 )
+            self.assertEqual( calls, [("B", "fbAny", ())] )
+            # De-register from all events
+            calls.clear()
+            err = src.registerInterruptHandler( Event.evtNone, None, handlerB )
+            self.assertEqual( err, ErrorCode.errOk )
+            src._fire( Event.evtInt1 )
+            src._fire( Event.evtInt2 )
+            self.assertEqual( calls, [("A", "fb1", ())] )
+            self.assertTrue( src.isEnabled )
+            # Clear the remaining event
+            calls.clear()
+            err = src.registerInterruptHandler( Event.evtInt1, None, None )
+            self.assertEqual( err, ErrorCode.errOk )
+            src._fire( Event.evtInt1 )
+            self.assertEqual( calls, [] )
+            self.assertFalse( src.isEnabled )
+    
+    def test_queueddispatch(self):
+        import threading
+        src = MySource()
+        gate = threading.Event()
+        calls = []
+        def handler( feedback, *args ):
+            gate.wait( 2 )
+            calls.append( (feedback, args) )
+        err = src.registerInterruptHandler( Event.evtAny, "fb", handler )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( src.stopDispatchWorkers(), ErrorCode.errInadequate )
+        self.assertEqual( src.startDispatchWorkers( 0 ), ErrorCode.errInvalidParameter )
+        err = src.startDispatchWorkers( numWorkers=1, queueSize=3, coalesce=[Event.evtInt2] )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( src.startDispatchWorkers(), ErrorCode.errResourceConflict )
+        # Let the worker pick up the first event and block in the handler
+        src._fire( Event.evtInt1, 0 )
+        start = time.time()
+        while (src.getDispatchStatistics().pending > 0) and (time.time()-start < 2): pass
+        # Firing must not block
+        src._fire( Event.evtInt2, 1 )
+        src._fire( Event.evtInt2, 2 )
+        src._fire( Event.evtInt1, 3 )
+        src._fire( Event.evtInt1, 4 )
+        src._fire( Event.evtInt1, 5 )
+        stats = src.getDispatchStatistics()
+        self.assertEqual( stats.pending, 3 )
+        self.assertEqual( stats.coalesced, 1 )
+        self.assertEqual( stats.overflows, 1 )
+        # The discarded entry cannot be coalesced into anymore
+        self.assertNotIn( Event.evtInt2, src._dispatchPending )
+        gate.set()
+        err = src.stopDispatchWorkers()
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( [c[1][0] for c in calls], [0, 3, 4, 5] )
+        stats = src.getDispatchStatistics()
+        self.assertEqual( stats.pending, 0 )
+        self.assertEqual( stats.processed, 4 )
+        # Back to synchronous execution
+        calls.clear()
+        src._fire( Event.evtInt1, 6 )
+        self.assertEqual( calls, [("fb", (6,))] )
+        # Events fired while stopping are handled inline, not dropped
+        calls.clear()
+        err = src.startDispatchWorkers()
+        self.assertEqual( err, ErrorCode.errOk )
+        with src._dispatchCond:
+            src._dispatchDone = True
+            src._dispatchCond.notify_all()
+        for worker in src._dispatchWorkers:
+            worker.join()
+        self.assertFalse( src._enqueueEvent( Event.evtInt1, (7,) ) )
+        self.assertEqual( src.getDispatchStatistics().pending, 0 )
+        src._fire( Event.evtInt1, 7 )
+        self.assertEqual( calls, [("fb", (7,))] )
+        self.assertEqual( src.stopDispatchWorkers(), ErrorCode.errOk )
+    
     
 if __name__ == '__main__':
     unittest.main()
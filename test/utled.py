@@ -0,0 +1,153 @@
+"""
+"""
+import time
+import unittest
+from unittest import mock
+
+from philander.led import LED
+from philander.pwm import PWM
+from philander.systypes import ErrorCode
+
+config = {
+    "LED.label"               : "My status LED",
+    "LED.gpio.pinDesignator"  : 17,
+}
+
+class TestLED( unittest.TestCase ):
+            
+    def test_paramsinit(self):
+        cfg = config.copy()
+        LED.Params_init( cfg )
+        self.assertTrue( "LED.label" in cfg )
+        self.assertTrue( "LED.gpio.direction" in cfg )
+
+    def test_open(self):
+        cfg = config.copy()
+        LED.Params_init( cfg )
+        led = LED()
+        err = led.open(cfg)
+        self.assertEqual( err, ErrorCode.errOk )
+        err = led.open(cfg)
+        self.assertEqual( err, ErrorCode.errResourceConflict )
+        err = led.close()
+        self.assertEqual( err, ErrorCode.errOk )
+
+    def test_blink(self):
+        leds = []
+        traces = []
+        for idx in range(3):
+            cfg = config.copy()
+            cfg["LED.gpio.pinDesignator"] = 17 + idx
+            LED.Params_init( cfg )
+            led = LED()
+            err = led.open(cfg)
+            self.assertEqual( err, ErrorCode.errOk )
+            trace = []
+            led.set = trace.append
+            leds.append( led )
+            traces.append( trace )
+        # Finite blinking terminates by itself
+        leds[0].blink( curve=[1, 0], cycle_length=0.1, num_cycles=2 )
+        self.assertTrue( leds[0].isBlinking() )
+        start = time.time()
+        while leds[0].isBlinking() and (time.time()-start < 2): pass
+        self.assertFalse( leds[0].isBlinking() )
+        self.assertEqual( traces[0], [1, 0, 1, 0] )
+        # Each blink starts at the first and ends at the last curve item
+        for curve, cycles in ( ([1, 0], 1), (LED.CURVE_HARTBEAT, 1), ([0, 0.5, 1], 3) ):
+            time.sleep( 0.013 )
+            traces[0].clear()
+            leds[0].blink( curve=curve, cycle_length=0.1, num_cycles=cycles )
+            start = time.time()
+            while leds[0].isBlinking() and (time.time()-start < 2): pass
+            self.assertEqual( traces[0], curve * cycles )
+        # LEDs sharing the same rate run phase-aligned
+        leds[1].blink( curve=[1, 0], cycle_length=0.1 )
+        time.sleep( 0.03 )
+        leds[2].blink( curve=[1, 0], cycle_length=0.1 )
+        time.sleep( 0.3 )
+        with LED._scheduler._cond:
+            self.assertEqual( leds[1]._blinkJob.tick, leds[2]._blinkJob.tick )
+        # Stopping does not wait and no further values are set
+        start = time.time()
+        leds[1].stop_blinking()
+        leds[2].stop_blinking()
+        self.assertLess( time.time()-start, 0.04 )
+        self.assertFalse( leds[1].isBlinking() )
+        self.assertFalse( leds[2].isBlinking() )
+        n1, n2 = len(traces[1]), len(traces[2])
+        self.assertGreater( n2, 3 )
+        time.sleep( 0.15 )
+        self.assertEqual( len(traces[1]), n1 )
+        self.assertEqual( len(traces[2]), n2 )
+        # A slow LED does not block starting or stopping others
+        slow = mock.Mock( side_effect=lambda value: time.sleep( 0.2 ) )
+        leds[0].set = slow
+        leds[0].blink( curve=[1, 0], cycle_length=0.1 )
+        start = time.time()
+        while not slow.called and (time.time()-start < 1): pass
+        self.assertTrue( slow.called )
+        self.assertIs( leds[0].worker, LED._scheduler._worker )
+        self.assertIsNotNone( leds[0].worker )
+        start = time.time()
+        leds[1].blink( curve=[1, 0], cycle_length=0.1 )
+        leds[1].stop_blinking()
+        self.assertLess( time.time()-start, 0.04 )
+        self.assertIsNone( leds[1].worker )
+        # Stopping the slow LED waits for its step in progress, only
+        leds[0].stop_blinking()
+        num = slow.call_count
+        time.sleep( 0.3 )
+        self.assertEqual( slow.call_count, num )
+        self.assertIsNone( leds[0].worker )
+        for led in leds:
+            del led.set
+            self.assertEqual( led.close(), ErrorCode.errOk )
+
+    def test_pwm(self):
+        cfg = {
+            "LED.label"             : "Dimmable LED",
+            "LED.pwm.pinDesignator" : 12,
+            }
+        LED.Params_init( cfg )
+        self.assertFalse( "LED.pwm.frequency" in cfg )
+        pwm = PWM()
+        duties = []
+        setDuty = pwm.setDuty
+        def traceDuty( duty ):
+            duties.append( duty )
+            return setDuty( duty )
+        pwm.setDuty = traceDuty
+        led = LED()
+        with mock.patch.object( PWM, "getPWM", return_value=pwm ):
+            err = led.open(cfg)
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertIs( led.pwm, pwm )
+        self.assertIsNone( led.gpio )
+        self.assertEqual( pwm.frequency, LED.PWM_FREQUENCY_DEFAULT )
+        self.assertEqual( pwm.getState(), (PWM.ON, ErrorCode.errOk) )
+        led.set( 0.42 )
+        self.assertEqual( pwm.duty, 42 )
+        led.on()
+        self.assertEqual( pwm.duty, 100 )
+        led.off()
+        self.assertEqual( pwm.duty, 0 )
+        # Duty is updated at the breakpoints, only
+        duties.clear()
+        led.blink( curve=[0.5, 0.5, 0.5, 0.5], cycle_length=0.2, num_cycles=1 )
+        start = time.time()
+        while led.isBlinking() and (time.time()-start < 2): pass
+        self.assertEqual( duties, [50] )
+        err = led.close()
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertFalse( pwm.isOpen )
+        # No PWM available
+        with mock.patch.object( PWM, "getPWM", return_value=None ):
+            err = led.open(cfg)
+        self.assertEqual( err, ErrorCode.errNotSupported )
+        self.assertIsNone( led.pwm )
+    
+    
+if __name__ == '__main__':
+    unittest.main()
+
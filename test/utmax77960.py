@@ -7,8 +7,10 @@ import unittest
 from philander.max77960 import MAX77960 as Driver
 
 from philander.battery import Status as BatStatus
-from philander.charger import Status as ChgStatus, DCStatus, PowerSrc, TemperatureRating, ChargerError
+from philander.charger import Status as ChgStatus, DCStatus, PowerSrc, TemperatureRating, ChargerError, EventSource
 from philander.gpio import GPIO
+from philander.interruptable import Event
+from philander.simdev import SimDevMemory, Register
 from philander.systypes import ErrorCode
 
 config = {
@@ -156,6 +158,121 @@ class TestMAX77960( unittest.TestCase ):
         err = device.close()
         self.assertTrue( err.isOk() )
 
+    def test_registerdump(self):
+        global config
+        cfg = config.copy()
+        Driver.Params_init( cfg )
+        device = Driver()
+        self.assertIsNotNone( device )
+        device.sim = SimDevMemory( [Register(address=descr[0], content=descr[0]) for descr in Driver.registerMap] )
+        err = device.open(cfg)
+        self.assertTrue( err.isOk() )
+        # Contiguous registers are read in blocks
+        numReads = [0]
+        origRead = device.readBufferRegister
+        def countingRead( reg, length ):
+            numReads[0] += 1
+            return origRead( reg, length )
+        device.readBufferRegister = countingRead
+        dump, err = device.getRegisterDump()
+        self.assertTrue( err.isOk() )
+        self.assertEqual( numReads[0], 2 )
+        self.assertEqual( len(dump), len(Driver.registerMap) )
+        for (reg, name, cont, fields), descr in zip( dump, Driver.registerMap ):
+            self.assertEqual( reg, descr[0] )
+            self.assertEqual( name, descr[1] )
+            content, _ = device.readByteRegister( reg )
+            self.assertEqual( cont, content )
+            self.assertEqual( len(fields), len(descr[2]) )
+            self.assertEqual( Driver.formatRegisterContent( cont, fields ),
+                              device.getRegContentStr( descr, cont ) )
+        reg, name, cont, fields = dump[0]
+        self.assertEqual( fields[0], ("REV", (cont & Driver.CID_REVISION) >> 5) )
+        dump, err = device.getRegisterDump( decode=False )
+        self.assertTrue( err.isOk() )
+        self.assertEqual( dump[0][3], () )
+        regStr = device.getAllRegistersStr()
+        self.assertEqual( len(regStr), len(Driver.registerMap) )
+        self.assertEqual( regStr[1][3], hex(regStr[1][2]) )
+        err = device.close()
+        self.assertTrue( err.isOk() )
+
+    def test_configureitems(self):
+        global config
+        cfg = config.copy()
+        Driver.Params_init( cfg )
+        device = Driver()
+        self.assertIsNotNone( device )
+        device.sim = SimDevMemory( [Register(address=descr[0]) for descr in Driver.registerMap] )
+        err = device.open(cfg)
+        self.assertTrue( err.isOk() )
+        numReads = [0]
+        writes = []
+        origRead = device.readByteRegister
+        origWrite = device.writeByteRegister
+        def countingRead( reg ):
+            numReads[0] += 1
+            return origRead( reg )
+        def recordingWrite( reg, data ):
+            writes.append( reg )
+            return origWrite( reg, data )
+        device.readByteRegister = countingRead
+        device.writeByteRegister = recordingWrite
+        # Several fields in two protected registers
+        items = { Driver.CFG_PQEN:       Driver.PQEN_OFF,
+                  Driver.CFG_CHG_RSTRT:  Driver.CHG_RSTRT_200,
+                  Driver.CFG_TO_TIME:    Driver.TO_TIME_60_MIN,
+                  Driver.CFG_TO_ITH:     Driver.TO_ITH_400,
+                  "Charger.unknown":     0x55, }
+        err = device.configureItems( items )
+        self.assertTrue( err.isOk() )
+        self.assertEqual( numReads[0], 2 )
+        self.assertEqual( writes, [Driver.REG_CHG_CNFG_06, Driver.REG_CHG_CNFG_01,
+                                   Driver.REG_CHG_CNFG_03, Driver.REG_CHG_CNFG_06] )
+        data, _ = origRead( Driver.REG_CHG_CNFG_01 )
+        self.assertEqual( data & Driver.PQEN, Driver.PQEN_OFF )
+        self.assertEqual( data & Driver.CHG_RSTRT, Driver.CHG_RSTRT_200 )
+        data, _ = origRead( Driver.REG_CHG_CNFG_03 )
+        self.assertEqual( data & Driver.TO_TIME, Driver.TO_TIME_60_MIN )
+        self.assertEqual( data & Driver.TO_ITH, Driver.TO_ITH_400 )
+        # Unprotected, unchanged register: no lock, no write
+        numReads[0] = 0
+        writes.clear()
+        data, _ = origRead( Driver.REG_CHG_CNFG_10 )
+        err = device.configureItems( {Driver.CFG_VCHGIN_REG: data & Driver.VCHGIN_REG} )
+        self.assertTrue( err.isOk() )
+        self.assertEqual( numReads[0], 1 )
+        self.assertEqual( writes, [] )
+        err = device.configureItems( {} )
+        self.assertTrue( err.isOk() )
+        err = device.close()
+        self.assertTrue( err.isOk() )
+
+    def test_events(self):
+        global config
+        cfg = config.copy()
+        Driver.Params_init( cfg )
+        device = Driver()
+        self.assertIsNotNone( device )
+        device.sim = SimDevMemory( [Register(address=descr[0]) for descr in Driver.registerMap] )
+        err = device.open(cfg)
+        self.assertTrue( err.isOk() )
+        device.sim.writeByteRegister( Driver.REG_TOP_INT, Driver.TSHDN_I )
+        device.sim.writeByteRegister( Driver.REG_CHG_INT, Driver.CHGIN_I | Driver.BAT_I )
+        numReads = [0]
+        origRead = device.readByteRegister
+        def countingRead( reg ):
+            numReads[0] += 1
+            return origRead( reg )
+        device.readByteRegister = countingRead
+        sources = [ctx.source for ctx in device.iterEventContexts( Event.evtInt1 )]
+        self.assertEqual( sources, [EventSource.thermalShutdown,
+                                    EventSource.batteryTemperature,
+                                    EventSource.inputVoltage] )
+        self.assertEqual( numReads[0], 2 )
+        err = device.close()
+        self.assertTrue( err.isOk() )
+
         
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
@@ -1,8 +1,10 @@
 """
 """
+from array import array
 from time import sleep
 import unittest
 
+from philander.adc import ADC
 from philander.gpio import GPIO
 from philander.mux import Mux
 from philander.systypes import ErrorCode
@@ -16,6 +18,22 @@ gMuxParams = {\
     "mux.enable.gpio.pinDesignator":   26,
 }
 
+class MyADC( ADC ):
+    """Samples the selection of the given multiplexer.
+    """
+    
+    def __init__(self, mux):
+        super().__init__()
+        self.mux = mux
+    
+    def getDigital(self):
+        val = 0
+        for idx, pin in enumerate(self.mux.bit):
+            if pin.get() == GPIO.LEVEL_HIGH:
+                val |= 1 << idx
+        return val * 100, ErrorCode.errOk
+
+
 class TestMux( unittest.TestCase ):
     
     #@unittest.skip("Disabled for easier diagnostics.")
@@ -31,6 +49,8 @@ class TestMux( unittest.TestCase ):
         self.assertEqual( muxParams["mux.bit0.gpio.direction"], GPIO.DIRECTION_OUT )
         self.assertFalse( muxParams["mux.bit1.gpio.inverted"] )
         self.assertEqual( muxParams["mux.bit2.gpio.level"], GPIO.LEVEL_LOW )
+        self.assertEqual( muxParams["mux.settleTime"], Mux.DEFAULT_SETTLE_TIME )
+        self.assertFalse( muxParams["mux.grayCode"] )
         
     #@unittest.skip("Disabled for easier diagnostics.")
     def test_select(self):
@@ -70,6 +90,50 @@ class TestMux( unittest.TestCase ):
         err = mux.close()
         self.assertEqual( err, ErrorCode.errOk )
         
+    #@unittest.skip("Disabled for easier diagnostics.")
+    def test_scan(self):
+        mux = Mux()
+        self.assertIsNotNone( mux )
+        muxParams = gMuxParams.copy()
+        err = mux.open(muxParams)
+        self.assertEqual( err, ErrorCode.errOk )
+        # Count the line toggles
+        numSet = [0]
+        for pin in mux.bit:
+            def countingSet( level, origSet=pin.set ):
+                numSet[0] += 1
+                return origSet( level )
+            pin.set = countingSet
+        adc = MyADC( mux )
+        values = array( "H", [0] * 8 )
+        err = mux.scan( adc, array("H", [0] * 7) )
+        self.assertEqual( err, ErrorCode.errInvalidParameter )
+        numSet[0] = 0
+        err = mux.scan( adc, values )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( list(values), [ch * 100 for ch in range(8)] )
+        # Initially, all 3 lines are set. Then, binary counting toggles 11.
+        self.assertEqual( numSet[0], 14 )
+        # Gray code: one line per step, plus 3 to return from channel 7.
+        numSet[0] = 0
+        values = array( "H", [0] * 8 )
+        err = mux.scan( adc, values, grayCode=True )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( list(values), [ch * 100 for ch in range(8)] )
+        self.assertEqual( numSet[0], 10 )
+        # A subset of channels
+        values = array( "H", [0] * 3 )
+        err = mux.scan( adc, values, channels=[5, 2, 6], settleTime=10, grayCode=True )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( list(values), [500, 200, 600] )
+        # Selecting the current channel does not toggle any line
+        numSet[0] = 0
+        err = mux.select( mux._value )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( numSet[0], 0 )
+        err = mux.close()
+        self.assertEqual( err, ErrorCode.errOk )
+        
         
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,19 @@
+"""
+"""
+import unittest
+from philander.ptime import sleepUs, ticksAdd, ticksDiff, ticksUs
+
+class TestPtime( unittest.TestCase ):
+
+    def test_ticks(self):
+        start = ticksUs()
+        sleepUs( 2000 )
+        now = ticksUs()
+        self.assertGreaterEqual( ticksDiff( now, start ), 2000 )
+        self.assertLess( ticksDiff( start, now ), 0 )
+        later = ticksAdd( start, 1000 )
+        self.assertEqual( ticksDiff( later, start ), 1000 )
+        self.assertEqual( ticksDiff( ticksAdd( later, -1000 ), start ), 0 )
+
+if __name__ == '__main__':
+    unittest.main()
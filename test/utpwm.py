@@ -3,7 +3,7 @@
 import unittest
 
 from philander.gpio import GPIO
-from philander.pwm import PWM
+from philander.pwm import PWM, PWMGroup
 from philander.sysfactory import SysProvider
 from philander.systypes import ErrorCode
 
@@ -91,6 +91,58 @@ class TestPWM( unittest.TestCase ):
         err = device.close()
         self.assertEqual( err, ErrorCode.errOk )
     
+    def test_group(self):
+        calls = []
+        class TracedPWM( PWM ):
+            def setFrequency(self, frequency):
+                calls.append( (self, "f", frequency) )
+                return super().setFrequency( frequency )
+            def setDuty(self, duty):
+                calls.append( (self, "d", duty) )
+                return super().setDuty( duty )
+            def start(self, duty=None):
+                calls.append( (self, "on", duty) )
+                return super().start( duty )
+            def stop(self):
+                calls.append( (self, "off", None) )
+                return super().stop()
+        devices = [TracedPWM() for _ in range(3)]
+        for device in devices:
+            params = { "pwm.pinDesignator": self.outPin, "pwm.duty": 0 }
+            err = device.open( params )
+            self.assertEqual( err, ErrorCode.errOk )
+        group = PWMGroup( devices[:2] )
+        self.assertEqual( group.add( devices[2] ), ErrorCode.errOk )
+        self.assertEqual( group.add( devices[2] ), ErrorCode.errInvalidParameter )
+        a, b, c = devices
+        # Start in phase: frequencies and duties first, then all channels back-to-back
+        err = group.start( duty=[10, 20, 30], frequency=1000 )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( calls, [(a, "f", 1000), (b, "f", 1000), (c, "f", 1000),
+                                  (a, "d", 10), (b, "d", 20), (c, "d", 30),
+                                  (a, "on", None), (b, "on", None), (c, "on", None)] )
+        for device in devices:
+            self.assertEqual( device.getState(), (PWM.ON, ErrorCode.errOk) )
+        # Unchanged values are skipped
+        calls.clear()
+        err = group.update( duty=[10, 25, None], frequency=[1000, None, 2000] )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( calls, [(c, "f", 2000), (b, "d", 25)] )
+        calls.clear()
+        err = group.update( duty=25 )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( calls, [(a, "d", 25), (c, "d", 25)] )
+        err = group.update( duty=[1, 2, 3, 4] )
+        self.assertEqual( err, ErrorCode.errInvalidParameter )
+        calls.clear()
+        err = group.stop()
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( calls, [(a, "off", None), (b, "off", None), (c, "off", None)] )
+        for device in devices:
+            self.assertEqual( device.close(), ErrorCode.errOk )
+        err = group.stop()
+        self.assertEqual( err, ErrorCode.errResourceConflict )
+    
     
         
 if __name__ == '__main__':
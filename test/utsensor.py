@@ -0,0 +1,93 @@
+"""
+"""
+import time
+import unittest
+
+from philander.sensor import History, Sensor
+from philander.systypes import ErrorCode
+
+class _Counter( Sensor ):
+    
+    def __init__(self):
+        Sensor.__init__(self)
+        self.reads = 0
+        
+    def getLatestData(self):
+        self.reads += 1
+        return self.reads, ErrorCode.errOk
+
+    def getNextData(self):
+        return self.getLatestData()
+    
+class TestSensor( unittest.TestCase ):
+    
+    def test_history(self):
+        hist = History( 4, 'H' )
+        self.assertEqual( len(hist), 0 )
+        self.assertEqual( hist.getLatest(), (None, 0) )
+        stamps, values = hist.window()
+        self.assertEqual( len(stamps), 0 )
+        self.assertEqual( len(values), 0 )
+        for idx in range(6):
+            hist.append( idx, stamp=idx * 100000 )
+        self.assertEqual( len(hist), 4 )
+        self.assertEqual( hist.getLatest(), (5, 500000) )
+        stamps, values = hist.window()
+        self.assertIsInstance( values, memoryview )
+        self.assertEqual( list(values), [2, 3, 4, 5] )
+        self.assertEqual( list(stamps), [200000, 300000, 400000, 500000] )
+        stamps, values = hist.window( 2 )
+        self.assertEqual( list(values), [4, 5] )
+        hist.clear()
+        self.assertEqual( len(hist), 0 )
+        # Arbitrary objects
+        hist = History( 3 )
+        for val in "abcde":
+            hist.append( val )
+        stamps, values = hist.window()
+        self.assertEqual( values, ["c", "d", "e"] )
+        self.assertLessEqual( stamps[0], stamps[2] )
+        
+    def test_latest(self):
+        cfg = {
+            "Sensor.history.size": 8,
+            "Sensor.history.typecode": 'i',
+            "Sensor.history.maxAge": 100,
+        }
+        Sensor.Params_init( cfg )
+        device = _Counter()
+        err = device.open( cfg )
+        self.assertTrue( err.isOk() )
+        self.assertIsNotNone( device.history )
+        # Fresh data is served from the history
+        val, err = device.getCachedData()
+        self.assertTrue( err.isOk() )
+        self.assertEqual( val, 1 )
+        val, err = device.getCachedData()
+        self.assertEqual( val, 1 )
+        self.assertEqual( device.reads, 1 )
+        # Next data is always read, even if delegating to latest data
+        for expected in (2, 3, 4):
+            val, err = device.getNextData()
+            self.assertTrue( err.isOk() )
+            self.assertEqual( val, expected )
+        self.assertEqual( list(device.history.window()[1]), [1] )
+        val, err = device.getCachedData()
+        self.assertEqual( val, 1 )
+        # Stale data is read again and recorded once
+        time.sleep( 0.15 )
+        val, err = device.getCachedData()
+        self.assertEqual( val, 5 )
+        self.assertEqual( list(device.history.window()[1]), [1, 5] )
+        err = device.close()
+        self.assertTrue( err.isOk() )
+        self.assertIsNone( device.history )
+        # Without history, each call reads
+        val, err = device.getCachedData()
+        self.assertEqual( val, 6 )
+        val, err = device.getCachedData()
+        self.assertEqual( val, 7 )
+        
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+"""
+import time
+import unittest
+from unittest import mock
+
+from philander.pwm import PWM
+from philander.sequencer import JitterStatistics, Sequencer
+from philander.systypes import ErrorCode
+
+
+class TracedPWM( PWM ):
+
+    def __init__(self, trace):
+        super().__init__()
+        self.trace = trace
+
+    def setFrequency(self, frequency):
+        self.trace.append( (time.monotonic(), self, "f", frequency) )
+        return super().setFrequency( frequency )
+
+    def start(self, duty=None):
+        self.trace.append( (time.monotonic(), self, "d", duty) )
+        return super().start( duty )
+
+
+class TestSequencer( unittest.TestCase ):
+
+    def test_pulsetrain(self):
+        steps = Sequencer.pulseTrain( 600, 250, 3, 55 )
+        self.assertEqual( steps, [(0, 55, None), (250, 0, None),
+                                  (600, 55, None), (850, 0, None),
+                                  (1200, 55, None), (1450, 0, None),
+                                  (1800, None, None)] )
+        steps = Sequencer.pulseTrain( 100, 10, 1, 20, delay=5 )
+        self.assertEqual( steps, [(5, 20, None), (15, 0, None), (105, None, None)] )
+
+    def test_play(self):
+        trace = []
+        pwmA = TracedPWM( trace )
+        pwmB = TracedPWM( trace )
+        for pwm in (pwmA, pwmB):
+            self.assertEqual( pwm.open( {"pwm.pinDesignator": 4} ), ErrorCode.errOk )
+        seq = Sequencer()
+        self.assertEqual( seq.start(), ErrorCode.errInadequate )
+        self.assertEqual( seq.addTrack( pwmA, [] ), ErrorCode.errInvalidParameter )
+        self.assertEqual( seq.addTrack( pwmA, [(-1, 0, None)] ), ErrorCode.errInvalidParameter )
+        err = seq.addTrack( pwmA, [(0, 20, 1000), (40, 0, None)] )
+        self.assertEqual( err, ErrorCode.errOk )
+        err = seq.addTrack( pwmB, Sequencer.pulseTrain( 20, 10, 2, 70 ) )
+        self.assertEqual( err, ErrorCode.errOk )
+        start = time.monotonic()
+        err = seq.start()
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertTrue( seq.isPlaying() )
+        self.assertEqual( seq.start(), ErrorCode.errBusy )
+        self.assertEqual( seq.addTrack( pwmA, [(0, 0, None)] ), ErrorCode.errBusy )
+        self.assertEqual( seq.wait( 2 ), ErrorCode.errOk )
+        self.assertFalse( seq.isPlaying() )
+        actions = [(p, k, v) for _, p, k, v in trace]
+        self.assertEqual( actions, [(pwmA, "f", 1000), (pwmA, "d", 20), (pwmB, "d", 70),
+                                    (pwmB, "d", 0), (pwmB, "d", 70), (pwmB, "d", 0),
+                                    (pwmA, "d", 0)] )
+        self.assertEqual( pwmA.frequency, 1000 )
+        self.assertEqual( pwmA.duty, 0 )
+        self.assertEqual( pwmB.state, PWM.ON )
+        # Deadlines refer to the start of playback
+        self.assertGreaterEqual( trace[-1][0] - start, 0.04 )
+        self.assertLess( trace[-1][0] - start, 0.2 )
+        jitter = seq.getJitter()
+        self.assertIsInstance( jitter, JitterStatistics )
+        self.assertEqual( jitter.count, 5 )
+        self.assertGreaterEqual( jitter.maximum, jitter.mean )
+        self.assertGreaterEqual( jitter.mean, jitter.minimum )
+        self.assertGreaterEqual( jitter.minimum, 0 )
+        self.assertEqual( jitter.errors, 0 )
+        # Failing PWM calls are counted
+        with mock.patch.object( pwmB, "start", return_value=ErrorCode.errLowLevelFail ):
+            self.assertEqual( seq.start( priority=100 ), ErrorCode.errInvalidParameter )
+            err = seq.start( priority=1 )
+            self.assertEqual( err, ErrorCode.errOk )
+            self.assertEqual( seq.wait( 2 ), ErrorCode.errOk )
+        self.assertEqual( seq.getJitter().errors, 4 )
+        self.assertEqual( seq.getJitter().count, 5 )
+        # Endless repetition until stopped
+        trace.clear()
+        err = seq.start( repeat=0 )
+        self.assertEqual( err, ErrorCode.errOk )
+        time.sleep( 0.15 )
+        self.assertEqual( seq.stop(), ErrorCode.errOk )
+        self.assertFalse( seq.isPlaying() )
+        self.assertGreater( seq.getJitter().count, 5 )
+        # Statistics are kept as running values, not per step
+        self.assertEqual( len(seq._lateness), 4 )
+        self.assertEqual( seq.stop(), ErrorCode.errInadequate )
+        self.assertEqual( seq.clear(), ErrorCode.errOk )
+        for pwm in (pwmA, pwmB):
+            self.assertEqual( pwm.close(), ErrorCode.errOk )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
@@ -3,6 +3,7 @@
 import logging
 from time import sleep
 import unittest
+from unittest import mock
 
 from philander.gpio import GPIO
 from philander.pwm import PWM
@@ -101,6 +102,110 @@ class TestShiftReg( unittest.TestCase ):
         err = sreg.close()
         self.assertEqual( err, ErrorCode.errOk )
         
+    #@unittest.skip("Disabled for easier diagnostics.")
+    def test_shadow(self):
+        sreg = ShiftReg()
+        self.assertIsNotNone( sreg )
+        params = shiftParams.copy()
+        params["shiftreg.length"] = 16
+        err = sreg.open(params)
+        self.assertEqual( err, ErrorCode.errOk )
+        sreg._content = 0x1234
+        sreg._contentValid = True
+        # Unchanged content: nothing to shift
+        self.assertEqual( sreg._skipBits( 0x1234, 16 ), 0 )
+        # Content moved on by one nibble / byte
+        self.assertEqual( sreg._skipBits( 0x2345, 16 ), 4 )
+        self.assertEqual( sreg._skipBits( 0x3456, 16 ), 8 )
+        # Completely new content
+        self.assertEqual( sreg._skipBits( 0xF678, 16 ), 16 )
+        # Partial writes cannot be skipped
+        self.assertEqual( sreg._skipBits( 0x34, 8 ), 8 )
+        err = sreg.write( 0xA5C3, 16 )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( sreg.content, 0xA5C3 )
+        err = sreg.write( 0x0F, 8 )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( sreg.content, 0xC30F )
+        # DIN changes go along with the falling clock edge
+        with mock.patch.object( sreg._dinClk, "write", wraps=sreg._dinClk.write ) as dinClk:
+            err = sreg.write( 0xB0, 8 )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( dinClk.call_args_list, [mock.call( 0 ), mock.call( 1 ), mock.call( 0 )] )
+        self.assertEqual( sreg.content, 0x0FB0 )
+        # A failing DIN stops shifting before the clock is raised
+        din = sreg.pin[ShiftReg.PIN_IDX_DIN]
+        dclk = sreg.pin[ShiftReg.PIN_IDX_DCLK]
+        with mock.patch.object( din, "set", return_value=ErrorCode.errLowLevelFail ), \
+             mock.patch.object( dclk, "set", wraps=dclk.set ) as clk:
+            err = sreg.write( 0x5A5A, 16 )
+        self.assertEqual( err, ErrorCode.errLowLevelFail )
+        self.assertNotIn( mock.call( GPIO.LEVEL_HIGH ), clk.call_args_list )
+        self.assertIsNone( sreg.content )
+        err = sreg.close()
+        self.assertEqual( err, ErrorCode.errOk )
+        
+    #@unittest.skip("Disabled for easier diagnostics.")
+    def test_bits(self):
+        sreg = ShiftReg()
+        self.assertIsNotNone( sreg )
+        params = shiftParams.copy()
+        err = sreg.open(params)
+        self.assertEqual( err, ErrorCode.errOk )
+        # Without length, bit access is not possible
+        err = sreg.setBit( 0 )
+        self.assertEqual( err, ErrorCode.errNotSupported )
+        err = sreg.close()
+        self.assertEqual( err, ErrorCode.errOk )
+        params = shiftParams.copy()
+        params["shiftreg.length"] = 16
+        err = sreg.open(params)
+        self.assertEqual( err, ErrorCode.errOk )
+        err = sreg.write( b"\x12\x34" )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( sreg.content, 0x1234 )
+        err = sreg.setBit( 16 )
+        self.assertEqual( err, ErrorCode.errInvalidParameter )
+        # Changes are pending until flushed
+        err = sreg.setBit( 15 )
+        self.assertEqual( err, ErrorCode.errOk )
+        err = sreg.clearBit( 2 )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( sreg.content, 0x1234 )
+        err = sreg.flush()
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( sreg.content, 0x9230 )
+        # Nothing pending
+        err = sreg.flush()
+        self.assertEqual( err, ErrorCode.errOk )
+        err = sreg.setBit( 0 )
+        self.assertEqual( err, ErrorCode.errOk )
+        err = sreg.flush()
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( sreg.content, 0x9231 )
+        # Flushing works on the image, without a full-chain comparison
+        dclk = sreg.pin[ShiftReg.PIN_IDX_DCLK]
+        with mock.patch.object( sreg, "_skipBits", wraps=sreg._skipBits ) as skip, \
+             mock.patch.object( dclk, "set", wraps=dclk.set ) as clk:
+            # A bit set and cleared again is not written at all
+            err = sreg.setBit( 10 )
+            self.assertEqual( err, ErrorCode.errOk )
+            err = sreg.clearBit( 10 )
+            self.assertEqual( err, ErrorCode.errOk )
+            err = sreg.flush()
+            self.assertEqual( err, ErrorCode.errOk )
+            clk.assert_not_called()
+            err = sreg.setBit( 8 )
+            self.assertEqual( err, ErrorCode.errOk )
+            err = sreg.flush()
+            self.assertEqual( err, ErrorCode.errOk )
+            self.assertEqual( clk.call_args_list.count( mock.call( GPIO.LEVEL_HIGH ) ), 16 )
+            self.assertEqual( clk.call_args_list[-1], mock.call( GPIO.LEVEL_LOW ) )
+            skip.assert_not_called()
+        self.assertEqual( sreg.content, 0x9331 )
+        err = sreg.close()
+        self.assertEqual( err, ErrorCode.errOk )
+        
         
 if __name__ == '__main__':
     #logger = logging.getLogger()
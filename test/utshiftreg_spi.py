@@ -5,6 +5,7 @@ import logging
 import sys
 from time import sleep
 import unittest
+from unittest import mock
 
 from philander.gpio import GPIO
 from philander.pwm import PWM
@@ -64,6 +65,45 @@ class TestShiftReg( unittest.TestCase ):
         err = sreg.close()
         self.assertEqual( err, ErrorCode.errOk )
         
+    def test_chain(self):
+        sreg = ShiftRegSPI()
+        params = shiftParams.copy()
+        params["shiftreg.length"] = 128
+        err = sreg.open(params)
+        self.assertEqual( err, ErrorCode.errOk )
+        image = bytes( range(1, 17) )
+        with mock.patch.object( sreg.serbusdev, "writeBuffer", return_value=ErrorCode.errOk ) as transfer:
+            # 128 bits from an int, most-significant byte first
+            err = sreg.write( int.from_bytes( image, "big" ), numBits=128, autoLatch=False )
+            self.assertEqual( err, ErrorCode.errOk )
+            transfer.assert_called_once_with( list(image) )
+            self.assertEqual( sreg.content, int.from_bytes( image, "big" ) )
+            # 128 bits from a bytes image, first byte first
+            transfer.reset_mock()
+            image = bytes( range(0x11, 0x21) )
+            err = sreg.write( image, autoLatch=False )
+            self.assertEqual( err, ErrorCode.errOk )
+            transfer.assert_called_once_with( list(image) )
+            # Content already in the chain is not sent again
+            transfer.reset_mock()
+            err = sreg.write( bytearray( image ), autoLatch=False )
+            self.assertEqual( err, ErrorCode.errOk )
+            transfer.assert_not_called()
+            # Pending bits are sent straight from the image
+            err = sreg.setBit( 127 )
+            self.assertEqual( err, ErrorCode.errOk )
+            err = sreg.flush( autoLatch=False )
+            self.assertEqual( err, ErrorCode.errOk )
+            transfer.assert_called_once_with( [0x91] + list(image[1:]) )
+            self.assertEqual( sreg.content >> 120, 0x91 )
+            transfer.reset_mock()
+            # Partial bytes are rejected
+            err = sreg.write( 0x1234, numBits=12 )
+            self.assertEqual( err, ErrorCode.errInvalidParameter )
+            transfer.assert_not_called()
+        err = sreg.close()
+        self.assertEqual( err, ErrorCode.errOk )
+        
         
 if __name__ == '__main__':
     #logger = logging.getLogger()
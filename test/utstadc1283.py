@@ -80,6 +80,67 @@ class TestSTADC1283( unittest.TestCase ):
         err = device.close()
         self.assertEqual( err, ErrorCode.errOk )
 
+    def test_samples(self):
+        device = Driver()
+        self.assertIsNotNone( device )
+        params = {\
+            "SerialBus.designator":   self.PortDesignator,
+            "SerialBusDevice.CS.gpio.pinDesignator": self.CS_Pin,
+            "adc.channel"    :   self.Channel,
+            "adc.vref.lower" :   self.VRefLow,
+            "adc.vref.upper" :   self.VRefHigh,
+            }
+        err = device.open(params)
+        self.assertEqual( err, ErrorCode.errOk, "Open: " + str(err) )
+        # Block transfer
+        samples, stamps, err = device.getSamples( 2 * Driver.BURST_MAX_FRAMES + 3, oversampling=2 )
+        self.assertEqual( err, ErrorCode.errOk, "getSamples: "+str(err) )
+        self.assertIsNone( stamps )
+        self.assertEqual( len(samples), 2 * Driver.BURST_MAX_FRAMES + 3 )
+        # Sample by sample
+        samples, stamps, err = device.getSamples( 10, rate=1000, timestamps=True )
+        self.assertEqual( err, ErrorCode.errOk, "getSamples: "+str(err) )
+        self.assertEqual( len(stamps), 10 )
+        err = device.close()
+        self.assertEqual( err, ErrorCode.errOk )
+
+    def test_multi(self):
+        device = Driver()
+        self.assertIsNotNone( device )
+        params = {\
+            "SerialBus.designator":   self.PortDesignator,
+            "SerialBusDevice.CS.gpio.pinDesignator": self.CS_Pin,
+            "adc.channel"    :   self.Channel,
+            "adc.vref.lower" :   self.VRefLow,
+            "adc.vref.upper" :   self.VRefHigh,
+            }
+        err = device.open(params)
+        self.assertEqual( err, ErrorCode.errOk, "Open: " + str(err) )
+        # Pipelined addressing
+        self.assertEqual( device._prepareMulti( [0, 1, 2] ), [0x08, 0, 0x10, 0, 0, 0] )
+        self.assertEqual( device._prepareMulti( [3, 1] ), [0x18, 0, 0x08, 0, 0, 0] )
+        _, err = device.getDigitalMulti( [0, 8] )
+        self.assertEqual( err, ErrorCode.errInvalidParameter )
+        values, err = device.getDigitalMulti( list(range(8)) )
+        self.assertEqual( err, ErrorCode.errOk, "getDigitalMulti: "+str(err) )
+        self.assertEqual( len(values), 8 )
+        # Continuous scan
+        _, err = device.readScan()
+        self.assertEqual( err, ErrorCode.errNotInited )
+        err = device.startScan( [1, 2, 3], rate=200, depth=4 )
+        self.assertEqual( err, ErrorCode.errOk, "startScan: "+str(err) )
+        sleep(0.1)
+        values, err = device.readScan()
+        self.assertEqual( err, ErrorCode.errOverflow )
+        self.assertEqual( len(values), 4 * 3 )
+        err = device.stopScan()
+        self.assertEqual( err, ErrorCode.errOk )
+        values, err = device.readScan()
+        self.assertLessEqual( len(values), 4 * 3 )
+        self.assertEqual( len(values) % 3, 0 )
+        err = device.close()
+        self.assertEqual( err, ErrorCode.errOk )
+
     
 if __name__ == '__main__':
     unittest.main()
@@ -3,13 +3,16 @@
 import argparse
 import sys
 import unittest
+from unittest import mock
 
 from philander.stc311x import OperatingMode
 from philander.stc3117 import STC3117 as Driver
 from philander.battery import Level
 from philander.gasgauge import SOCChangeRate, EventSource, EventContext, StatusID
+from philander.interruptable import Event, EventContextControl
 from philander.gpio import GPIO
 from philander.primitives import Percentage, Voltage, Current
+from philander.simdev import SimDevMemory, Register
 from philander.systypes import ErrorCode, RunLevel
 
 config = {
@@ -197,6 +200,151 @@ class TestSTC3117( unittest.TestCase ):
         err = device.close()
         self.assertTrue( err.isOk() )
     
+    def test_snapshot(self):
+        global config
+        cfg = config.copy()
+        Driver.Params_init( cfg )
+        device = Driver()
+        self.assertIsNotNone( device )
+        device.RSense = cfg["Gasgauge.SenseResistor"]
+        # Fake the register block: mixed mode, SOC=50%, counter=7,
+        # current=100, voltage=1700, temperature=-5, avg current=200
+        block = [ device.REGISTER.MODE_GG_RUN, 0, 0x00, 0x64, 7, 0, 100, 0,
+                  0xA4, 0x06, 0xFB, 200, 0 ]
+        def fakeRead( reg, num ):
+            self.assertEqual( reg, device.REGISTER.REG_MODE )
+            self.assertEqual( num, len(block) )
+            return block, ErrorCode.errOk
+        device.readBufferRegister = fakeRead
+        snap, err = device.getSnapshot()
+        self.assertTrue( err.isOk() )
+        self.assertEqual( snap.counter, 7 )
+        self.assertEqual( snap.opMode, OperatingMode.opModeMixed )
+        self.assertEqual( snap.soc, 50 )
+        self.assertEqual( snap.voltage, 3740 )
+        self.assertEqual( snap.current, (100 * 5880 + 5) // 10 )
+        self.assertEqual( snap.temperature, -5 )
+        self.assertNotEqual( snap.currentAvg, Current.invalid )
+        self.assertEqual( snap.changeRate, SOCChangeRate.invalid )
+        self.assertGreater( snap.timestamp, 0 )
+        with self.assertRaises( AttributeError ):
+            snap.soc = 0
+        # Voltage mode delivers the change rate, instead
+        block[0] |= device.REGISTER.MODE_VMODE
+        snap, err = device.getSnapshot()
+        self.assertTrue( err.isOk() )
+        self.assertEqual( snap.opMode, OperatingMode.opModeVoltage )
+        self.assertEqual( snap.currentAvg, Current.invalid )
+        self.assertNotEqual( snap.changeRate, SOCChangeRate.invalid )
+    
+    def test_backup(self):
+        global config
+        cfg = config.copy()
+        Driver.Params_init( cfg )
+        self.assertEqual( cfg["Gasgauge.backup.interval"], Driver.BACKUP_INTERVAL_DEFAULT )
+        device = Driver()
+        regs = device.REGISTER
+        sim = SimDevMemory( [Register(address=adr) for adr in range(regs.REG_RAM_LAST + 1)] )
+        sim.writeByteRegister( regs.REG_ID, regs.CHIP_ID )
+        # Cold start: RAM is empty
+        device.sim = sim
+        err = device.open( cfg.copy() )
+        self.assertTrue( err.isOk() )
+        ram, err = sim.readBufferRegister( regs.REG_RAM_FIRST, regs.RAM_SIZE )
+        self.assertTrue( device._checkRamConsistency( ram ).isOk() )
+        cnfCC, _ = sim.readWordRegister( regs.REG_CC_CNF )
+        self.assertEqual( (ram[regs.IDX_RAM_CC_CNF_H] << 8) | ram[regs.IDX_RAM_CC_CNF_L], cnfCC )
+        # Periodic SOC backup
+        sim.writeWordRegister( regs.REG_SOC, 0x3200 )
+        device._backupTime = 0
+        self.assertEqual( device.getStateOfCharge(), 25 )
+        ram, err = sim.readBufferRegister( regs.REG_RAM_FIRST, regs.RAM_SIZE )
+        self.assertTrue( device._checkRamConsistency( ram ).isOk() )
+        self.assertEqual( ram[regs.IDX_RAM_SOC_H], 0x32 )
+        # Backup on shutdown
+        sim.writeWordRegister( regs.REG_SOC, 0x6400 )
+        err = device.close()
+        self.assertTrue( err.isOk() )
+        ram, err = sim.readBufferRegister( regs.REG_RAM_FIRST, regs.RAM_SIZE )
+        self.assertEqual( ram[regs.IDX_RAM_SOC_H], 0x64 )
+        # A failed backup doesn't prevent shutting down
+        err = device.open( cfg.copy() )
+        self.assertTrue( err.isOk() )
+        with mock.patch.object( device, "_backupRam", return_value=ErrorCode.errLowLevelFail ):
+            err = device.setRunLevel( RunLevel.shutdown )
+        self.assertEqual( err, ErrorCode.errLowLevelFail )
+        mode, _ = sim.readByteRegister( regs.REG_MODE )
+        self.assertEqual( mode, regs.MODE_VMODE | regs.MODE_FORCE_VM )
+        err = device.close()
+        self.assertTrue( err.isOk() )
+        # Warm start restores the SOC
+        sim.writeWordRegister( regs.REG_SOC, 0 )
+        device = Driver()
+        device.sim = sim
+        err = device.open( cfg.copy() )
+        self.assertTrue( err.isOk() )
+        self.assertEqual( device.getStateOfCharge(), 50 )
+        err = device.close()
+        self.assertTrue( err.isOk() )
+        # No restoration after battery removal
+        sim.writeWordRegister( regs.REG_SOC, 0 )
+        sim.writeByteRegister( regs.REG_CTRL, regs.CTRL_BATFAIL )
+        device = Driver()
+        device.sim = sim
+        err = device.open( cfg.copy() )
+        self.assertTrue( err.isOk() )
+        self.assertEqual( device.getStateOfCharge(), 0 )
+        err = device.close()
+        self.assertTrue( err.isOk() )
+    
+    def test_events(self):
+        global config
+        cfg = config.copy()
+        Driver.Params_init( cfg )
+        device = Driver()
+        regs = device.REGISTER
+        sim = SimDevMemory( [Register(address=adr) for adr in range(regs.REG_RAM_LAST + 1)] )
+        sim.writeByteRegister( regs.REG_ID, regs.CHIP_ID )
+        device.sim = sim
+        err = device.open( cfg )
+        self.assertTrue( err.isOk() )
+        sim.writeWordRegister( regs.REG_SOC, 0x0400 )
+        sim.writeWordRegister( regs.REG_VOLTAGE, 1400 )
+        sim.writeByteRegister( regs.REG_CTRL, regs.CTRL_IO0DATA | regs.CTRL_ALM_SOC | regs.CTRL_ALM_VOLT | regs.CTRL_PORDET )
+        numReads = [0]
+        origRead = device.readBufferRegister
+        def countingRead( reg, length ):
+            numReads[0] += 1
+            return origRead( reg, length )
+        device.readBufferRegister = countingRead
+        events = [(ctx.source, ctx.soc, ctx.voltage) for ctx in device.iterEventContexts( Event.evtInt1 )]
+        self.assertEqual( events, [(EventSource.hardReset, Percentage.invalid, Voltage.invalid),
+                                   (EventSource.lowVolt, Percentage.invalid, 3080),
+                                   (EventSource.lowSOC, 2, Voltage.invalid)] )
+        self.assertEqual( numReads[0], 1 )
+        data, _ = sim.readByteRegister( regs.REG_CTRL )
+        self.assertEqual( data & (regs.CTRL_ALM_SOC | regs.CTRL_ALM_VOLT), 0 )
+        # Reverse order
+        sim.writeByteRegister( regs.REG_CTRL, regs.CTRL_IO0DATA | regs.CTRL_ALM_SOC | regs.CTRL_ALM_VOLT | regs.CTRL_PORDET )
+        context = EventContext()
+        context.control = EventContextControl.getLast
+        sources = []
+        err = ErrorCode.errMoreData
+        while err == ErrorCode.errMoreData:
+            err = device.getEventContext( Event.evtInt1, context )
+            sources.append( context.source )
+        self.assertEqual( err, ErrorCode.errOk )
+        self.assertEqual( sources, [EventSource.lowSOC, EventSource.lowVolt, EventSource.hardReset] )
+        sim.writeByteRegister( regs.REG_CTRL, regs.CTRL_IO0DATA )
+        context = EventContext()
+        context.control = EventContextControl.getFirst
+        err = device.getEventContext( Event.evtInt1, context )
+        self.assertEqual( err, ErrorCode.errFewData )
+        err = device.getEventContext( Event.evtInt2, context )
+        self.assertEqual( err, ErrorCode.errInvalidParameter )
+        err = device.close()
+        self.assertTrue( err.isOk() )
+    
     def test_RatedSOC(self):
         global config
         cfg = config.copy()
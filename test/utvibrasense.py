@@ -8,7 +8,7 @@ import unittest
 
 from philander.gpio import GPIO
 from philander.systypes import ErrorCode
-from philander.vibrasense import VibraSense as Driver
+from philander.vibrasense import EdgeCount, VibraSense as Driver
 
 config = {
     #"VibraSense.slot"   :   1,
@@ -149,6 +149,54 @@ class TestVibrasense( unittest.TestCase ):
         err = device.close()
         self.assertTrue( err.isOk() )
 
+    def test_counter(self):
+        global config
+        cfg = config.copy()
+        cfg["VibraSense.counter.window"] = 100
+        cfg["VibraSense.counter.history"] = 3
+        Driver.Params_init( cfg )
+        device = Driver()
+        err = device.open(cfg)
+        self.assertTrue( err.isOk() )
+        data, err = device.getLatestData()
+        self.assertEqual( err, ErrorCode.errFewData )
+        self.assertIsInstance( data, EdgeCount )
+        windows = []
+        device.on( Driver.EVENT_WINDOW, windows.append )
+        perEdge = []
+        device.on( GPIO.EVENT_DEFAULT, perEdge.append )
+        # Edges are counted by the GPIO rather than emitted
+        data, err = device.getNextData()
+        self.assertTrue( err.isOk(), f"Error: {err}." )
+        for _ in range(7):
+            device.gpioSignal._callback( None )
+        data, err = device.getNextData()
+        self.assertTrue( err.isOk(), f"Error: {err}." )
+        self.assertEqual( data.window, 100 )
+        self.assertGreaterEqual( data.count, 7 )
+        self.assertAlmostEqual( data.rate, data.count * 10 )
+        self.assertEqual( data.history[-1], data.count )
+        latest, err = device.getLatestData()
+        self.assertTrue( err.isOk() )
+        self.assertIs( latest, data )
+        self.assertEqual( perEdge, [] )
+        time.sleep( 0.35 )
+        data, err = device.getLatestData()
+        self.assertEqual( len(data.history), 3 )
+        self.assertGreaterEqual( len(windows), 4 )
+        self.assertIsInstance( windows[-1], EdgeCount )
+        device.off_all()
+        err = device.close()
+        self.assertTrue( err.isOk() )
+        # Back to level mode
+        err = device.open(config.copy())
+        self.assertTrue( err.isOk() )
+        value, err = device.getLatestData()
+        self.assertTrue( err.isOk() )
+        self.assertIn( value, (GPIO.LEVEL_LOW, GPIO.LEVEL_HIGH) )
+        err = device.close()
+        self.assertTrue( err.isOk() )
+
         
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
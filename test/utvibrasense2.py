@@ -1,5 +1,6 @@
 """
 """
+from array import array
 import argparse
 import sys
 import unittest
@@ -60,6 +61,53 @@ class TestVibrasense2( unittest.TestCase ):
         err = device.close()
         self.assertTrue( err.isOk() )
     
+    def test_sampling(self):
+        global config
+        cfg = config.copy()
+        cfg["Sensor.dataRate"] = 200
+        cfg["VibraSense2.buffer.size"] = 64
+        Driver.Params_init( cfg )
+        device = Driver()
+        err = device.open(cfg)
+        self.assertTrue( err.isOk() )
+        # Block larger than the buffer
+        _, _, err = device.getBlock( 65 )
+        self.assertEqual( err, ErrorCode.errInvalidParameter )
+        # Caller-provided arrays are filled in place
+        values = array('H', [0] * 16)
+        stamps = array('d', [0] * 16)
+        vals, ts, err = device.getBlock( 16, values, stamps )
+        self.assertTrue( err.isOk(), f"Block: {err}." )
+        self.assertIs( vals, values )
+        self.assertIs( ts, stamps )
+        self.assertEqual( list(values), [513] * 16 )
+        for idx in range(1, 16):
+            self.assertGreater( stamps[idx], stamps[idx-1] )
+        # Next block continues seamlessly
+        _, ts, err = device.getBlock( 8 )
+        self.assertTrue( err.isOk() )
+        self.assertGreater( ts[0], stamps[15] )
+        self.assertLess( ts[0] - stamps[15], 0.5 )
+        val, err = device.getLatestData()
+        self.assertTrue( err.isOk() )
+        self.assertEqual( val, 513 )
+        val, err = device.getNextData()
+        self.assertTrue( err.isOk() )
+        self.assertEqual( val, 513 )
+        # Already sampling, the buffer remains as is
+        self.assertEqual( device.startSampling(), ErrorCode.errResourceConflict )
+        self.assertEqual( device.startSampling( 1000 ), ErrorCode.errResourceConflict )
+        self.assertEqual( device.bufferSize, 64 )
+        for _ in range(70):
+            val, err = device.getLatestData()
+            self.assertTrue( err.isOk() )
+        val, err = device.getNextData()
+        self.assertTrue( err.isOk() )
+        _, _, err = device.getBlock( 8 )
+        self.assertTrue( err.isOk() )
+        err = device.close()
+        self.assertTrue( err.isOk() )
+        self.assertEqual( device.stopSampling(), ErrorCode.errInadequate )
         
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()